@@ -0,0 +1,82 @@
+"""
+Compares two benchmark result files (see run_benchmarks.py) stage by stage.
+
+Exits with status 1 if any stage got slower (best wall time) by more than
+the threshold, so it can gate a commit in CI.
+
+Usage:
+    python -m benchmarks.compare data/benchmarks/OLD.json data/benchmarks/NEW.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+
+# Stages faster than this are dominated by noise and never count as regressions
+MIN_WALL_S = 0.005
+
+def load_results(path: str) -> dict:
+    """Loads a result file."""
+    with open(path, encoding="utf-8") as results_file:
+        return json.load(results_file)
+
+def compare_stages(old: dict, new: dict, threshold: float) -> tuple[list, list]:
+    """
+    Matches the stages of two runs by name.
+
+    Returns:
+        (list, list): One row per stage (stage, old wall_s, new wall_s,
+        relative change, old peak bytes, new peak bytes) and the names of
+        the stages that regressed.
+    """
+    old_stages = {record["stage"]: record for record in old["stages"]}
+    rows, regressions = [], []
+    for record in new["stages"]:
+        stage = record["stage"]
+        before = old_stages.get(stage)
+        if before is None:
+            rows.append((stage, None, record["wall_s"], None, None, record.get("peak_alloc_bytes")))
+            continue
+
+        change = (record["wall_s"] - before["wall_s"]) / before["wall_s"] if before["wall_s"] else 0.0
+        rows.append((stage, before["wall_s"], record["wall_s"], change,
+                     before.get("peak_alloc_bytes"), record.get("peak_alloc_bytes")))
+        if change > threshold and max(record["wall_s"], before["wall_s"]) >= MIN_WALL_S:
+            regressions.append(stage)
+    return rows, regressions
+
+def _mib(value) -> str:
+    return f"{value / 2**20:.1f}" if value is not None else "-"
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("old", help="Baseline result JSON.")
+    parser.add_argument("new", help="Result JSON to check.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative slowdown that counts as a regression (default 0.1 = 10%%).")
+    args = parser.parse_args()
+
+    old, new = load_results(args.old), load_results(args.new)
+    for label, results in [("old", old), ("new", new)]:
+        meta = results["meta"]
+        print(f"{label}: commit {meta.get('git_commit')} at {meta['timestamp']} "
+              f"(scale {meta['scale']}, repeat {meta['repeat']})")
+    if old["meta"]["scale"] != new["meta"]["scale"]:
+        print("Warning: the runs used different scale factors.", file=sys.stderr)
+
+    rows, regressions = compare_stages(old, new, args.threshold)
+    print(f"\n{'stage':<52}{'old s':>10}{'new s':>10}{'change':>9}{'old MiB':>9}{'new MiB':>9}")
+    for stage, old_s, new_s, change, old_peak, new_peak in rows:
+        old_text = f"{old_s:.4f}" if old_s is not None else "-"
+        change_text = f"{change:+.1%}" if change is not None else "new"
+        marker = "  <-- regression" if stage in regressions else ""
+        print(f"{stage:<52}{old_text:>10}{new_s:>10.4f}{change_text:>9}"
+              f"{_mib(old_peak):>9}{_mib(new_peak):>9}{marker}")
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed by more than {args.threshold:.0%}.")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Generates synthetic raw data with the exact schemas of the jaffle-shop CSVs
+and the support_tickets JSONL, at a chosen scale factor.
+
+Scale factor 1 is roughly the size of the jaffle-shop sample (about 60k
+orders). Everything is generated offline with numpy from a fixed seed,
+so a given (scale, seed) always produces the same files.
+
+Usage:
+    python -m benchmarks.generate --scale 10 --root /tmp/medallion_sf10
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from bronze.compression import COMPRESSIONS, DEFAULT_COMPRESSION, raw_writer
+
+# Row counts at scale factor 1
+BASE_CUSTOMERS = 1_000
+BASE_ORDERS = 60_000
+BASE_STORES = 6
+TICKETS_PER_ORDER = 0.1
+MAX_ITEMS_PER_ORDER = 3
+
+# Reference data that does not grow with the scale factor
+PRODUCTS = [
+    ("JAF-001", "nutellaphone who dis?", "jaffle", 1100),
+    ("JAF-002", "doctor stew", "jaffle", 1100),
+    ("JAF-003", "the krautback", "jaffle", 1200),
+    ("JAF-004", "flame impala", "jaffle", 1400),
+    ("JAF-005", "mel-bun", "jaffle", 1200),
+    ("BEV-001", "tangaroo", "beverage", 600),
+    ("BEV-002", "chai and mighty", "beverage", 500),
+    ("BEV-003", "vanilla ice", "beverage", 600),
+    ("BEV-004", "for richer or pourover", "beverage", 700),
+    ("BEV-005", "adele-ade", "beverage", 400),
+]
+CITIES = [
+    "Philadelphia", "Brooklyn", "Chicago", "San Francisco", "New Orleans", "Los Angeles",
+    "Seattle", "Austin", "Boston", "Denver", "Portland", "Atlanta",
+]
+SUPPLY_NAMES = ["compostable cutlery", "cutlery", "plate", "napkin", "bread", "cheese", "tomato"]
+TICKET_STATUSES = ["open", "pending", "resolved", "closed"]
+TICKET_CHANNELS = ["email", "chat", "phone", "web"]
+TICKET_TAGS = ["billing", "delivery", "quality", "refund", "app", "wait_time"]
+SENTIMENT_MODELS = ["demo", "distilbert-v1"]
+
+# Orders are spread over this period
+ORDERS_START = np.datetime64("2024-01-01T00:00:00")
+ORDERS_DAYS = 730
+
+def _uuids(rng: np.random.Generator, n: int) -> np.ndarray:
+    """Generates 'n' random UUID strings (8-4-4-4-12 hex digits)."""
+    hex_digits = rng.bytes(16 * n).hex()
+    return np.array([
+        f"{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
+        for h in (hex_digits[i:i + 32] for i in range(0, 32 * n, 32))
+    ], dtype=object)
+
+def _timestamps(values: np.ndarray) -> np.ndarray:
+    """Formats datetime64 values as ISO timestamps, like the jaffle-shop CSVs."""
+    return np.datetime_as_string(values.astype("datetime64[s]"), unit="s").astype(object)
+
+def row_counts(scale: float) -> dict:
+    """Returns the target row counts of the scaled tables (items follow the orders)."""
+    orders = max(1, int(BASE_ORDERS * scale))
+    return {
+        "raw_customers": max(1, int(BASE_CUSTOMERS * scale)),
+        "raw_orders": orders,
+        # Stores grow slowly: more stores, but not proportionally more
+        "raw_stores": min(len(CITIES), max(1, round(BASE_STORES * scale ** 0.25))),
+        "raw_products": len(PRODUCTS),
+        "support_tickets": max(1, int(orders * TICKETS_PER_ORDER)),
+    }
+
+def generate_tables(scale: float = 1.0, seed: int = 0) -> dict:
+    """
+    Generates all raw tables in memory.
+
+    Returns:
+        dict[str, pd.DataFrame]: File stem (e.g. 'raw_orders') -> data.
+    """
+    rng = np.random.default_rng(seed)
+    counts = row_counts(scale)
+
+    # --- Stores ---
+    n_stores = counts["raw_stores"]
+    stores = pd.DataFrame({
+        "id": _uuids(rng, n_stores),
+        "name": CITIES[:n_stores],
+        "opened_at": _timestamps(
+            np.datetime64("2016-09-01") + rng.integers(0, 365 * 7, n_stores).astype("timedelta64[D]")
+        ),
+        "tax_rate": rng.choice([0.04, 0.0475, 0.06, 0.0625, 0.075, 0.08], n_stores),
+    })
+
+    # --- Customers ---
+    n_customers = counts["raw_customers"]
+    customers = pd.DataFrame({
+        "id": _uuids(rng, n_customers),
+        "name": [f"Customer {i}" for i in range(n_customers)],
+    })
+
+    # --- Products & supplies (fixed reference data) ---
+    products = pd.DataFrame(PRODUCTS, columns=["sku", "name", "type", "price"])
+    products["description"] = products["name"].str.capitalize() + ", made fresh daily."
+
+    # Four supplies per product, cycling through the supply names
+    supply_skus = np.repeat(products["sku"].to_numpy(), 4)
+    supply_names = np.resize(np.array(SUPPLY_NAMES, dtype=object), len(supply_skus))
+    supplies = pd.DataFrame({
+        "id": [f"SUP-{i + 1:03d}" for i in range(len(supply_skus))],
+        "name": supply_names,
+        "cost": rng.integers(1, 300, len(supply_skus)),
+        "perishable": np.isin(supply_names, ["bread", "cheese", "tomato"]),
+        "sku": supply_skus,
+    })
+
+    # --- Orders and their items ---
+    n_orders = counts["raw_orders"]
+    order_ids = _uuids(rng, n_orders)
+    items_per_order = rng.integers(1, MAX_ITEMS_PER_ORDER + 1, n_orders)
+    item_order_ids = np.repeat(order_ids, items_per_order)
+    item_product = rng.integers(0, len(PRODUCTS), len(item_order_ids))
+    items = pd.DataFrame({
+        "id": _uuids(rng, len(item_order_ids)),
+        "order_id": item_order_ids,
+        "sku": products["sku"].to_numpy()[item_product],
+    })
+
+    # The subtotal is the sum of the item prices, as in the real data
+    item_prices = products["price"].to_numpy()[item_product]
+    subtotal = np.add.reduceat(item_prices, np.r_[0, np.cumsum(items_per_order)[:-1]])
+    order_store = rng.integers(0, n_stores, n_orders)
+    tax_paid = np.round(subtotal * stores["tax_rate"].to_numpy()[order_store]).astype(np.int64)
+    minutes = rng.integers(0, ORDERS_DAYS * 24 * 60, n_orders).astype("timedelta64[m]")
+    orders = pd.DataFrame({
+        "id": order_ids,
+        "customer": customers["id"].to_numpy()[rng.integers(0, n_customers, n_orders)],
+        "ordered_at": _timestamps(ORDERS_START + minutes),
+        "store_id": stores["id"].to_numpy()[order_store],
+        "subtotal": subtotal,
+        "tax_paid": tax_paid,
+        "order_total": subtotal + tax_paid,
+    })
+
+    # --- Support tickets (JSONL with a nested sentiment struct) ---
+    n_tickets = counts["support_tickets"]
+    ticket_orders = rng.integers(0, n_orders, n_tickets)
+    created = ORDERS_START + minutes[ticket_orders] + rng.integers(10, 72 * 60, n_tickets).astype("timedelta64[m]")
+    resolved = created + rng.integers(30, 14 * 24 * 60, n_tickets).astype("timedelta64[m]")
+    is_resolved = rng.random(n_tickets) < 0.7
+    has_order = rng.random(n_tickets) >= 0.05 # Some tickets are not linked to an order
+    has_sentiment = rng.random(n_tickets) >= 0.02
+    scores = np.round(rng.uniform(-1, 1, n_tickets), 4)
+    models = rng.choice(SENTIMENT_MODELS, n_tickets)
+    n_tags = rng.integers(0, 4, n_tickets)
+
+    tickets = pd.DataFrame({
+        "ticket_id": _uuids(rng, n_tickets),
+        "order_id": np.where(has_order, order_ids[ticket_orders], None),
+        "customer_external_id": rng.integers(1, n_customers + 1, n_tickets),
+        "created_at": _timestamps(created),
+        "resolved_at": np.where(is_resolved, _timestamps(resolved), None),
+        "status": np.where(is_resolved, rng.choice(TICKET_STATUSES[2:], n_tickets),
+                           rng.choice(TICKET_STATUSES[:2], n_tickets)),
+        "channel": rng.choice(TICKET_CHANNELS, n_tickets),
+        "tags": [list(rng.choice(TICKET_TAGS, k, replace=False)) for k in n_tags],
+        "sentiment": [
+            {"model": str(model), "score": float(score)} if present else None
+            for model, score, present in zip(models, scores, has_sentiment)
+        ],
+    })
+
+    return {
+        "raw_customers": customers,
+        "raw_orders": orders,
+        "raw_items": items,
+        "raw_products": products,
+        "raw_stores": stores,
+        "raw_supplies": supplies,
+        "support_tickets": tickets,
+    }
+
+def write_raw_data(root: str, scale: float = 1.0, seed: int = 0,
+                   compression: str = DEFAULT_COMPRESSION) -> dict:
+    """
+    Writes the raw landing zone under 'root' (the layout the bronze
+    layer reads): data/bronze/raw/local/*.csv and
+    data/bronze/raw/azure/support_tickets.jsonl, compressed like the
+    extractors' downloads (e.g. raw_orders.csv.zst).
+
+    Returns:
+        dict[str, int]: Rows written per table.
+    """
+    local_dir = os.path.join(root, "data", "bronze", "raw", "local")
+    azure_dir = os.path.join(root, "data", "bronze", "raw", "azure")
+    os.makedirs(local_dir, exist_ok=True)
+    os.makedirs(azure_dir, exist_ok=True)
+
+    tables = generate_tables(scale, seed)
+    for name, df in tables.items():
+        if name == "support_tickets":
+            with raw_writer(azure_dir, f"{name}.jsonl", compression) as (_, raw_file):
+                df.to_json(raw_file, orient="records", lines=True)
+        else:
+            with raw_writer(local_dir, f"{name}.csv", compression) as (_, raw_file):
+                df.to_csv(raw_file, index=False)
+
+    return {name: len(df) for name, df in tables.items()}
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Generate synthetic raw Medallion data.")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Scale factor (1 = about 60k orders).")
+    parser.add_argument("--root", default=".",
+                        help="Project root to write data/bronze/raw/ under (default: current dir).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compression", choices=sorted(COMPRESSIONS), default=DEFAULT_COMPRESSION,
+                        help=f"Compression of the raw files (default: {DEFAULT_COMPRESSION}).")
+    args = parser.parse_args()
+
+    counts = write_raw_data(args.root, args.scale, args.seed, args.compression)
+    print(f"Generated scale factor {args.scale} under {args.root}:")
+    for name, rows in counts.items():
+        print(f"  - {name}: {rows:,} rows")
+
+if __name__ == "__main__":
+    main()
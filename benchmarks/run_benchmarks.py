@@ -0,0 +1,259 @@
+"""
+End-to-end benchmark of the pipeline stages on synthetic data.
+
+Generates raw data at a scale factor (see generate.py), then times and
+memory-profiles every stage: the bronze transform_csv / transform_jsonl,
+each silver transform, the gold transforms, and the ParquetIOManager
+writes and reads. Results are written as JSON, so runs from different
+commits can be compared with benchmarks.compare.
+
+Usage:
+    python -m benchmarks.run_benchmarks --scale 1 --repeat 3
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import duckdb
+import pandas as pd
+import pyarrow as pa
+from dagster import AssetKey, build_input_context, build_output_context
+from upath import UPath
+
+# Note: importing the bronze transformers changes the working directory
+# to the project root, so the data directory is entered afterwards.
+from bronze.transform.csv_transformer import transform_csv
+from bronze.transform.jsonl_transformer import transform_jsonl
+from silver.transform.customers import transform_customers
+from silver.transform.stores import transform_stores
+from silver.transform.products import transform_products
+from silver.transform.supplies import transform_supplies
+from silver.transform.order_items import transform_order_items
+from silver.transform.orders import transform_orders
+from silver.transform.support_tickets import transform_support_tickets
+from gold.transform.transform_aov import calculate_aov_by_store_month
+from gold.transform.transform_tickets import calculate_orders_ticket_summary
+from gold.transform.transform_rollup import calculate_sales_rollup
+from gold.transform.transform_profile import calculate_order_profile
+from medallion_dagster.resources import ParquetIOManager
+from medallion_dagster.read_cache import ParquetReadCache
+from benchmarks.generate import write_raw_data
+from bronze.compression import COMPRESSIONS, DEFAULT_COMPRESSION, raw_files
+
+# Default directory of the JSON results (relative to the project root)
+RESULTS_DIR = "data/benchmarks"
+
+PROJECT_ROOT = os.getcwd()
+
+class StageTimer:
+    """Runs stages, recording their time and memory."""
+
+    def __init__(self, repeat: int = 1, track_memory: bool = True):
+        self.repeat = repeat
+        self.track_memory = track_memory
+        self.records = []
+
+    def run(self, stage: str, func, *args, rows_in: int | None = None):
+        """
+        Runs 'func(*args)' 'repeat' times for timing, then once more under
+        tracemalloc for its peak Python/numpy allocation (tracing slows
+        code down, so it is kept out of the timed runs). Arrow buffers are
+        not traced; they show up in the process' max RSS.
+
+        Returns:
+            The result of the last call.
+        """
+        wall_times, cpu_times = [], []
+        # The transforms print their progress; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(self.repeat):
+                wall_started, cpu_started = time.perf_counter(), time.process_time()
+                result = func(*args)
+                wall_times.append(time.perf_counter() - wall_started)
+                cpu_times.append(time.process_time() - cpu_started)
+
+            peak_bytes = None
+            if self.track_memory:
+                tracemalloc.start()
+                result = func(*args)
+                peak_bytes = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+        wall_times.sort()
+        record = {
+            "stage": stage,
+            "wall_s": wall_times[0], # Best of the repeats
+            "wall_s_median": wall_times[len(wall_times) // 2],
+            "cpu_s": min(cpu_times),
+            "peak_alloc_bytes": peak_bytes,
+            "max_rss_bytes": _max_rss_bytes(),
+            "rows_in": rows_in,
+            "rows_out": len(result) if hasattr(result, "__len__") else None,
+        }
+        self.records.append(record)
+        print(f"  {stage:<52}{record['wall_s']:>9.4f}s"
+              + (f"{peak_bytes / 2**20:>10.1f} MiB" if peak_bytes is not None else ""))
+        return result
+
+def _max_rss_bytes() -> int:
+    """Peak resident set size of this process so far."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024 # KiB on Linux
+
+def _git_commit() -> str | None:
+    """The current commit of the project, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_stages(timer: StageTimer, data_root: str):
+    """Runs every benchmarked stage on the raw data under 'data_root'."""
+    os.chdir(data_root) # The bronze transformers read data/bronze/raw/ relative to cwd
+
+    # --- Bronze ---
+    print("Bronze:")
+    bronze = {}
+    for file_name in raw_files("data/bronze/raw/local", ".csv"):
+        bronze[file_name[:-len(".csv")]] = timer.run(
+            f"bronze.transform_csv[{file_name}]", transform_csv, file_name
+        )
+    bronze["support_tickets"] = timer.run(
+        "bronze.transform_jsonl[support_tickets.jsonl]", transform_jsonl, "support_tickets.jsonl"
+    )
+
+    # --- Silver ---
+    print("Silver:")
+    silver = {}
+    for table_name, func, source in [
+        ("customers", transform_customers, "raw_customers"),
+        ("stores", transform_stores, "raw_stores"),
+        ("products", transform_products, "raw_products"),
+        ("supplies", transform_supplies, "raw_supplies"),
+        ("order_items", transform_order_items, "raw_items"),
+        ("orders", transform_orders, "raw_orders"),
+    ]:
+        silver[table_name] = timer.run(
+            f"silver.{func.__name__}", func, bronze[source], rows_in=len(bronze[source])
+        )
+    silver["support_tickets"] = timer.run(
+        "silver.transform_support_tickets", transform_support_tickets,
+        bronze["support_tickets"], bronze["raw_orders"], rows_in=len(bronze["support_tickets"])
+    )
+
+    # --- Gold ---
+    print("Gold:")
+    orders, stores = silver["orders"], silver["stores"]
+    gold = {
+        "aov_by_store_month": timer.run(
+            "gold.calculate_aov_by_store_month", calculate_aov_by_store_month,
+            orders, stores, rows_in=len(orders)
+        ),
+        "orders_ticket_summary": timer.run(
+            "gold.calculate_orders_ticket_summary", calculate_orders_ticket_summary,
+            orders, silver["support_tickets"], silver["customers"], stores, rows_in=len(orders)
+        ),
+        "sales_rollup": timer.run(
+            "gold.calculate_sales_rollup", calculate_sales_rollup, orders, stores, rows_in=len(orders)
+        ),
+        "order_profile": timer.run(
+            "gold.calculate_order_profile", calculate_order_profile,
+            [orders], [silver["support_tickets"]], stores, rows_in=len(orders)
+        ),
+    }
+
+    # --- IO manager ---
+    print("IO manager:")
+    for layer, tables in [("silver", silver), ("gold", gold)]:
+        io_manager = ParquetIOManager(base_path=UPath(os.path.join("data", layer)))
+        cached_io_manager = ParquetIOManager(
+            base_path=UPath(os.path.join("data", layer)),
+            read_cache=ParquetReadCache(max_bytes=2**40)
+        )
+        for table_name, df in tables.items():
+            key = AssetKey([layer, table_name])
+            path = UPath(os.path.join("data", layer, f"{table_name}.parquet"))
+            # A fresh output context per run: a context takes each metadata key only once
+            timer.run(f"io.write[{layer}/{table_name}]",
+                      lambda key, df, path: io_manager.dump_to_path(build_output_context(asset_key=key), df, path),
+                      key, df, path, rows_in=len(df))
+            timer.run(f"io.read[{layer}/{table_name}]", io_manager.load_from_path,
+                      build_input_context(asset_key=key), path)
+            # Warm cross-asset read cache (every call after the first is a hit)
+            timer.run(f"io.read_cached[{layer}/{table_name}]", cached_io_manager.load_from_path,
+                      build_input_context(asset_key=key), path)
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the Medallion pipeline stages.")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Scale factor of the synthetic data (1 = about 60k orders).")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timed runs per stage; the best is reported (default 3).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="Where to generate the data (default: a temp dir).")
+    parser.add_argument("--compression", choices=sorted(COMPRESSIONS), default=DEFAULT_COMPRESSION,
+                        help=f"Compression of the raw files (default: {DEFAULT_COMPRESSION}).")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc run of each stage.")
+    parser.add_argument("--output", help=f"Result JSON file (default: {RESULTS_DIR}/<time>_<commit>_sf<scale>.json).")
+    args = parser.parse_args()
+
+    # The IO manager logs every read and write at INFO; keep the report readable
+    logging.disable(logging.INFO)
+
+    data_root = args.workdir or tempfile.mkdtemp(prefix="medallion_bench_")
+    print(f"Generating scale factor {args.scale} under {data_root}...")
+    generate_started = time.perf_counter()
+    row_counts = write_raw_data(data_root, args.scale, args.seed, args.compression)
+    generate_s = time.perf_counter() - generate_started
+
+    timer = StageTimer(repeat=args.repeat, track_memory=not args.no_memory)
+    run_stages(timer, data_root)
+    os.chdir(PROJECT_ROOT)
+
+    started_at = datetime.now(timezone.utc)
+    commit = _git_commit()
+    results = {
+        "meta": {
+            "timestamp": started_at.isoformat(),
+            "git_commit": commit,
+            "scale": args.scale,
+            "seed": args.seed,
+            "compression": args.compression,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "pandas": pd.__version__,
+            "pyarrow": pa.__version__,
+            "duckdb": duckdb.__version__,
+            "generate_s": generate_s,
+        },
+        "row_counts": row_counts,
+        "stages": timer.records,
+    }
+
+    output_path = args.output or os.path.join(
+        RESULTS_DIR, f"{started_at:%Y%m%dT%H%M%S}_{commit or 'nogit'}_sf{args.scale:g}.json"
+    )
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"\nResults written to {output_path}")
+
+if __name__ == "__main__":
+    main()
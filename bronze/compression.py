@@ -0,0 +1,92 @@
+"""
+Compressed raw landing zone.
+
+The extractors write raw files compressed (e.g. 'raw_orders.csv.zst') and
+the bronze readers decompress them as a stream while parsing, so neither
+the compressed nor the decompressed file is ever held in memory whole.
+Readers refer to files by their logical name ('raw_orders.csv') and find
+whichever variant is on disk, so uncompressed files keep working.
+"""
+import contextlib
+import os
+import uuid
+import pyarrow as pa
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# File name suffix of each supported compression
+COMPRESSIONS = {
+    "none": "",
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+# zstd compresses the raw CSV/JSONL ~10x and decompresses faster than gzip
+DEFAULT_COMPRESSION = os.getenv("RAW_COMPRESSION", "zstd")
+
+# Read and write buffer of the (de)compressing streams
+STREAM_BUFFER_BYTES = 1024 * 1024
+
+def _check(compression: str):
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown raw compression {compression!r}; expected one of {sorted(COMPRESSIONS)}")
+
+def logical_name(file_name: str) -> str:
+    """'raw_orders.csv.zst' -> 'raw_orders.csv'."""
+    for suffix in COMPRESSIONS.values():
+        if suffix and file_name.endswith(suffix):
+            return file_name[:-len(suffix)]
+    return file_name
+
+def raw_files(directory: str, extension: str) -> list:
+    """Logical names of the raw files with 'extension' (e.g. '.csv') in a directory."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted({logical_name(f) for f in os.listdir(directory) if logical_name(f).endswith(extension)})
+
+def find_raw_file(directory: str, name: str) -> str:
+    """
+    The path of raw file 'name' as stored, compressed or not. If several
+    variants exist, the most recently written one wins. Returns the
+    uncompressed path if none exists, so the caller's error names it.
+    """
+    variants = [os.path.join(directory, name + suffix) for suffix in COMPRESSIONS.values()]
+    existing = [path for path in variants if os.path.exists(path)]
+    if not existing:
+        return variants[0]
+    return max(existing, key=os.path.getmtime)
+
+def open_raw_file(path: str) -> pa.NativeFile:
+    """Opens a raw file for reading, decompressing it on the fly (by its suffix)."""
+    return pa.input_stream(path, compression="detect", buffer_size=STREAM_BUFFER_BYTES)
+
+@contextlib.contextmanager
+def raw_writer(directory: str, name: str, compression: str = DEFAULT_COMPRESSION):
+    """
+    Writes raw file 'name' into 'directory', compressed, as a stream.
+
+    The file is written under a temporary name and moved into place when
+    the block exits without error, so readers never see a partial file.
+    Other variants of 'name' (e.g. an older uncompressed copy) are removed.
+
+    Yields:
+        (str, pa.NativeFile): The final path and the stream to write to.
+    """
+    _check(compression)
+    path = os.path.join(directory, name + COMPRESSIONS[compression])
+    os.makedirs(os.path.dirname(path), exist_ok=True) # Blob names may contain '/'
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    codec = None if compression == "none" else compression
+    try:
+        with pa.output_stream(tmp_path, compression=codec, buffer_size=STREAM_BUFFER_BYTES) as stream:
+            yield path, stream
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    for suffix in COMPRESSIONS.values():
+        other = os.path.join(directory, name + suffix)
+        if other != path and os.path.exists(other):
+            os.remove(other)
@@ -2,24 +2,65 @@
 
 from pathlib import Path
 import requests
+from bronze.compression import DEFAULT_COMPRESSION, raw_writer
 
 API_URL = "https://api.github.com/repos/dbt-labs/jaffle-shop-data/contents/jaffle-data"
 OUTPUT_DIR = Path(__file__).parent.parent.parent / "data" / "bronze" / "raw" / "local"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-def fetch_files(url):
-    """Recursively fetch all CSV files from GitHub."""
+def list_csv_files(url) -> dict:
+    """Recursively lists the CSV files in the GitHub directory: name -> download URL."""
     response = requests.get(url, timeout=30)  # 30 seconds timeout
     response.raise_for_status()
 
+    files = {}
+    for item in response.json():
+        if item["type"] == "dir":
+            files.update(list_csv_files(item["url"]))
+        elif item["name"].endswith(".csv"):
+            files[item["name"]] = item["download_url"]
+    return files
+
+def list_csv_versions(url, etag: str | None = None) -> tuple[dict | None, str | None]:
+    """
+    Lists the CSV files' git blob SHAs (name -> sha) without downloading them.
+
+    With the 'etag' of an earlier listing the request is conditional: an
+    unchanged directory answers 304, which GitHub does not count against
+    the rate limit, and (None, etag) is returned. A directory's listing
+    changes whenever anything below it does, so only the top level is
+    checked that way.
+
+    Returns:
+        (dict | None, str | None): The versions (None if unchanged) and the new ETag.
+    """
+    response = requests.get(url, timeout=30, headers={"If-None-Match": etag} if etag else {})
+    if response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
+
+    versions = {}
     for item in response.json():
         if item["type"] == "dir":
-            fetch_files(item["url"])
+            versions.update(list_csv_versions(item["url"])[0])
         elif item["name"].endswith(".csv"):
-            content = requests.get(item["download_url"], timeout=30).text
-            output_path = OUTPUT_DIR / item["name"]
-            output_path.write_text(content)
-            print(f"✓ {item['name']}")
+            versions[item["name"]] = item["sha"]
+    return versions, response.headers.get("ETag")
+
+def download_csv(name: str, download_url: str, compression: str = DEFAULT_COMPRESSION) -> Path:
+    """Downloads one CSV file to OUTPUT_DIR, compressing it as it streams in, and returns its path."""
+    with requests.get(download_url, timeout=30, stream=True) as response:
+        response.raise_for_status()
+        with raw_writer(str(OUTPUT_DIR), name, compression) as (output_path, output_file):
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                output_file.write(chunk)
+    print(f"✓ {name}")
+    return Path(output_path)
+
+def fetch_files(url):
+    """Recursively fetch all CSV files from GitHub."""
+    for name, download_url in list_csv_files(url).items():
+        download_csv(name, download_url)
 
 if __name__ == "__main__":
     fetch_files(API_URL)
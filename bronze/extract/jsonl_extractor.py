@@ -4,6 +4,7 @@ import os
 from pathlib import Path
 from azure.storage.blob import ContainerClient
 from dotenv import load_dotenv
+from bronze.compression import DEFAULT_COMPRESSION, find_raw_file, open_raw_file, raw_files, raw_writer
 
 # Load environment variables from .env file
 load_dotenv()
@@ -12,32 +13,44 @@ load_dotenv()
 project_root = Path(__file__).resolve().parents[2]
 os.chdir(project_root)
 
-def download_azure_jsonl(url: str, local_directory: str = "./data"):
+def list_azure_blobs(url: str) -> tuple[ContainerClient, list]:
+    """Returns a client for the container behind the SAS URL and its blob names."""
+    container_client = ContainerClient.from_container_url(url)
+    return container_client, [blob.name for blob in container_client.list_blobs()]
+
+def list_blob_versions(url: str) -> dict:
+    """Lists the container's blobs as name -> ETag, reading metadata only."""
+    container_client = ContainerClient.from_container_url(url)
+    return {blob.name: blob.etag for blob in container_client.list_blobs()}
+
+def download_blob(container_client: ContainerClient, blob_name: str, local_directory: str,
+                  compression: str = DEFAULT_COMPRESSION) -> str:
+    """Downloads one blob into 'local_directory', compressed, and returns its local path."""
+    blob_client = container_client.get_blob_client(blob_name)
+    # Stream to disk instead of holding the whole blob in memory
+    with raw_writer(local_directory, blob_name, compression) as (local_path, output_file):
+        blob_client.download_blob().readinto(output_file)
+    print(f"Saved: {local_path}")
+    return local_path
+
+def download_azure_jsonl(url: str, local_directory: str = "./data",
+                         compression: str = DEFAULT_COMPRESSION):
     """
     Download all JSONL files from Azure Blob Storage container locally.
 
     Args:
         url (str): The SAS URL of the Azure Blob Storage container.
         local_directory (str): Local directory to save files (default: ./data).
+        compression (str): 'zstd', 'gzip' or 'none' (default: $RAW_COMPRESSION or zstd).
     """
 
     os.makedirs(local_directory, exist_ok=True)
 
     # Create a ContainerClient using the SAS URL
-    container_client = ContainerClient.from_container_url(url)
-
-    # List all blobs in the container
-    blobs = container_client.list_blobs()
+    container_client, blob_names = list_azure_blobs(url)
 
-    for blob in blobs:
-        # Download blob
-        blob_client = container_client.get_blob_client(blob.name)
-        blob_data = blob_client.download_blob().readall()
-        # Save locally
-        local_path = os.path.join(local_directory, blob.name)
-        with open(local_path, 'wb') as output_file:
-            output_file.write(blob_data)
-        print(f"Saved: {local_path}")
+    for blob_name in blob_names:
+        download_blob(container_client, blob_name, local_directory, compression)
 
 
 if __name__ == "__main__":
@@ -52,17 +65,13 @@ if __name__ == "__main__":
     )
     print("Download completed.")
     # Top 5 records of all downloaded files
-    for file_name in os.listdir(str(project_root / "data" / "bronze" / "raw" / "azure")):
-        if file_name.endswith('.jsonl'):
-            with open(
-                str(project_root / "data" / "bronze" / "raw" / "azure" / file_name),
-                'r',
-                encoding='utf-8'
-                ) as f:
-                print(f"\nTop 5 records from {file_name}:")
-                for _ in range(5):
-                    print(f.readline().strip())
-                print("...")
+    azure_dir = str(project_root / "data" / "bronze" / "raw" / "azure")
+    for file_name in raw_files(azure_dir, '.jsonl'):
+        with open_raw_file(find_raw_file(azure_dir, file_name)) as f:
+            print(f"\nTop 5 records from {file_name}:")
+            for _ in range(5):
+                print(f.readline().decode('utf-8').strip())
+            print("...")
 
 
 # End-of-file (EOF)
@@ -1,5 +1,7 @@
 """This module loads extracted DataFrames to Parquet files."""
 import os
+from shared.parquet_layout import layout_for
+from shared.table_format import write_table
 from bronze.transform.csv_transformer import transform_csv, csv_files
 
 # Create parquet directory if it doesn't exist
@@ -9,7 +11,9 @@ def load_bronze_csv(file_name: str) -> None:
     """Load CSV to Parquet file."""
     df = transform_csv(file_name)
     parquet_name = file_name.replace('.csv', '.parquet')
-    df.to_parquet(f"data/bronze/parquet/{parquet_name}", index=False)
+    # Published as a new table version: never rewrite a published file in place
+    write_table(df, f"data/bronze/parquet/{parquet_name}",
+                layout_for("bronze", parquet_name.replace('.parquet', '')))
     print(f"Loaded {file_name} to {parquet_name}")
 
 if __name__ == "__main__":
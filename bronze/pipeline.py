@@ -0,0 +1,161 @@
+"""
+Pipelined extract-to-bronze: each raw file is parsed as soon as it lands.
+
+Downloads run on one thread pool and parsing on another, connected by a
+bounded queue: a file is handed to the parsers the moment its download
+completes, and downloads pause when the parsers fall 'queue_size' files
+behind. Network and CPU work overlap, so the stage takes about
+max(download, parse) instead of their sum.
+
+Each parsed file is written as typed Parquet to a staging directory,
+named after the raw file's size and modification time. The bronze
+assets load the staged file if it matches the raw file, and otherwise
+parse the raw file themselves.
+"""
+import glob
+import hashlib
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from shared.parquet_layout import write_parquet
+from .compression import logical_name, open_raw_file
+
+# Default pool sizes and the number of landed files waiting to be parsed
+DOWNLOAD_WORKERS = 4
+PARSE_WORKERS = 2
+QUEUE_SIZE = 4
+
+# Readers of the raw formats, by file extension (before any compression suffix)
+PARSERS = {
+    ".csv": pd.read_csv,
+    ".jsonl": lambda stream: pd.read_json(stream, lines=True),
+}
+
+def parse_raw_file(raw_path: str) -> pd.DataFrame:
+    """Parses a raw CSV or JSONL file, decompressing it as a stream, into a DataFrame."""
+    extension = os.path.splitext(logical_name(raw_path))[1]
+    if extension not in PARSERS:
+        raise ValueError(f"No parser for {raw_path}; expected one of {sorted(PARSERS)}")
+    with open_raw_file(raw_path) as stream:
+        return PARSERS[extension](stream)
+
+def _staged_name(raw_path: str) -> str:
+    """
+    Staging name of a raw file: its logical name plus a hash of its
+    directory, since date-sharded blobs may share a file name.
+    """
+    directory = hashlib.sha256(os.path.abspath(os.path.dirname(raw_path)).encode()).hexdigest()[:8]
+    return f"{logical_name(os.path.basename(raw_path))}.{directory}"
+
+def staged_path(raw_path: str, staging_dir: str) -> str:
+    """Staged Parquet file of the current version of a raw file."""
+    stat = os.stat(raw_path)
+    return os.path.join(staging_dir, f"{_staged_name(raw_path)}.{stat.st_mtime_ns}-{stat.st_size}.parquet")
+
+def stage_raw_file(raw_path: str, staging_dir: str) -> tuple[str, int]:
+    """
+    Parses a raw file and writes it to the staging directory as Parquet,
+    replacing staged versions of older raw files.
+
+    Returns:
+        (str, int): The staged file and its row count.
+    """
+    os.makedirs(staging_dir, exist_ok=True)
+    target = staged_path(raw_path, staging_dir)
+    df = parse_raw_file(raw_path)
+
+    tmp_path = f"{target}.{threading.get_ident()}.tmp"
+    write_parquet(df, tmp_path)
+    os.replace(tmp_path, target) # Readers never see a partial file
+
+    for old in glob.glob(os.path.join(staging_dir, f"{glob.escape(_staged_name(raw_path))}.*.parquet")):
+        if old != target:
+            os.remove(old)
+    return target, len(df)
+
+def load_raw_file(raw_path: str, staging_dir: str | None = None) -> pd.DataFrame:
+    """Reads a raw file from its staged Parquet copy if it is current, else parses it."""
+    if staging_dir is not None:
+        staged = staged_path(raw_path, staging_dir)
+        if os.path.exists(staged):
+            return pd.read_parquet(staged)
+    return parse_raw_file(raw_path)
+
+def run_pipelined(downloads: dict, staging_dir: str, download_workers: int = DOWNLOAD_WORKERS,
+                  parse_workers: int = PARSE_WORKERS, queue_size: int = QUEUE_SIZE) -> dict:
+    """
+    Downloads files and stages each one as soon as it lands.
+
+    Args:
+        downloads (dict[str, callable]): File name -> function downloading
+            the file and returning its local path.
+        staging_dir (str): Where the parsed Parquet files go.
+        download_workers (int): Concurrent downloads.
+        parse_workers (int): Concurrent parsers.
+        queue_size (int): Landed files that may wait for a parser before
+            downloads block.
+
+    Returns:
+        dict: Totals for metadata: files, rows, download_s and parse_s
+        (summed over files), and wall_s of the whole stage.
+
+    Raises:
+        The first download or parse error, once every worker has stopped.
+    """
+    landed = queue.Queue(maxsize=queue_size)
+    errors = []
+    totals = {"files": 0, "rows": 0, "download_s": 0.0, "parse_s": 0.0}
+    totals_lock = threading.Lock()
+    started = time.perf_counter()
+
+    def download(name, fetch):
+        download_started = time.perf_counter()
+        path = fetch()
+        with totals_lock:
+            totals["download_s"] += time.perf_counter() - download_started
+        landed.put((name, path)) # Blocks while the parsers are 'queue_size' files behind
+
+    def parse_landed():
+        while True:
+            item = landed.get()
+            if item is None:
+                return
+            if errors:
+                continue # Keep draining so downloads never block on a failed run
+            name, path = item
+            parse_started = time.perf_counter()
+            try:
+                _, rows = stage_raw_file(str(path), staging_dir)
+            except Exception as e: # pylint: disable=broad-exception-caught
+                errors.append(e)
+                continue
+            with totals_lock:
+                totals["files"] += 1
+                totals["rows"] += rows
+                totals["parse_s"] += time.perf_counter() - parse_started
+            print(f"Staged {name} ({rows} rows)")
+
+    parsers = [threading.Thread(target=parse_landed, daemon=True) for _ in range(parse_workers)]
+    for parser in parsers:
+        parser.start()
+    try:
+        with ThreadPoolExecutor(max_workers=download_workers) as pool:
+            futures = [pool.submit(download, name, fetch) for name, fetch in downloads.items()]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e: # pylint: disable=broad-exception-caught
+                    errors.append(e)
+    finally:
+        for _ in parsers:
+            landed.put(None)
+        for parser in parsers:
+            parser.join()
+
+    if errors:
+        raise errors[0]
+    totals["wall_s"] = time.perf_counter() - started
+    return totals
@@ -0,0 +1,104 @@
+"""
+Sharded ingestion: one raw landing directory of JSONL shards (e.g. one
+blob per day) becomes one fragmented bronze table.
+
+Each shard is parsed into its own Parquet fragment on a process pool.
+The table's manifest records the content version of the shard behind
+every fragment (see shared.table_format), so a later run parses only
+shards that are new or changed, and drops the fragments of shards that
+are gone.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from shared.fingerprint import content_version
+from shared.parquet_layout import TableLayout, write_parquet
+from shared.table_format import TableFragments, snapshot, stage_path
+from .compression import logical_name
+from .pipeline import load_raw_file
+
+# Processes parsing shards; one shard per task
+SHARD_WORKERS = min(os.cpu_count() or 1, 8)
+
+def discover_shards(directory: str, extension: str = ".jsonl") -> dict:
+    """
+    Finds the raw shards under 'directory', at any depth.
+
+    Returns:
+        dict[str, str]: Shard name (its logical path relative to
+        'directory', e.g. '2025/10/01/tickets.jsonl') -> file path.
+    """
+    shards = {}
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file_name in sorted(files):
+            name = logical_name(file_name)
+            if name.endswith(extension):
+                relative = os.path.relpath(os.path.join(root, name), directory)
+                shards[relative.replace(os.sep, "/")] = os.path.join(root, file_name)
+    return shards
+
+def _parse_shard(raw_path: str, fragment_path: str, layout: TableLayout | None,
+                 staging_dir: str | None) -> int:
+    """Worker: parses one shard into a Parquet fragment; returns its rows."""
+    return write_parquet(load_raw_file(raw_path, staging_dir), fragment_path, layout)
+
+def ingest_shards(directory: str, table_path: str, layout: TableLayout | None = None,
+                  staging_dir: str | None = None, workers: int = SHARD_WORKERS,
+                  parser_version: str = "", reingest: bool = False) -> TableFragments:
+    """
+    Parses the new and changed shards under 'directory' into fragments of
+    the table at 'table_path', in parallel. The fragments are staged, not
+    published: the returned update is published by the IO manager (see
+    shared.table_format.publish_fragments).
+
+    Args:
+        directory (str): The raw landing directory holding the shards.
+        table_path (str): The bronze table, e.g. 'data/bronze/parquet/support_tickets.parquet'.
+        layout (TableLayout | None): Layout of the fragments.
+        staging_dir (str | None): Parquet staged by the extract (see
+            bronze.pipeline), used instead of parsing where current.
+        workers (int): Processes parsing shards.
+        parser_version (str): Version of the parsing code, recorded with
+            each shard's version, so a new parser re-parses every shard.
+        reingest (bool): Re-parse every shard, changed or not.
+
+    Returns:
+        TableFragments: Fragments of new or changed shards, and removed shards.
+
+    Raises:
+        FileNotFoundError: If there are no shards to ingest.
+    """
+    shards = discover_shards(directory)
+    if not shards:
+        raise FileNotFoundError(f"No JSONL shards found under {directory}")
+
+    current = snapshot(table_path)
+    ingested = (current.sources or {}) if current is not None else {}
+    shard_versions = {
+        name: f"{content_version(raw_path)}-{parser_version}" for name, raw_path in shards.items()
+    }
+    pending = sorted(name for name, version in shard_versions.items()
+                     if reingest or ingested.get(name, {}).get("version") != version)
+    removed = tuple(sorted(set(ingested) - set(shards)))
+
+    fragments = {name: stage_path(table_path) for name in pending}
+    if len(pending) > 1 and workers > 1:
+        # 'spawn': forking a process that runs threads (Dagster does) is unsafe
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {
+                name: pool.submit(_parse_shard, shards[name], fragments[name], layout, staging_dir)
+                for name in pending
+            }
+            rows = {name: future.result() for name, future in futures.items()}
+    else:
+        rows = {name: _parse_shard(shards[name], fragments[name], layout, staging_dir)
+                for name in pending}
+
+    for name in pending:
+        print(f"Ingested shard {name} ({rows[name]} rows)")
+    return TableFragments(
+        {name: (fragments[name], shard_versions[name], rows[name]) for name in pending},
+        removed,
+    )
@@ -2,6 +2,7 @@
 import os
 from pathlib import Path
 import pandas as pd
+from bronze.compression import find_raw_file, open_raw_file, raw_files
 
 # Get the project root (medallion_etl)
 project_root = Path(__file__).resolve().parents[2]
@@ -9,7 +10,7 @@ os.chdir(project_root)
 
 # Reads "data/bronze/raw/" directory for CSV files and stores the names in a list.
 # That list is now a global variable.
-csv_files = [f for f in os.listdir("data/bronze/raw/local") if f.endswith('.csv')]
+csv_files = raw_files("data/bronze/raw/local", '.csv')
 globals()['csv_files'] = csv_files
 
 def transform_csv(file_name: str) -> pd.DataFrame:
@@ -23,7 +24,9 @@ def transform_csv(file_name: str) -> pd.DataFrame:
         pd.DataFrame: The transformed data as a DataFrame.
     """
     df_name = file_name.replace('.csv', '')
-    df_internal = pd.read_csv(f"data/bronze/raw/local/{file_name}")
+    # Compressed files are decompressed as a stream while parsing
+    with open_raw_file(find_raw_file("data/bronze/raw/local", file_name)) as raw_file:
+        df_internal = pd.read_csv(raw_file)
     globals()[f"df_{df_name}"] = df_internal
     return df_internal
 
@@ -2,13 +2,14 @@
 import os
 from pathlib import Path
 import pandas as pd
+from bronze.compression import find_raw_file, open_raw_file, raw_files
 
 # Get the project root
 project_root = Path(__file__).resolve().parents[2]
 os.chdir(project_root)
 
 # List all JSONL files in data/bronze/raw/azure
-jsonl_files = [f for f in os.listdir("data/bronze/raw/azure") if f.endswith('.jsonl')]
+jsonl_files = raw_files("data/bronze/raw/azure", '.jsonl')
 globals()['jsonl_files'] = jsonl_files
 
 def transform_jsonl(file_name: str) -> pd.DataFrame:
@@ -22,7 +23,9 @@ def transform_jsonl(file_name: str) -> pd.DataFrame:
         pd.DataFrame: The transformed data as a DataFrame.
     """
     df_name = file_name.replace('.jsonl', '')
-    df_internal = pd.read_json(f"data/bronze/raw/azure/{file_name}", lines=True)
+    # Compressed files are decompressed as a stream while parsing
+    with open_raw_file(find_raw_file("data/bronze/raw/azure", file_name)) as raw_file:
+        df_internal = pd.read_json(raw_file, lines=True)
     globals()[f"df_{df_name}"] = df_internal
     return df_internal
 
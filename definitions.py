@@ -1,8 +1,11 @@
 """
 This is the main entry point for Dagster.
-It brings together all the assets, resources, and schedules.
+It brings together all the assets, resources, schedules and sensors.
 """
+import os
 from dagster import (
+    DefaultScheduleStatus,
+    DefaultSensorStatus,
     Definitions,
     ScheduleDefinition,
     define_asset_job,
@@ -13,11 +16,13 @@ from dagster import (
 from medallion_dagster.bronze import bronze_assets
 from medallion_dagster.silver import silver_assets
 from medallion_dagster.gold import gold_assets
+from medallion_dagster.sensors import build_raw_data_sensor
 
 # Import our resources
 from medallion_dagster.resources import (
     PathConfig,
     AzureConfig,
+    DimensionCacheResource,
     parquet_io_manager
 )
 
@@ -31,29 +36,41 @@ all_assets_job = define_asset_job(
     selection=AssetSelection.all()
 )
 
-# --- 2. Define Schedules ---
+# --- 2. Define Schedules and Sensors ---
+# Superseded by the raw-data sensor; kept (stopped) as a fallback
 hourly_schedule = ScheduleDefinition(
     job=all_assets_job,
     cron_schedule="0 * * * *", # "At minute 0 of every hour"
-    description="Refreshes the full Medallion pipeline every hour."
+    description="Refreshes the full Medallion pipeline every hour.",
+    default_status=DefaultScheduleStatus.STOPPED,
+)
+
+# Runs only the assets affected by new raw data, when it arrives
+raw_data_sensor = build_raw_data_sensor(
+    all_assets_job, all_assets, default_status=DefaultSensorStatus.RUNNING
 )
 
 # --- 3. Define Resources ---
+# Arrow IPC copies of loaded inputs, shared by the step processes of a run
+IPC_CACHE_DIR = os.path.join(PathConfig().cache_path, "ipc")
+
 resources_def = {
     # I/O Managers for each layer, configured with the correct path
     "bronze_io_manager": parquet_io_manager.configured(
-        {"base_path": PathConfig().bronze_parquet_path}
+        {"base_path": PathConfig().bronze_parquet_path, "ipc_cache_dir": IPC_CACHE_DIR}
     ),
     "silver_io_manager": parquet_io_manager.configured(
-        {"base_path": PathConfig().silver_path}
+        {"base_path": PathConfig().silver_path, "ipc_cache_dir": IPC_CACHE_DIR}
     ),
     "gold_io_manager": parquet_io_manager.configured(
-        {"base_path": PathConfig().gold_path}
+        {"base_path": PathConfig().gold_path, "ipc_cache_dir": IPC_CACHE_DIR}
     ),
 
     # Resources our assets need
     "paths": PathConfig(), # Provides all paths
     "azure": AzureConfig(), # Provides the SAS URL from .env
+    # Store/customer name lookups shared by all gold assets
+    "dimensions": DimensionCacheResource(silver_path=PathConfig().silver_path),
 }
 
 
@@ -63,4 +80,5 @@ defs = Definitions(
     resources=resources_def,
     jobs=[all_assets_job],
     schedules=[hourly_schedule],
+    sensors=[raw_data_sensor],
 )
@@ -0,0 +1,88 @@
+"""Shared store/customer name lookups, built once from the Silver layer."""
+import os
+import threading
+import pandas as pd
+from shared.fingerprint import parquet_fingerprint
+from shared.table_format import pinned_file
+
+# Silver dimension table -> its primary key column
+DIMENSION_KEYS = {
+    "stores": "store_id",
+    "customers": "customer_id",
+}
+
+class DimensionCache:
+    """
+    Caches the id -> name lookups of the Silver dimension tables.
+
+    Each table is read once (only its key and 'name' columns) and kept with
+    'name' as a categorical, so every gold asset shares one small copy.
+    A table is re-read only when its Parquet fingerprint changes.
+    """
+
+    def __init__(self, silver_path: str = "data/silver"):
+        self.silver_path = silver_path
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, table: str) -> pd.DataFrame:
+        """
+        Returns the [<key>, name] DataFrame for a dimension table.
+
+        Args:
+            table (str): One of the DIMENSION_KEYS tables, e.g. 'stores'.
+
+        Returns:
+            pd.DataFrame: Key column plus a categorical 'name' column.
+        """
+        return self.entry(table)[1]
+
+    def entry(self, table: str) -> tuple:
+        """
+        Returns the lookup of a dimension table with the fingerprint it was
+        read at. The same DataFrame is returned until the fingerprint changes.
+
+        Returns:
+            (ParquetFingerprint, pd.DataFrame): See lookup().
+        """
+        key_column = DIMENSION_KEYS[table]
+        # The data file of the latest published version
+        path = pinned_file(os.path.join(self.silver_path, f"{table}.parquet"))
+        fingerprint = parquet_fingerprint(path)
+
+        with self._lock:
+            cached = self._entries.get(table)
+            if cached is None or cached[0] != fingerprint:
+                df = pd.read_parquet(path, columns=[key_column, "name"])
+                df["name"] = df["name"].astype("category")
+                cached = (fingerprint, df)
+                self._entries[table] = cached
+
+        return cached
+
+    def stores(self) -> pd.DataFrame:
+        """Returns the [store_id, name] lookup."""
+        return self.lookup("stores")
+
+    def customers(self) -> pd.DataFrame:
+        """Returns the [customer_id, name] lookup."""
+        return self.lookup("customers")
+
+    def store_names(self) -> pd.Series:
+        """Returns store names as a categorical Series indexed by store_id."""
+        return self.stores().set_index("store_id")["name"]
+
+    def customer_names(self) -> pd.Series:
+        """Returns customer names as a categorical Series indexed by customer_id."""
+        return self.customers().set_index("customer_id")["name"]
+
+# One cache per silver directory, shared by everything in this process
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+def get_dimension_cache(silver_path: str = "data/silver") -> DimensionCache:
+    """Returns the process-wide DimensionCache for a silver directory."""
+    with _CACHES_LOCK:
+        if silver_path not in _CACHES:
+            _CACHES[silver_path] = DimensionCache(silver_path)
+        return _CACHES[silver_path]
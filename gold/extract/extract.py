@@ -1,29 +1,96 @@
 """This module contains functions to extract data from the Silver layer."""
-import glob
 import os
 import sys
-import pandas as pd
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from shared.table_format import list_tables, read_table, table_exists
 
-def read_silver_data(silver_path="data/silver"):
+class SilverCatalog:
     """
-    Reads all .parquet files from the specified silver layer directory
-    and returns them in a dictionary of DataFrames.
+    Lazy catalog of the .parquet tables in the silver layer directory.
+
+    Nothing is read up front: a table is loaded on first access, with only
+    the requested columns, and kept for later accesses. Several tables can
+    be fetched concurrently with load().
     """
-    print(f"Extracting data from {silver_path}...")
-    search_path = os.path.join(silver_path, "*.parquet")
-    files = glob.glob(search_path)
 
-    if not files:
-        print(f"Error: No .parquet files found in {silver_path}", file=sys.stderr)
-        return None
+    def __init__(self, silver_path="data/silver", max_workers=4):
+        self.silver_path = silver_path
+        self.max_workers = max_workers
+        self._loaded = {} # table name -> (DataFrame, has all columns?)
+        self._lock = threading.Lock()
+
+    def table_names(self):
+        """Lists the available tables without reading them."""
+        return list_tables(self.silver_path)
+
+    def __contains__(self, table_name):
+        return table_exists(self._path(table_name))
+
+    def __getitem__(self, table_name):
+        return self.get(table_name)
+
+    def get(self, table_name, columns=None):
+        """
+        Returns a table, reading it on first access.
+
+        Args:
+            table_name (str): e.g. 'orders'.
+            columns (list[str] | None): Only read these columns (None = all).
+
+        Returns:
+            pd.DataFrame: The table, restricted to 'columns' if given.
+        """
+        with self._lock:
+            cached = self._loaded.get(table_name)
+
+        if cached is not None:
+            df, has_all_columns = cached
+            if columns is None and has_all_columns:
+                return df
+            if columns is not None and set(columns) <= set(df.columns):
+                return df[columns]
 
-    dataframes = {}
-    for file_path in files:
-        # Get filename without extension to use as dict key
-        file_name = os.path.basename(file_path).replace(".parquet", "")
-        dataframes[file_name] = pd.read_parquet(file_path)
+        # The latest published version; low-cardinality columns (e.g.
+        # store_id) are read as categoricals
+        df = read_table(self._path(table_name), columns).to_pandas()
+
+        with self._lock:
+            self._loaded[table_name] = (df, columns is None)
+        return df
+
+    def load(self, tables):
+        """
+        Fetches several tables concurrently on a thread pool.
+
+        Args:
+            tables (dict[str, list[str] | None]): Table name -> columns to read.
+
+        Returns:
+            dict[str, pd.DataFrame]: The loaded tables, by name.
+        """
+        print(f"Extracting {list(tables)} from {self.silver_path}...")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                table_name: pool.submit(self.get, table_name, columns)
+                for table_name, columns in tables.items()
+            }
+            dataframes = {name: future.result() for name, future in futures.items()}
 
-    if dataframes:
         print(f"Successfully extracted: {list(dataframes.keys())}")
+        return dataframes
+
+    def _path(self, table_name):
+        """Builds the logical path of a table (see shared.table_format)."""
+        return os.path.join(self.silver_path, f"{table_name}.parquet")
 
-    return dataframes
+def read_silver_data(silver_path="data/silver"):
+    """
+    Opens the silver layer directory as a lazy SilverCatalog.
+    Returns None if the directory has no .parquet files.
+    """
+    catalog = SilverCatalog(silver_path)
+    if not catalog.table_names():
+        print(f"Error: No .parquet files found in {silver_path}", file=sys.stderr)
+        return None
+    return catalog
@@ -1,13 +1,18 @@
 """This module contains functions to load data into the Gold layer."""
 import os
+from shared.parquet_layout import layout_for
+from shared.table_format import write_table
 
 def save_to_gold(df, filename, gold_path="data/gold"):
     """
-    Saves the given DataFrame to a .parquet file in the gold layer directory.
+    Saves the given DataFrame to a .parquet file in the gold layer directory,
+    clustered and indexed according to its table layout. The file is
+    published as a new table version, so concurrent readers are not disturbed.
     """
     # Ensure the target directory exists
     os.makedirs(gold_path, exist_ok=True)
 
     file_path = os.path.join(gold_path, filename)
-    df.to_parquet(file_path, index=False, engine='pyarrow')
+    table_name = os.path.splitext(filename)[0]
+    write_table(df, file_path, layout_for("gold", table_name))
     print(f"Successfully loaded: {file_path}")
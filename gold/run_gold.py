@@ -4,8 +4,11 @@ import sys
 # We assume this script is run from the root of the project (e.g., `python gold/main.py`)
 # The root directory is automatically added to sys.path by Python.
 from gold.extract.extract import read_silver_data
+from gold.extract.dimensions import DimensionCache
 from gold.transform.transform_aov import calculate_aov_by_store_month
 from gold.transform.transform_tickets import calculate_orders_ticket_summary
+from gold.transform.transform_rollup import calculate_sales_rollup
+from gold.transform.transform_profile import calculate_order_profile
 from gold.load.load import save_to_gold
 
 def main():
@@ -14,34 +17,56 @@ def main():
 
     # 1. EXTRACT
     # Assumes silver data is in 'data/silver' relative to project root
-    silver_data = read_silver_data(silver_path="data/silver")
+    silver_catalog = read_silver_data(silver_path="data/silver")
 
-    if not silver_data:
+    if not silver_catalog:
         print("ETL Pipeline FAILED: No data extracted from silver layer.", file=sys.stderr)
         return
 
-    # Verify all necessary tables were loaded
+    # Verify all necessary tables exist (nothing is read yet)
     required_tables = ['orders', 'stores', 'support_tickets', 'customers']
-    if not all(table in silver_data for table in required_tables):
+    if not all(table in silver_catalog for table in required_tables):
         print("ETL Pipeline FAILED: Missing required data.", file=sys.stderr)
         print(f"Required: {required_tables}", file=sys.stderr)
-        print(f"Found: {list(silver_data.keys())}", file=sys.stderr)
+        print(f"Found: {silver_catalog.table_names()}", file=sys.stderr)
         return
 
+    # Read only the fact columns the transforms use, concurrently
+    silver_data = silver_catalog.load({
+        'orders': ['order_id', 'ordered_at', 'store_id', 'customer_id', 'order_total_cents'],
+        'support_tickets': ['order_id', 'sentiment_score'],
+    })
+
+    # Store/customer name lookups (key and name columns only)
+    dimensions = DimensionCache(silver_path="data/silver")
+
     # 2. TRANSFORM
 
     # Objective 1: Calculate AOV
     aov_table = calculate_aov_by_store_month(
         silver_data['orders'],
-        silver_data['stores']
+        dimensions.stores()
     )
 
     # Objective 2: Calculate Ticket Summary
     ticket_summary_table = calculate_orders_ticket_summary(
         silver_data['orders'],
         silver_data['support_tickets'],
-        silver_data['customers'],
-        silver_data['stores']
+        dimensions.customers(),
+        dimensions.stores()
+    )
+
+    # Objective 3: Pre-aggregate the multi-granularity sales cube
+    rollup_table = calculate_sales_rollup(
+        silver_data['orders'],
+        dimensions.stores()
+    )
+
+    # Objective 4: Sketch-based profile (distinct counts, quantiles, ticket rate)
+    profile_table = calculate_order_profile(
+        [silver_data['orders']],
+        [silver_data['support_tickets']],
+        dimensions.stores()
     )
 
     # 3. LOAD
@@ -56,6 +81,16 @@ def main():
     else:
         print("Skipping Ticket Summary load: transform function returned None.")
 
+    if rollup_table is not None:
+        save_to_gold(rollup_table, "sales_rollup.parquet")
+    else:
+        print("Skipping Sales Rollup load: transform function returned None.")
+
+    if profile_table is not None:
+        save_to_gold(profile_table, "order_profile.parquet")
+    else:
+        print("Skipping Order Profile load: transform function returned None.")
+
     print("--- Gold Layer ETL Pipeline Finished ---")
 
 if __name__ == "__main__":
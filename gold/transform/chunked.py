@@ -0,0 +1,178 @@
+"""This module provides out-of-core versions of the gold transformations.
+
+They consume silver tables one Parquet record batch at a time and only
+keep partial per-key aggregates, so peak memory depends on the number of
+distinct keys (store x month, order_id) rather than on the number of rows.
+"""
+import itertools
+from typing import Iterable, Iterator
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from shared.categoricals import align_categories
+from shared.parquet_layout import dictionary_columns, with_sort_order
+
+# Rows per record batch when streaming a Parquet file
+DEFAULT_BATCH_SIZE = 65_536
+
+def iter_parquet_batches(path, columns=None, batch_size=DEFAULT_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Streams a Parquet file as pandas DataFrames, one record batch at a time.
+
+    Args:
+        path: Path to the Parquet file.
+        columns (list[str] | None): Only read these columns.
+        batch_size (int): Maximum rows per batch.
+    """
+    parquet_file = pq.ParquetFile(str(path), read_dictionary=dictionary_columns(str(path)))
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        yield batch.to_pandas()
+
+def _merge_partials(partials: pd.DataFrame | None, batch_partials: pd.DataFrame) -> pd.DataFrame:
+    """Adds one batch's partial aggregates into the running ones (by index)."""
+    if partials is None:
+        return batch_partials
+    return partials.add(batch_partials, fill_value=0)
+
+def calculate_aov_by_store_month_chunked(order_batches: Iterable[pd.DataFrame], stores_df):
+    """
+    Calculates the Average Order Value (AOV) by store and by month,
+    streaming over batches of silver orders.
+
+    Produces the same table as calculate_aov_by_store_month.
+    Each batch contributes a partial sum and count per (store, year, month);
+    the AOV is only computed once all partials are merged.
+    """
+    print("Transforming: Calculating AOV by store and month (chunked)...")
+
+    partials = None
+    for batch in order_batches:
+        ordered_at = pd.to_datetime(batch['ordered_at'])
+        keys = [batch['store_id'], ordered_at.dt.year.rename('year'),
+                ordered_at.dt.month.rename('month')]
+
+        # Batches may carry different store_id categories; adding the
+        # partials aligns them by value
+        batch_partials = batch.groupby(keys, observed=True)['order_total_cents'].agg(['sum', 'count'])
+        partials = _merge_partials(partials, batch_partials)
+
+    if partials is None:
+        print("AOV transformation complete (no orders).")
+        return None
+
+    aov = partials.sort_index().reset_index()
+    aov['average_order_value_cents'] = (aov['sum'] / aov['count']).round(0).astype(int)
+    aov = aov.drop(columns=['sum', 'count'])
+
+    # Join with stores_df to add the store_name for user-friendliness
+    aov, stores = align_categories(aov, stores_df[['store_id', 'name']], 'store_id')
+    final_aov = aov.merge(
+        stores,
+        on='store_id',
+        how='left'
+    ).rename(columns={'name': 'store_name'})
+
+    final_aov = final_aov[[
+        'store_id',
+        'store_name',
+        'year',
+        'month',
+        'average_order_value_cents'
+    ]]
+
+    print("AOV transformation complete.")
+    return final_aov
+
+def count_tickets_by_order_chunked(ticket_batches: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Counts support tickets per order_id, streaming over batches of tickets.
+
+    Tickets without an order_id are ignored.
+
+    Returns:
+        pd.DataFrame: Columns [order_id, ticket_count].
+    """
+    counts = None
+    for batch in ticket_batches:
+        batch_counts = batch['order_id'].dropna().value_counts()
+        counts = _merge_partials(counts, batch_counts)
+
+    if counts is None:
+        return pd.DataFrame({'order_id': pd.Series(dtype=object),
+                             'ticket_count': pd.Series(dtype=int)})
+
+    ticket_counts = counts.astype(int).rename('ticket_count').rename_axis('order_id')
+    return ticket_counts.reset_index()
+
+def _enrich_orders(batch: pd.DataFrame, ticket_counts, customers_df, stores_df) -> pd.DataFrame:
+    """Adds the ticket count, customer name and store name to one batch of orders."""
+    summary = batch.merge(ticket_counts, on='order_id', how='left')
+    summary['ticket_count'] = summary['ticket_count'].fillna(0).astype(int)
+
+    summary = summary.merge(
+        customers_df[['customer_id', 'name']],
+        on='customer_id',
+        how='left'
+    ).rename(columns={'name': 'customer_name'})
+
+    summary, stores = align_categories(summary, stores_df[['store_id', 'name']], 'store_id')
+    summary = summary.merge(
+        stores,
+        on='store_id',
+        how='left'
+    ).rename(columns={'name': 'store_name'})
+
+    return summary[[
+        'order_id',
+        'ordered_at',
+        'store_id',
+        'store_name',
+        'customer_id',
+        'customer_name',
+        'ticket_count'
+    ]]
+
+def calculate_orders_ticket_summary_chunked(
+    order_batches: Iterable[pd.DataFrame],
+    ticket_batches: Iterable[pd.DataFrame],
+    customers_df,
+    stores_df,
+    orders_sorted_by: tuple = ()
+):
+    """
+    Creates the enriched order summary of calculate_orders_ticket_summary,
+    streaming over batches of silver orders and tickets.
+
+    The per-order ticket counts are held in full; each order batch is then
+    enriched on its own and streamed to the caller (the IO manager writes
+    it batch by batch), so the summary itself is never held in memory.
+    The batches keep the orders' row order, which the stream declares if
+    the orders are sorted ('orders_sorted_by', e.g. ('order_id',)), so the
+    writer does not collect them to sort.
+
+    Returns:
+        pa.RecordBatchReader | None: The summary, None without orders.
+    """
+    print("Transforming: Calculating ticket summary per order (chunked)...")
+
+    # 1. Aggregate support tickets, batch by batch
+    ticket_counts = count_tickets_by_order_chunked(ticket_batches)
+
+    # 2. Enrich each batch of orders as it is read
+    summaries = (_enrich_orders(batch, ticket_counts, customers_df, stores_df) for batch in order_batches)
+    first = next(summaries, None)
+    if first is None:
+        print("Ticket summary transformation complete (no orders).")
+        return None
+
+    schema = pa.Schema.from_pandas(first, preserve_index=False)
+    if orders_sorted_by:
+        schema = with_sort_order(schema, orders_sorted_by)
+
+    def batches():
+        # Categorical codes may be narrower in some batches: cast each to the first's schema
+        for summary in itertools.chain([first], summaries):
+            yield from pa.Table.from_pandas(summary, preserve_index=False).cast(schema).to_batches()
+        print("Ticket summary transformation complete.")
+
+    return pa.RecordBatchReader.from_batches(schema, batches())
@@ -0,0 +1,17 @@
+"""This module provides the calendar periods the gold aggregates are grouped by.
+
+Periods: 'D' = day, 'W' = week (starting Monday), 'M' = month, 'Y' = year.
+"""
+import pandas as pd
+
+def period_start(day: pd.Series, period: str) -> pd.Series:
+    """Truncates normalized timestamps to the start of their period."""
+    if period == "D":
+        return day
+    if period == "W":
+        return day - pd.to_timedelta(day.dt.dayofweek, unit="D")
+    if period == "M":
+        return day - pd.to_timedelta(day.dt.day - 1, unit="D")
+    if period == "Y":
+        return day - pd.to_timedelta(day.dt.dayofyear - 1, unit="D")
+    raise ValueError(f"Unknown period: {period}")
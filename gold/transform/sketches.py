@@ -0,0 +1,149 @@
+"""This module provides mergeable summaries ("sketches") of a column:
+HyperLogLog distinct counts and t-digest quantiles.
+
+A sketch is built in one pass over the values, batch by batch, and takes
+a fixed amount of memory however many values it summarizes. Two sketches
+of different data merge into the sketch of the combined data, so a
+coarser grain (a year, all stores) or new data is added without reading
+the rows again. Sketches are stored as bytes (to_bytes / from_bytes).
+"""
+import numpy as np
+import pandas as pd
+
+# 2^12 registers: a relative error of about 1.6% on distinct counts
+HLL_PRECISION = 12
+
+# Centroids budget of a t-digest (about compression / 2 centroids)
+TDIGEST_COMPRESSION = 200
+
+def hash_values(values) -> np.ndarray:
+    """64-bit hashes of values (stable across runs and processes)."""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Bit length of each uint32 value (0 for 0); exact, as float64 holds 32 bits."""
+    return np.frexp(values.astype(np.float64))[1]
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct count. Keeps, for each of 2^precision registers,
+    the longest run of leading zeros among the hashes routed to it.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION, registers: np.ndarray | None = None):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def add(self, values) -> "HyperLogLog":
+        """Adds values (nulls included; drop them first if they don't count)."""
+        return self.add_hashes(hash_values(values))
+
+    def add_hashes(self, hashes: np.ndarray) -> "HyperLogLog":
+        """Adds 64-bit hashes (see hash_values)."""
+        if len(hashes) == 0:
+            return self
+        hashes = hashes.astype(np.uint64, copy=False)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        rest = hashes << np.uint64(self.precision) # The remaining bits, left-aligned
+        high, low = rest >> np.uint64(32), rest & np.uint64(0xFFFFFFFF)
+        leading_zeros = np.where(high > 0, 32 - _bit_length(high), 64 - _bit_length(low))
+        rank = np.minimum(leading_zeros + 1, 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """The sketch of both sketches' values."""
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge HyperLogLog sketches of precision {self.precision} and {other.precision}")
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def estimate(self) -> int:
+        """Estimated number of distinct values."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and empty > 0: # Small counts: linear counting is exact-ish
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return bytes([self.precision]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(data[0], np.frombuffer(data, dtype=np.uint8, offset=1).copy())
+
+class TDigest:
+    """
+    t-digest quantiles. Keeps weighted centroids, small near the tails and
+    large in the middle, so extreme quantiles stay accurate.
+    """
+
+    def __init__(self, compression: float = TDIGEST_COMPRESSION,
+                 means: np.ndarray | None = None, weights: np.ndarray | None = None,
+                 minimum: float = np.inf, maximum: float = -np.inf):
+        self.compression = compression
+        self.means = np.empty(0) if means is None else means
+        self.weights = np.empty(0) if weights is None else weights
+        self.minimum, self.maximum = minimum, maximum
+
+    @property
+    def count(self) -> int:
+        return int(self.weights.sum())
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        """
+        Merges sorted centroids into as few as the scale function allows:
+        each new centroid covers one unit of k(q) = compression / 2pi * asin(2q - 1).
+        """
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        quantiles = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * quantiles - 1)
+        bins = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.diff(bins, prepend=-1))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def update(self, values) -> "TDigest":
+        """Adds values; nulls are ignored."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self._compress(np.concatenate([self.means, values]),
+                       np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """The sketch of both sketches' values."""
+        merged = TDigest(self.compression, minimum=min(self.minimum, other.minimum),
+                         maximum=max(self.maximum, other.maximum))
+        if self.count + other.count > 0:
+            merged._compress(np.concatenate([self.means, other.means]),
+                             np.concatenate([self.weights, other.weights]))
+        return merged
+
+    def quantile(self, q: float) -> float:
+        """Estimated q-quantile (0 <= q <= 1); NaN if empty."""
+        total = self.weights.sum()
+        if total == 0:
+            return np.nan
+        # Each centroid's mean sits at its midpoint; the extremes at 0 and total
+        positions = np.concatenate([[0.0], np.cumsum(self.weights) - self.weights / 2, [total]])
+        values = np.concatenate([[self.minimum], self.means, [self.maximum]])
+        return float(np.interp(q * total, positions, values))
+
+    def to_bytes(self) -> bytes:
+        header = np.array([self.compression, self.minimum, self.maximum])
+        return np.concatenate([header, self.means, self.weights]).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TDigest":
+        array = np.frombuffer(data, dtype=np.float64)
+        means, weights = np.split(array[3:], 2)
+        return cls(array[0], means.copy(), weights.copy(), array[1], array[2])
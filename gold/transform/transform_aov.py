@@ -1,6 +1,7 @@
 """This module provides transformation functions for calculating 
 Average Order Value (AOV) by store and month."""
 import pandas as pd
+from shared.categoricals import align_categories
 
 def calculate_aov_by_store_month(orders_df, stores_df):
     """
@@ -21,7 +22,8 @@ def calculate_aov_by_store_month(orders_df, stores_df):
     df['month'] = df['ordered_at'].dt.month
 
     # Group by store, year, month and calculate the mean of 'order_total_cents'
-    aov = df.groupby(['store_id', 'year', 'month'])['order_total_cents'].mean().reset_index()
+    # (store_id is usually categorical: grouping uses its integer codes)
+    aov = df.groupby(['store_id', 'year', 'month'], observed=True)['order_total_cents'].mean().reset_index()
 
     # Rename column for clarity
     aov = aov.rename(columns={'order_total_cents': 'average_order_value_cents'})
@@ -30,8 +32,9 @@ def calculate_aov_by_store_month(orders_df, stores_df):
     aov['average_order_value_cents'] = aov['average_order_value_cents'].round(0).astype(int)
 
     # Join with stores_df to add the store_name for user-friendliness
+    aov, stores = align_categories(aov, stores_df[['store_id', 'name']], 'store_id')
     final_aov = aov.merge(
-        stores_df[['store_id', 'name']],
+        stores,
         on='store_id',
         how='left'
     )
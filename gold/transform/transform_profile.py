@@ -0,0 +1,177 @@
+"""This module provides the order profile: distinct customers, order total
+and sentiment quantiles, and ticket rate, per store and month, computed
+with mergeable sketches (see sketches.py) in one streaming pass.
+
+Each profile row keeps its sketches, so coarser grains are merged from
+the store/month rows without reading the orders again.
+"""
+from typing import Iterable
+import numpy as np
+import pandas as pd
+from .sketches import HyperLogLog, TDigest, hash_values
+from .periods import period_start
+
+# Grains of the profile: grain name -> (per store?, period)
+PROFILE_GRAINS = {
+    "store_month": (True, "M"),
+    "store_year": (True, "Y"),
+    "all_month": (False, "M"),
+    "all_year": (False, "Y"),
+}
+
+# Quantiles reported from the digests: column suffix -> q
+ORDER_TOTAL_QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+SENTIMENT_QUANTILES = {"p10": 0.1, "p50": 0.5, "p90": 0.9}
+
+class _Partial:
+    """Counts and sketches of one store and month (or any merged set of them)."""
+
+    def __init__(self, order_count=0, ticket_count=0, customers=None, order_totals=None, sentiment=None):
+        self.order_count = order_count
+        self.ticket_count = ticket_count
+        self.customers = customers or HyperLogLog()
+        self.order_totals = order_totals or TDigest()
+        self.sentiment = sentiment or TDigest()
+
+    def merge(self, other: "_Partial") -> "_Partial":
+        return _Partial(
+            self.order_count + other.order_count,
+            self.ticket_count + other.ticket_count,
+            self.customers.merge(other.customers),
+            self.order_totals.merge(other.order_totals),
+            self.sentiment.merge(other.sentiment),
+        )
+
+def _groups(keys: list) -> tuple:
+    """
+    Groups rows by key.
+
+    Returns:
+        (list, list[np.ndarray]): The distinct keys, and the row positions of each.
+    """
+    codes, labels = pd.MultiIndex.from_arrays(keys).factorize()
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+    return list(labels), [order[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+def _profile_orders(order_batches: Iterable[pd.DataFrame], partials: dict) -> pd.Series:
+    """
+    Adds batches of orders to the per store and month partials.
+
+    Returns:
+        pd.Series: order_id -> position of its (store_id, month) key in
+        'partials', to attribute tickets.
+    """
+    positions_by_key = {}
+    order_keys = []
+    for batch in order_batches:
+        ordered_at = pd.to_datetime(batch['ordered_at'])
+        months = period_start(ordered_at.dt.normalize(), "M")
+        customer_hashes = hash_values(batch['customer_id'])
+        has_customer = batch['customer_id'].notna().to_numpy()
+        totals = batch['order_total_cents'].to_numpy(dtype=np.float64)
+
+        key_positions = np.empty(len(batch), dtype=np.int64)
+        labels, positions = _groups([batch['store_id'].astype(str), months])
+        for key, rows in zip(labels, positions):
+            if key not in partials:
+                partials[key], positions_by_key[key] = _Partial(), len(partials)
+            partial = partials[key]
+            partial.order_count += len(rows)
+            partial.customers.add_hashes(customer_hashes[rows[has_customer[rows]]])
+            partial.order_totals.update(totals[rows])
+            key_positions[rows] = positions_by_key[key]
+        order_keys.append(pd.Series(key_positions, index=batch['order_id'].to_numpy()))
+
+    if not order_keys:
+        return pd.Series(dtype=np.int64)
+    return pd.concat(order_keys)
+
+def _profile_tickets(ticket_batches: Iterable[pd.DataFrame], order_keys: pd.Series, partials: dict):
+    """
+    Adds batches of tickets to the partials of their orders' store and
+    month. Tickets without a known order_id are ignored.
+    """
+    partial_list = list(partials.values())
+    for batch in ticket_batches:
+        key_positions = order_keys.reindex(batch['order_id'].to_numpy()).to_numpy()
+        sentiment = batch['sentiment_score'].to_numpy(dtype=np.float64, na_value=np.nan)
+        attributed = np.flatnonzero(~np.isnan(key_positions))
+        if len(attributed) == 0:
+            continue
+        labels, positions = _groups([key_positions[attributed].astype(np.int64)])
+        for (position,), rows in zip(labels, positions):
+            partial = partial_list[position]
+            partial.ticket_count += len(rows)
+            partial.sentiment.update(sentiment[attributed[rows]])
+
+def _rollup(partials: dict, stores_df) -> pd.DataFrame:
+    """Merges the store/month partials up to every grain, and reports them."""
+    rows = []
+    for grain, (per_store, period) in PROFILE_GRAINS.items():
+        merged = {}
+        for (store_id, month), partial in partials.items():
+            key = (store_id if per_store else None, period_start(pd.Series([month]), period)[0])
+            merged[key] = merged[key].merge(partial) if key in merged else partial
+        for (store_id, start), partial in merged.items():
+            row = {
+                'grain': grain,
+                'store_id': store_id,
+                'period_start': start.date(),
+                'order_count': partial.order_count,
+                'distinct_customers': partial.customers.estimate(),
+            }
+            for suffix, q in ORDER_TOTAL_QUANTILES.items():
+                row[f'order_total_{suffix}_cents'] = round(partial.order_totals.quantile(q))
+            row['ticket_count'] = partial.ticket_count
+            row['tickets_per_order'] = partial.ticket_count / partial.order_count
+            for suffix, q in SENTIMENT_QUANTILES.items():
+                row[f'sentiment_{suffix}'] = partial.sentiment.quantile(q)
+            row['customers_hll'] = partial.customers.to_bytes()
+            row['order_total_digest'] = partial.order_totals.to_bytes()
+            row['sentiment_digest'] = partial.sentiment.to_bytes()
+            rows.append(row)
+
+    profile = pd.DataFrame(rows)
+
+    # Add the store_name for user-friendliness (null for the 'all_*' grains)
+    store_names = dict(zip(stores_df['store_id'].astype(str), stores_df['name'].astype(str)))
+    profile.insert(2, 'store_name', profile['store_id'].map(store_names))
+
+    profile['grain'] = pd.Categorical(profile['grain'], categories=list(PROFILE_GRAINS))
+    return profile.sort_values(['grain', 'store_id', 'period_start']).reset_index(drop=True)
+
+def calculate_order_profile(order_batches: Iterable[pd.DataFrame],
+                            ticket_batches: Iterable[pd.DataFrame], stores_df):
+    """
+    Profiles orders and support tickets per store and month, and rolls the
+    profile up to every grain in PROFILE_GRAINS, in one pass over each input.
+
+    Orders are streamed into per store and month sketches: a HyperLogLog
+    of customer_id and a t-digest of order_total_cents. Tickets are then
+    streamed into their order's store and month: a count (ticket rate)
+    and a t-digest of sentiment_score. Only the sketches and an
+    order_id -> (store, month) lookup are held in memory.
+
+    Args:
+        order_batches: Silver orders (order_id, ordered_at, store_id,
+            customer_id, order_total_cents), one DataFrame per batch.
+        ticket_batches: Silver support tickets (order_id, sentiment_score).
+        stores_df: Silver stores, for the store names.
+
+    Returns:
+        pd.DataFrame | None: One row per grain, store and period, with the
+        estimates and the sketches they came from; None without orders.
+    """
+    print("Transforming: Calculating order profile sketches...")
+
+    partials = {}
+    order_keys = _profile_orders(order_batches, partials)
+    if not partials:
+        print("Order profile transformation complete (no orders).")
+        return None
+    _profile_tickets(ticket_batches, order_keys, partials)
+
+    profile = _rollup(partials, stores_df)
+    print("Order profile transformation complete.")
+    return profile
@@ -0,0 +1,84 @@
+"""This module provides transformation functions for the multi-granularity
+sales rollup cube (sum, count and AOV at several store/time levels)."""
+import pandas as pd
+from shared.categoricals import align_categories
+from .periods import period_start
+
+# Grouping sets of the cube: grain name -> (per store?, period)
+# Periods: see periods.py
+ROLLUP_GRAINS = {
+    "store_day": (True, "D"),
+    "store_week": (True, "W"),
+    "store_month": (True, "M"),
+    "all_month": (False, "M"),
+    "all_year": (False, "Y"),
+}
+
+def calculate_sales_rollup(orders_df, stores_df):
+    """
+    Calculates order sum, count and AOV at every grain in ROLLUP_GRAINS.
+
+    Silver orders are scanned once, into per store and day partials.
+    Every coarser grain is then rolled up from those partials (sums of
+    sums and counts), like SQL GROUPING SETS. Rows of the 'all_*' grains
+    have a null store_id/store_name.
+    """
+    print("Transforming: Calculating sales rollup cube...")
+
+    # 1. The single scan: partial sums and counts per store and day
+    ordered_at = pd.to_datetime(orders_df['ordered_at'])
+    daily = (
+        orders_df[['store_id', 'order_total_cents']]
+        .assign(day=ordered_at.dt.normalize())
+        .groupby(['store_id', 'day'], observed=True)['order_total_cents']
+        .agg(order_total_cents='sum', order_count='size')
+        .reset_index()
+    )
+
+    # 2. Roll the partials up to each grain
+    levels = []
+    for grain, (per_store, period) in ROLLUP_GRAINS.items():
+        partials = daily.assign(period_start=period_start(daily['day'], period))
+        keys = ['store_id', 'period_start'] if per_store else ['period_start']
+        level = (
+            partials.groupby(keys, observed=True)[['order_total_cents', 'order_count']]
+            .sum()
+            .reset_index()
+        )
+        if not per_store: # Null store, of the same (possibly categorical) dtype
+            level['store_id'] = pd.Series(None, index=level.index, dtype=daily['store_id'].dtype)
+        level['grain'] = grain
+        levels.append(level)
+
+    rollup = pd.concat(levels, ignore_index=True)
+
+    # 3. AOV from the rolled-up sum and count, rounded to the nearest cent
+    rollup['average_order_value_cents'] = (
+        rollup['order_total_cents'] / rollup['order_count']
+    ).round(0).astype(int)
+
+    # Join with stores_df to add the store_name for user-friendliness
+    rollup, stores = align_categories(rollup, stores_df[['store_id', 'name']], 'store_id')
+    rollup = rollup.merge(
+        stores,
+        on='store_id',
+        how='left'
+    ).rename(columns={'name': 'store_name'})
+
+    # Keep the cube compact: dates instead of timestamps, categorical grain
+    rollup['period_start'] = rollup['period_start'].dt.date
+    rollup['grain'] = pd.Categorical(rollup['grain'], categories=list(ROLLUP_GRAINS))
+    rollup = rollup.sort_values(['grain', 'store_id', 'period_start']).reset_index(drop=True)
+
+    final_rollup = rollup[[
+        'grain',
+        'store_id',
+        'store_name',
+        'period_start',
+        'order_count',
+        'order_total_cents',
+        'average_order_value_cents'
+    ]]
+
+    print("Sales rollup transformation complete.")
+    return final_rollup
@@ -1,4 +1,5 @@
 """This module provides transformation functions for calculating ticket summaries per order."""
+from shared.categoricals import align_categories
 
 def calculate_orders_ticket_summary(orders_df, tickets_df, customers_df, stores_df):
     """
@@ -33,8 +34,9 @@ def calculate_orders_ticket_summary(orders_df, tickets_df, customers_df, stores_
     ).rename(columns={'name': 'customer_name'})
 
     # 6. Join with stores_df to get store_name
+    base_df, stores = align_categories(base_df, stores_df[['store_id', 'name']], 'store_id')
     base_df = base_df.merge(
-        stores_df[['store_id', 'name']],
+        stores,
         on='store_id',
         how='left'
     ).rename(columns={'name': 'store_name'})
@@ -1,45 +1,157 @@
 """ --- GOLD ASSETS (Fixed) ---"""
 import pandas as pd
-from dagster import asset, AssetKey, AssetIn
+from dagster import asset, AssetKey, AssetIn, Config
 from gold.transform.transform_aov import calculate_aov_by_store_month
 from gold.transform.transform_tickets import calculate_orders_ticket_summary
+from gold.transform.transform_rollup import calculate_sales_rollup
+from gold.transform.transform_profile import calculate_order_profile
+from gold.transform.chunked import (
+    DEFAULT_BATCH_SIZE,
+    calculate_aov_by_store_month_chunked,
+    calculate_orders_ticket_summary_chunked
+)
+from .resources import DimensionCacheResource
+from .lazy_table import LazyParquetTable
+from .instrumentation import instrumented
+from .memoization import memoized
+
+class AggregationConfig(Config):
+    """
+    Per-asset choice of aggregation path.
+    'chunked' streams the silver inputs one record batch at a time
+    (for larger-than-RAM data) instead of loading them in full.
+    """
+    chunked: bool = False
+    batch_size: int = DEFAULT_BATCH_SIZE
 
+# Inputs the asset may stream; the IO manager hands over a LazyParquetTable
+LAZY = {"load_as": "lazy"}
+
+# Store and customer names come from the shared dimension cache,
+# so the dimension tables are declared as plain dependencies.
 @asset(
     key=AssetKey(["gold", "aov_by_store_month"]),
     ins={
-        "in_orders": AssetIn(key=AssetKey(["silver", "orders"])),
-        "in_stores": AssetIn(key=AssetKey(["silver", "stores"]))
+        "in_orders": AssetIn(key=AssetKey(["silver", "orders"]), metadata=LAZY)
     },
+    deps=[AssetKey(["silver", "stores"])],
     group_name="gold",
     io_manager_key="gold_io_manager"
 )
-def gold_aov_by_store_month(in_orders: pd.DataFrame, in_stores: pd.DataFrame) -> pd.DataFrame:
+@memoized
+@instrumented
+def gold_aov_by_store_month(
+    config: AggregationConfig,
+    in_orders: LazyParquetTable,
+    dimensions: DimensionCacheResource
+) -> pd.DataFrame:
     """Calculates the Average Order Value (AOV) by store and month."""
-    return calculate_aov_by_store_month(in_orders, in_stores)
+    cache = dimensions.get_cache()
+    if config.chunked:
+        order_batches = in_orders.iter_batches(
+            columns=['store_id', 'ordered_at', 'order_total_cents'],
+            batch_size=config.batch_size
+        )
+        return calculate_aov_by_store_month_chunked(order_batches, cache.stores())
+
+    return calculate_aov_by_store_month(in_orders.to_pandas(), cache.stores())
 
 @asset(
     key=AssetKey(["gold", "orders_ticket_summary"]),
     ins={
-        "in_orders": AssetIn(key=AssetKey(["silver", "orders"])),
-        "in_tickets": AssetIn(key=AssetKey(["silver", "support_tickets"])),
-        "in_customers": AssetIn(key=AssetKey(["silver", "customers"])),
-        "in_stores": AssetIn(key=AssetKey(["silver", "stores"]))
+        "in_orders": AssetIn(key=AssetKey(["silver", "orders"]), metadata=LAZY),
+        "in_tickets": AssetIn(key=AssetKey(["silver", "support_tickets"]), metadata=LAZY)
     },
+    deps=[AssetKey(["silver", "customers"]), AssetKey(["silver", "stores"])],
     group_name="gold",
     io_manager_key="gold_io_manager"
 )
+@memoized
+@instrumented
 def gold_orders_ticket_summary(
+    config: AggregationConfig,
+    in_orders: LazyParquetTable,
+    in_tickets: LazyParquetTable,
+    dimensions: DimensionCacheResource
+):
+    """
+    Generates a summary of orders and their associated support tickets.
+
+    Returns:
+        pd.DataFrame | pa.RecordBatchReader: Chunked, the summary is
+        streamed to the IO manager. (Not annotated: Dagster can't check
+        a union of both.)
+    """
+    cache = dimensions.get_cache()
+    if config.chunked:
+        return calculate_orders_ticket_summary_chunked(
+            in_orders.iter_batches(
+                columns=['order_id', 'ordered_at', 'store_id', 'customer_id'],
+                batch_size=config.batch_size
+            ),
+            in_tickets.iter_batches(columns=['order_id'], batch_size=config.batch_size),
+            cache.customers(),
+            cache.stores(),
+            orders_sorted_by=in_orders.sorted_by
+        )
+
+    return calculate_orders_ticket_summary(
+        in_orders.to_pandas(),
+        in_tickets.to_pandas(),
+        cache.customers(),
+        cache.stores()
+    )
+
+@asset(
+    key=AssetKey(["gold", "sales_rollup"]),
+    ins={
+        "in_orders": AssetIn(key=AssetKey(["silver", "orders"]))
+    },
+    deps=[AssetKey(["silver", "stores"])],
+    group_name="gold",
+    io_manager_key="gold_io_manager"
+)
+@memoized
+@instrumented
+def gold_sales_rollup(
     in_orders: pd.DataFrame,
-    in_tickets: pd.DataFrame,
-    in_customers: pd.DataFrame,
-    in_stores: pd.DataFrame
+    dimensions: DimensionCacheResource
 ) -> pd.DataFrame:
-    """Generates a summary of orders and their associated support tickets."""
-    return calculate_orders_ticket_summary(
-        in_orders,
-        in_tickets,
-        in_customers,
-        in_stores
+    """Pre-aggregates order sum, count and AOV at several store/time grains."""
+    cache = dimensions.get_cache()
+    return calculate_sales_rollup(in_orders, cache.stores())
+
+@asset(
+    key=AssetKey(["gold", "order_profile"]),
+    ins={
+        "in_orders": AssetIn(key=AssetKey(["silver", "orders"]), metadata=LAZY),
+        "in_tickets": AssetIn(key=AssetKey(["silver", "support_tickets"]), metadata=LAZY)
+    },
+    deps=[AssetKey(["silver", "stores"])],
+    group_name="gold",
+    io_manager_key="gold_io_manager"
+)
+@memoized
+@instrumented
+def gold_order_profile(
+    in_orders: LazyParquetTable,
+    in_tickets: LazyParquetTable,
+    dimensions: DimensionCacheResource
+) -> pd.DataFrame:
+    """
+    Profiles orders and tickets per store and month with mergeable sketches:
+    distinct customers, order total and sentiment quantiles, ticket rate.
+    Both inputs are streamed once, one record batch at a time.
+    """
+    cache = dimensions.get_cache()
+    return calculate_order_profile(
+        in_orders.iter_batches(
+            columns=['order_id', 'ordered_at', 'store_id', 'customer_id', 'order_total_cents'],
+            batch_size=DEFAULT_BATCH_SIZE
+        ),
+        in_tickets.iter_batches(columns=['order_id', 'sentiment_score'], batch_size=DEFAULT_BATCH_SIZE),
+        cache.stores()
     )
 
-gold_assets = [gold_aov_by_store_month, gold_orders_ticket_summary]
+gold_assets = [gold_aov_by_store_month, gold_orders_ticket_summary, gold_sales_rollup,
+               gold_order_profile]
@@ -0,0 +1,166 @@
+"""
+Per-asset performance instrumentation.
+
+Every asset compute and every IO manager load/dump is measured (wall
+time, CPU time, peak RSS, rows, bytes) and the numbers are attached as
+Dagster metadata, so they can be charted per asset over time. If the
+MEDALLION_TRACE_DIR environment variable is set, each measurement is also
+appended to a Chrome trace file per run: <dir>/<run_id>.json, which opens
+in chrome://tracing or https://ui.perfetto.dev.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import pandas as pd
+from dagster import AssetExecutionContext, DagsterInvariantViolationError
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+# Directory of the per-run trace files; tracing is off if unset
+TRACE_DIR_ENV = "MEDALLION_TRACE_DIR"
+
+_trace_lock = threading.Lock()
+
+def _peak_rss_bytes() -> int | None:
+    """High-water mark of this process' resident set size, if the OS reports it."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024 # KiB on Linux
+
+def write_trace_event(run_id: str, name: str, category: str, start_us: int,
+                      duration_us: int, args: dict):
+    """
+    Appends one complete ('X') event to the run's Chrome trace file.
+
+    The file uses the JSON Array Format without the closing bracket,
+    which the format allows, so the step processes of a run can all
+    append to it without coordinating. Timestamps are wall-clock
+    microseconds, so events from different processes line up.
+    """
+    trace_dir = os.environ.get(TRACE_DIR_ENV)
+    if not trace_dir:
+        return
+
+    event = {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": start_us,
+        "dur": duration_us,
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        "args": args,
+    }
+    os.makedirs(trace_dir, exist_ok=True)
+    path = os.path.join(trace_dir, f"{run_id}.json")
+    with _trace_lock:
+        try:
+            with open(path, "x", encoding="utf-8") as trace_file:
+                trace_file.write("[\n")
+        except FileExistsError:
+            pass
+        # One write per event, so appends from several processes don't interleave
+        with open(path, "a", encoding="utf-8") as trace_file:
+            trace_file.write(json.dumps(event, default=str) + ",\n")
+
+class Span:
+    """
+    Measures one unit of work in a 'with' block.
+
+    Counters (rows, bytes) are set inside the block with count(); on exit
+    the span is written to the run's trace, and metadata() returns the
+    measurements as Dagster metadata, prefixed with 'prefix'.
+    """
+
+    def __init__(self, name: str, prefix: str, run_id: str = "adhoc"):
+        self.name = name
+        self.prefix = prefix
+        self.run_id = run_id
+        self.counters = {}
+        self.wall_s = self.cpu_s = None
+        self.peak_rss_bytes = None
+
+    def count(self, **counters):
+        """Records counters such as rows_out=... or bytes_written=... (None is skipped)."""
+        self.counters.update({key: value for key, value in counters.items() if value is not None})
+
+    def __enter__(self):
+        self._start_us = time.time_ns() // 1000
+        self._wall_started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.wall_s = time.perf_counter() - self._wall_started
+        self.cpu_s = time.process_time() - self._cpu_started
+        self.peak_rss_bytes = _peak_rss_bytes()
+
+        args = self.metadata()
+        if exc_type is not None:
+            args["error"] = exc_type.__name__
+        write_trace_event(self.run_id, self.name, self.prefix, self._start_us,
+                          int(self.wall_s * 1_000_000), args)
+        return False
+
+    def metadata(self) -> dict:
+        """The measurements, e.g. {'compute_wall_s': ..., 'rows_out': ...}."""
+        metadata = {
+            f"{self.prefix}_wall_s": round(self.wall_s, 6),
+            f"{self.prefix}_cpu_s": round(self.cpu_s, 6),
+        }
+        if self.peak_rss_bytes is not None:
+            metadata[f"{self.prefix}_peak_rss_bytes"] = self.peak_rss_bytes
+        metadata.update(self.counters)
+        return metadata
+
+def row_count(value) -> int | None:
+    """Rows of an asset input or output: DataFrames and lazy Parquet handles."""
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    return getattr(value, "num_rows", None)
+
+def current_context() -> AssetExecutionContext | None:
+    """The running asset's context, or None when called outside Dagster."""
+    try:
+        return AssetExecutionContext.get()
+    except DagsterInvariantViolationError:
+        return None
+
+def instrumented(compute_fn):
+    """
+    Measures an asset's compute function and adds the result to the
+    materialization metadata: compute_wall_s, compute_cpu_s,
+    compute_peak_rss_bytes, rows_in, rows_out and out_memory_bytes.
+
+    Apply it below @asset. The step's IO manager adds the write metrics.
+    """
+    @functools.wraps(compute_fn)
+    def wrapper(*args, **kwargs):
+        context = current_context()
+        run_id = context.run_id if context is not None else "adhoc"
+        name = "/".join(context.asset_key.path) if context is not None else compute_fn.__name__
+
+        with Span(name, "compute", run_id) as span:
+            result = compute_fn(*args, **kwargs)
+            input_rows = [row_count(value) for value in (*args, *kwargs.values())]
+            input_rows = [rows for rows in input_rows if rows is not None]
+            span.count(
+                rows_in=sum(input_rows) if input_rows else None,
+                rows_out=row_count(result),
+                # Shallow size: deep=True would scan every string
+                out_memory_bytes=(int(result.memory_usage(index=True).sum())
+                                  if isinstance(result, pd.DataFrame) else None),
+            )
+
+        if context is not None:
+            context.add_output_metadata(span.metadata())
+        return result
+
+    return wrapper
@@ -0,0 +1,59 @@
+"""Lazy handle to a Parquet asset, returned by ParquetIOManager on request."""
+import pandas as pd
+import pyarrow.parquet as pq
+from gold.transform.chunked import DEFAULT_BATCH_SIZE, iter_parquet_batches
+from shared.parquet_layout import dictionary_columns
+from .read_cache import ParquetReadCache
+
+class LazyParquetTable:
+    """
+    A not-yet-loaded Parquet input.
+
+    Assets ask for it with AssetIn(metadata={"load_as": "lazy"}) and then
+    decide how to read it: in full (through the read cache, if any) or
+    as a stream of record batches for out-of-core processing.
+    """
+
+    def __init__(self, path: str, read_cache: ParquetReadCache | None = None,
+                 run_id: str = "adhoc"):
+        self.path = path
+        self._read_cache = read_cache
+        self._run_id = run_id
+
+    def to_pandas(self, columns=None) -> pd.DataFrame:
+        """Reads the whole table (or just 'columns') into a DataFrame."""
+        if self._read_cache is None:
+            return pd.read_parquet(self.path, columns=columns,
+                                   read_dictionary=dictionary_columns(self.path))
+
+        table, _ = self._read_cache.read(self.path, run_id=self._run_id)
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas()
+
+    @property
+    def num_rows(self) -> int:
+        """Row count from the Parquet footer (no data is read)."""
+        return pq.ParquetFile(self.path).metadata.num_rows
+
+    @property
+    def sorted_by(self) -> tuple:
+        """Columns the file is sorted by (ascending), from its footer (no data is read)."""
+        metadata = pq.ParquetFile(self.path).metadata
+        if metadata.num_row_groups == 0 or not metadata.row_group(0).sorting_columns:
+            return ()
+        ordering, _ = pq.SortingColumn.to_ordering(metadata.schema.to_arrow_schema(),
+                                                   metadata.row_group(0).sorting_columns)
+        columns = []
+        for col, order in ordering:
+            if order != "ascending":
+                break
+            columns.append(col)
+        return tuple(columns)
+
+    def iter_batches(self, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+        """Streams the table as DataFrames of at most 'batch_size' rows."""
+        return iter_parquet_batches(self.path, columns=columns, batch_size=batch_size)
+
+    def __repr__(self):
+        return f"LazyParquetTable({self.path!r})"
@@ -0,0 +1,336 @@
+"""
+Data-version memoization: unchanged assets are not recomputed.
+
+An asset's data version is a hash of the code version of its compute
+function (with the transform modules it uses) and the content versions of its upstream files (for a raw
+download directory, only the files the asset declares it reads in its
+'raw_files' metadata, if it does). If it matches
+the version recorded when the asset's file was last written (and that
+file is still the one written), the transform is skipped and the IO
+manager keeps the existing file. The decision is made when the IO manager
+loads the asset's first input, so a skipped asset reads none of them. Why an asset was computed or skipped
+is recorded as 'memo_status' / 'memo_reason' metadata.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+import types
+from typing import NamedTuple
+from datetime import datetime, timezone
+import pandas as pd
+from dagster import AssetKey, DagsterInvariantViolationError
+from bronze.compression import find_raw_file
+from shared.fingerprint import content_version, directory_version
+from shared.table_format import table_version
+from .instrumentation import current_context
+
+# Functions from these packages count towards an asset's code version
+PROJECT_PACKAGES = ("bronze", "silver", "gold", "shared", "medallion_dagster")
+
+# Modules of these packages count as a whole (with the project modules
+# they import), so a change to anything an asset's transform uses (a
+# helper called as module.attribute, a class, a constant) is seen. Asset
+# modules are followed function by function instead.
+TRANSFORM_PACKAGES = ("bronze", "silver", "gold", "shared")
+
+# Run tag that recomputes every asset regardless of its memo
+FORCE_TAG = "medallion/force_recompute"
+
+# Extract assets are downloads into these raw directories (PathConfig fields)
+RAW_SOURCES = {
+    "raw_csv_files": "raw_local_path",
+    "raw_jsonl_files": "raw_azure_path",
+}
+
+# Asset metadata listing the raw files (logical names) an asset reads
+RAW_FILES_METADATA = "raw_files"
+
+# Directory of each layer's Parquet files (PathConfig fields)
+LAYER_PATHS = {
+    "bronze": "bronze_parquet_path",
+    "silver": "silver_path",
+    "gold": "gold_path",
+}
+
+class UnchangedFrame(pd.DataFrame):
+    """
+    Empty DataFrame returned by a memoized asset whose data version did
+    not change. It passes the output's DataFrame type check; the IO
+    manager recognizes it and keeps the existing file.
+    """
+
+class MemoDecision(NamedTuple):
+    """Whether an asset is computed in a run, and the versions it was decided on."""
+    reason: str | None # Why it is computed; None if it is skipped
+    data_version: str
+    code_version: str
+    inputs: dict
+    memo: dict | None
+
+# Memo records computed in this process, waiting for the IO manager's write
+_pending = {}
+
+# Decisions of this process: (run_id, asset key) -> MemoDecision
+_decisions = {}
+
+def _path_config():
+    """The pipeline's paths (imported late: resources imports this module)."""
+    # pylint: disable-next=C0415
+    from .resources import PathConfig
+    return PathConfig()
+
+# --- Code versions ---
+def _top_package(name: str) -> str:
+    return name.split(".")[0]
+
+def _referenced_globals(func):
+    """The global values 'func' refers to by name, in nested code too."""
+    code_objects = [func.__code__]
+    while code_objects: # Nested functions, lambdas and comprehensions too
+        code = code_objects.pop()
+        code_objects.extend(const for const in code.co_consts if isinstance(const, types.CodeType))
+        for name in code.co_names:
+            if name in func.__globals__:
+                yield func.__globals__[name]
+
+def _transform_module(value) -> types.ModuleType | None:
+    """The transform module a global is, or is defined in (see TRANSFORM_PACKAGES)."""
+    if isinstance(value, types.ModuleType):
+        module = value
+    elif isinstance(value, (types.FunctionType, type)):
+        module = sys.modules.get(value.__module__)
+    else:
+        return None
+    if module is None or _top_package(module.__name__) not in TRANSFORM_PACKAGES:
+        return None
+    return module
+
+def _transform_modules(module: types.ModuleType, seen: set):
+    """Adds 'module' and, recursively, the transform modules it imports to 'seen'."""
+    if module in seen:
+        return
+    seen.add(module)
+    for value in list(vars(module).values()):
+        imported = _transform_module(value)
+        if imported is not None:
+            _transform_modules(imported, seen)
+
+def _code_units(func) -> tuple[set, set]:
+    """
+    The asset-layer functions 'func' calls by name (recursively, itself
+    included) and the transform modules they use.
+    """
+    functions, modules = set(), set()
+    pending = [func]
+    while pending:
+        function = inspect.unwrap(pending.pop())
+        if function in functions:
+            continue
+        module = _transform_module(function)
+        if module is not None:
+            _transform_modules(module, modules)
+            continue
+        functions.add(function)
+        for value in _referenced_globals(function):
+            module = _transform_module(value)
+            if module is not None:
+                _transform_modules(module, modules)
+            elif (isinstance(value, types.FunctionType)
+                  and _top_package(value.__module__) in PROJECT_PACKAGES):
+                pending.append(value)
+    return functions, modules
+
+def _module_source(module: types.ModuleType) -> str:
+    if not getattr(module, "__file__", None): # Namespace package
+        return ""
+    with open(module.__file__, encoding="utf-8") as source_file:
+        return source_file.read()
+
+@functools.cache
+def code_version(func) -> str:
+    """
+    Hash of the source of 'func', of every asset-layer function it calls
+    by name, and of the whole transform modules they use.
+    """
+    digest = hashlib.sha256()
+    functions, modules = _code_units(func)
+    for function in sorted(functions, key=lambda f: (f.__module__, f.__qualname__)):
+        digest.update(f"{function.__module__}.{function.__qualname__}\n".encode())
+        digest.update(inspect.getsource(function).encode())
+    for module in sorted(modules, key=lambda m: m.__name__):
+        digest.update(f"{module.__name__}\n".encode())
+        digest.update(_module_source(module).encode())
+    return digest.hexdigest()[:16]
+
+# --- Input versions ---
+def asset_location(key: AssetKey, paths) -> str | None:
+    """Where an asset's data lives: its Parquet file, or the raw download directory."""
+    if len(key.path) == 1 and key.path[0] in RAW_SOURCES:
+        return getattr(paths, RAW_SOURCES[key.path[0]])
+    if len(key.path) >= 2 and key.path[0] in LAYER_PATHS:
+        return os.path.join(getattr(paths, LAYER_PATHS[key.path[0]]), f"{key.path[-1]}.parquet")
+    return None
+
+def location_version(location: str | None) -> str | None:
+    """Content version of a raw directory or a table, None if it does not exist."""
+    if location is None:
+        return None
+    if os.path.isdir(location):
+        return directory_version(location)
+    return table_version(location) # Fragmented tables have no single file
+
+def raw_file_version(directory: str, name: str) -> str | None:
+    """Content version of raw file 'name' as stored, None if it does not exist."""
+    path = find_raw_file(directory, name)
+    return content_version(path) if os.path.exists(path) else None
+
+def input_versions(key: AssetKey, assets_def, paths) -> dict:
+    """
+    Content versions of an asset's upstream data. An asset that reads only
+    some files of a raw download directory lists them in its 'raw_files'
+    metadata, so a change to another file leaves it unchanged.
+    """
+    raw_files = assets_def.metadata_by_key.get(key, {}).get(RAW_FILES_METADATA)
+    inputs = {}
+    for upstream in sorted(assets_def.asset_deps[key], key=lambda k: k.path):
+        location = asset_location(upstream, paths)
+        if raw_files and len(upstream.path) == 1 and upstream.path[0] in RAW_SOURCES:
+            for name in raw_files:
+                inputs[f"{upstream.to_user_string()}/{name}"] = raw_file_version(location, name)
+        else:
+            inputs[upstream.to_user_string()] = location_version(location)
+    return inputs
+
+# --- Memo store ---
+def _memo_path(key: AssetKey, paths) -> str:
+    return os.path.join(paths.cache_path, "memo", *key.path) + ".json"
+
+def _read_memo(key: AssetKey, paths) -> dict | None:
+    try:
+        with open(_memo_path(key, paths), encoding="utf-8") as memo_file:
+            return json.load(memo_file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def record_output(run_id: str, key: AssetKey, path: str, paths=None):
+    """
+    Called by the IO manager after writing an asset: stores the pending
+    memo record together with the version of the file just written.
+    """
+    record = _pending.pop((run_id, key), None)
+    if record is None:
+        return
+    paths = paths or _path_config()
+    record["output_version"] = table_version(path)
+    memo_path = _memo_path(key, paths)
+    os.makedirs(os.path.dirname(memo_path), exist_ok=True)
+    with open(memo_path + ".tmp", "w", encoding="utf-8") as memo_file:
+        json.dump(record, memo_file, indent=2)
+    os.replace(memo_path + ".tmp", memo_path)
+
+def _compute_reason(memo: dict | None, code: str, inputs: dict,
+                    output_location: str | None) -> str | None:
+    """Why the asset has to be computed, or None if it is unchanged."""
+    if memo is None:
+        return "no previous version recorded"
+    if memo["code_version"] != code:
+        return "code changed"
+    changed = sorted(key for key in inputs.keys() | memo["inputs"].keys()
+                     if inputs.get(key) != memo["inputs"].get(key))
+    if changed:
+        return f"inputs changed: {', '.join(changed)}"
+    if location_version(output_location) != memo.get("output_version"):
+        return "output file missing or modified since it was written"
+    return None
+
+def memo_decision(run_id: str, key: AssetKey, assets_def, compute_fn, tags) -> MemoDecision:
+    """
+    Decides whether an asset is computed in a run (once per run: the IO
+    manager asks before loading its inputs, then the asset itself).
+    """
+    if (run_id, key) in _decisions:
+        return _decisions[(run_id, key)]
+
+    paths = _path_config()
+    code = code_version(compute_fn)
+    inputs = input_versions(key, assets_def, paths)
+    data_version = hashlib.sha256(
+        json.dumps({"code": code, "inputs": inputs}, sort_keys=True).encode()
+    ).hexdigest()[:16]
+
+    memo = _read_memo(key, paths)
+    if tags.get(FORCE_TAG) == "true":
+        reason = f"run tag {FORCE_TAG}"
+    else:
+        reason = _compute_reason(memo, code, inputs, asset_location(key, paths))
+
+    decision = MemoDecision(reason, data_version, code, inputs, memo)
+    _decisions[(run_id, key)] = decision
+    return decision
+
+def skips_inputs(input_context) -> bool:
+    """
+    True if the asset loading an input is memoized and unchanged in this
+    run, so the IO manager need not read the input.
+    """
+    try:
+        step_context = input_context.step_context
+        compute_fn = getattr(input_context.op_def.compute_fn, "decorated_fn", None)
+    except DagsterInvariantViolationError: # Built outside a run (e.g. in tests)
+        return False
+    memoized_fn = getattr(compute_fn, "memoized_fn", None)
+    assets_def = step_context.assets_def
+    if memoized_fn is None or assets_def is None or len(assets_def.keys) != 1:
+        return False
+    decision = memo_decision(step_context.run_id, assets_def.key, assets_def,
+                             memoized_fn, step_context.dagster_run.tags)
+    return decision.reason is None
+
+def memoized(compute_fn):
+    """
+    Skips an asset's compute when its data version is unchanged.
+
+    Apply it below @asset (and above @instrumented, so skipped computes
+    are not measured). The asset must return a DataFrame (or
+    TableFragments) written by ParquetIOManager, which records the memo
+    after each write, and hands a skipped asset empty inputs instead of
+    reading them (see skips_inputs).
+    """
+    @functools.wraps(compute_fn)
+    def wrapper(*args, **kwargs):
+        context = current_context()
+        if context is None: # Called directly, outside Dagster
+            return compute_fn(*args, **kwargs)
+
+        key = context.asset_key
+        decision = memo_decision(context.run_id, key, context.assets_def, compute_fn, context.run.tags)
+        _decisions.pop((context.run_id, key), None)
+
+        if decision.reason is None:
+            message = f"inputs and code unchanged since run {decision.memo['run_id']}"
+            context.log.info(f"Skipping {key.to_user_string()}: {message}")
+            context.add_output_metadata({
+                "memo_status": "skipped", "memo_reason": message, "data_version": decision.data_version,
+            })
+            return UnchangedFrame()
+
+        context.log.info(f"Computing {key.to_user_string()}: {decision.reason}")
+        _pending[(context.run_id, key)] = {
+            "data_version": decision.data_version,
+            "code_version": decision.code_version,
+            "inputs": decision.inputs,
+            "run_id": context.run_id,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        context.add_output_metadata({
+            "memo_status": "computed", "memo_reason": decision.reason,
+            "data_version": decision.data_version,
+        })
+        return compute_fn(*args, **kwargs)
+
+    # Lets the IO manager find the memoized function (see skips_inputs)
+    wrapper.memoized_fn = compute_fn
+    return wrapper
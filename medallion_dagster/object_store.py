@@ -0,0 +1,493 @@
+"""
+Parquet IO manager for object stores (S3, Azure Blob, GCS, or any fsspec
+filesystem, e.g. memory:// in tests).
+
+- Writes go to a local temp file first and are uploaded in one put_file
+  call, which S3, Azure and GCS filesystems split into concurrent
+  multipart/block uploads.
+- Reads fetch only the Parquet footer and the column chunks that are
+  needed, as byte ranges requested in parallel.
+- Fetched ranges are kept in a size-bounded local disk cache keyed by the
+  object's version (ETag, or mtime and size), so a rewritten object is
+  never served from stale cache entries.
+"""
+import contextlib
+import hashlib
+import inspect
+import io
+import os
+import shutil
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dagster import io_manager, Field, Noneable, Permissive
+from upath import UPath
+from gold.transform.chunked import DEFAULT_BATCH_SIZE
+from shared.fingerprint import PARQUET_MAGIC
+from shared.parquet_layout import TableLayout, low_cardinality_columns, write_parquet
+from shared.table_format import TableFragments
+from .lazy_table import LazyParquetTable
+from .resources import ParquetIOManager, _is_local
+
+# Default location and size of the local range cache (1 GB)
+DEFAULT_CACHE_DIR = "data/cache/object_store"
+DEFAULT_CACHE_BYTES = 1024 * 1024 * 1024
+
+# Parallel requests per transfer, and the size of each uploaded/fetched part
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+# The first read of a file fetches this much of its tail, which usually
+# holds the whole footer (metadata + length + magic)
+FOOTER_PREFETCH_BYTES = 64 * 1024
+
+# Keys of fsspec's info() that identify one version of an object, by store
+VERSION_KEYS = ("ETag", "etag", "md5Hash")
+MTIME_KEYS = ("LastModified", "last_modified", "mtime", "updated", "created")
+
+def object_version(fs, path: str) -> tuple[str, int]:
+    """
+    Returns (version, size) of an object: its ETag where the store has
+    one, else its modification time and size.
+    """
+    fs.invalidate_cache(path) # Listings are cached; the version must be fresh
+    info = fs.info(path)
+    size = info["size"]
+    for key in VERSION_KEYS:
+        if info.get(key):
+            return str(info[key]).strip('"'), size
+    for key in MTIME_KEYS:
+        if info.get(key):
+            return f"{info[key]}:{size}", size
+    return f"size:{size}", size
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()[:16]
+
+# --- Local range cache ---
+class RangeCache:
+    """
+    Size-bounded disk cache of byte ranges of remote objects.
+
+    Entries live at <cache_dir>/<hash(path)>/<hash(version)>/<start>-<end>,
+    so they survive restarts and can be shared by the step processes of a
+    run. Storing a range of a new version drops the object's older
+    versions; beyond 'max_bytes' the least recently used ranges go.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # file -> size, least recently used first
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        files = []
+        for directory, _, names in os.walk(cache_dir):
+            for name in names:
+                file_path = os.path.join(directory, name)
+                stat = os.stat(file_path)
+                files.append((stat.st_atime, file_path, stat.st_size))
+        for _, file_path, size in sorted(files):
+            self._entries[file_path] = size
+            self._current_bytes += size
+
+    def _object_dir(self, path: str) -> str:
+        return os.path.join(self.cache_dir, _digest(path))
+
+    def _range_file(self, path: str, version: str, start: int, end: int) -> str:
+        return os.path.join(self._object_dir(path), _digest(version), f"{start}-{end}")
+
+    def get(self, path: str, version: str, start: int, end: int) -> bytes | None:
+        """The bytes [start, end) of that version of the object, if cached."""
+        file_path = self._range_file(path, version, start, end)
+        try:
+            with open(file_path, "rb") as range_file:
+                data = range_file.read()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            if file_path in self._entries:
+                self._entries.move_to_end(file_path)
+        return data
+
+    def put(self, path: str, version: str, start: int, data: bytes):
+        """Stores the bytes of a range, evicting older versions and LRU ranges."""
+        if len(data) > self.max_bytes:
+            return
+        file_path = self._range_file(path, version, start, start + len(data))
+        version_dir = os.path.dirname(file_path)
+        self._drop_versions(path, keep=version_dir)
+
+        os.makedirs(version_dir, exist_ok=True)
+        tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as range_file:
+            range_file.write(data)
+        os.replace(tmp_path, file_path) # Readers never see a partial range
+
+        with self._lock:
+            self._current_bytes += len(data) - self._entries.pop(file_path, 0)
+            self._entries[file_path] = len(data)
+            while self._current_bytes > self.max_bytes and self._entries:
+                evicted, size = self._entries.popitem(last=False)
+                self._current_bytes -= size
+                with contextlib.suppress(FileNotFoundError): # Removed by another process
+                    os.remove(evicted)
+
+    def invalidate(self, path: str):
+        """Drops every cached range of an object."""
+        self._drop_versions(path, keep=None)
+
+    def _drop_versions(self, path: str, keep: str | None):
+        object_dir = self._object_dir(path)
+        if not os.path.isdir(object_dir):
+            return
+        for name in os.listdir(object_dir):
+            version_dir = os.path.join(object_dir, name)
+            if version_dir == keep:
+                continue
+            with self._lock:
+                for file_path in [f for f in self._entries if f.startswith(version_dir + os.sep)]:
+                    self._current_bytes -= self._entries.pop(file_path)
+            shutil.rmtree(version_dir, ignore_errors=True)
+
+# --- Ranged reads ---
+class _RangeFile(io.RawIOBase):
+    """
+    Read-only, seekable file over the byte ranges fetched for an object,
+    handed to pyarrow. Reads outside those ranges are fetched on demand.
+    """
+
+    def __init__(self, remote):
+        super().__init__()
+        self._remote = remote
+        self._segments = [] # (start, bytes), sorted by start
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self._remote.size}[whence]
+        self._position = base + offset
+        return self._position
+
+    def add(self, start: int, data: bytes):
+        """Makes a fetched range readable."""
+        self._segments.append((start, data))
+        self._segments.sort(key=lambda segment: segment[0])
+
+    def covers(self, start: int, end: int) -> bool:
+        """True if [start, end) lies within one fetched range."""
+        return any(seg_start <= start and end <= seg_start + len(seg)
+                   for seg_start, seg in self._segments)
+
+    def clear(self):
+        """Drops the fetched ranges (e.g. those of a row group already read)."""
+        self._segments = []
+
+    def read(self, size=-1):
+        end = self._remote.size if size is None or size < 0 else min(self._position + size, self._remote.size)
+        data = self._slice(self._position, end) if end > self._position else b""
+        self._position = end
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def _slice(self, start: int, end: int) -> bytes:
+        parts, position = [], start
+        for seg_start, seg in self._segments:
+            seg_end = seg_start + len(seg)
+            if seg_end <= position:
+                continue
+            if seg_start >= end:
+                break
+            if seg_start > position: # A gap between fetched ranges
+                parts.append(self._remote.fetch(position, seg_start))
+                position = seg_start
+            parts.append(seg[position - seg_start:min(end, seg_end) - seg_start])
+            position = min(end, seg_end)
+            if position >= end:
+                break
+        if position < end:
+            parts.append(self._remote.fetch(position, end))
+        return b"".join(parts)
+
+class RemoteParquetFile:
+    """
+    A Parquet object read with ranged requests.
+
+    Opening it fetches the footer only; read_table() and iter_batches()
+    then fetch just the column chunks of the requested columns, in
+    parallel, through the local range cache.
+    """
+
+    def __init__(self, fs, path: str, cache: RangeCache | None = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, part_size: int = DEFAULT_PART_SIZE):
+        self.fs = fs
+        self.path = path
+        self._cache = cache
+        self._max_concurrency = max_concurrency
+        self._part_size = part_size
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "bytes_fetched": 0, "bytes_from_cache": 0}
+
+        self.version, self.size = object_version(fs, path)
+        self._file = _RangeFile(self)
+        self._load_footer()
+        metadata = pq.read_metadata(self._file)
+        self.parquet_file = pq.ParquetFile(self._file, metadata=metadata,
+                                           read_dictionary=low_cardinality_columns(metadata))
+
+    @property
+    def num_rows(self) -> int:
+        """Row count from the footer."""
+        return self.parquet_file.metadata.num_rows
+
+    def _load_footer(self):
+        start = max(self.size - FOOTER_PREFETCH_BYTES, 0)
+        tail = self._cached_range(start, self.size)
+        if len(tail) < 12 or tail[-4:] != PARQUET_MAGIC:
+            raise ValueError(f"{self.path} is not a Parquet file")
+
+        footer_length = struct.unpack("<I", tail[-8:-4])[0] + 8
+        if footer_length > len(tail): # Unusually large footer
+            self.prefetch([(self.size - footer_length, self.size)])
+        else:
+            self._file.add(start, tail)
+
+    def _get(self, start: int, end: int) -> bytes:
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_fetched"] += end - start
+        return self.fs.cat_file(self.path, start=start, end=end)
+
+    def fetch(self, start: int, end: int) -> bytes:
+        """Fetches [start, end) from the store, in parallel parts of 'part_size' bytes."""
+        parts = [(part, min(part + self._part_size, end)) for part in range(start, end, self._part_size)]
+        if len(parts) == 1:
+            return self._get(start, end)
+        with ThreadPoolExecutor(min(self._max_concurrency, len(parts))) as pool:
+            return b"".join(pool.map(lambda part: self._get(*part), parts))
+
+    def _cached_range(self, start: int, end: int) -> bytes:
+        """A range from the local cache, else fetched and cached."""
+        data = self._cache.get(self.path, self.version, start, end) if self._cache else None
+        if data is not None:
+            with self._stats_lock:
+                self.stats["bytes_from_cache"] += len(data)
+            return data
+
+        data = self.fetch(start, end)
+        if self._cache is not None:
+            self._cache.put(self.path, self.version, start, data)
+        return data
+
+    def prefetch(self, ranges: list[tuple[int, int]]):
+        """Loads byte ranges, from the cache or concurrently from the store."""
+        ranges = [byte_range for byte_range in ranges if not self._file.covers(*byte_range)]
+        if not ranges:
+            return
+        with ThreadPoolExecutor(min(self._max_concurrency, len(ranges))) as pool:
+            for (start, _), data in zip(ranges, pool.map(lambda r: self._cached_range(*r), ranges)):
+                self._file.add(start, data)
+
+    def column_ranges(self, columns=None, row_groups=None) -> list[tuple[int, int]]:
+        """Byte ranges of the column chunks of 'columns' (all if None) in 'row_groups'."""
+        metadata = self.parquet_file.metadata
+        wanted = None
+        if columns is not None:
+            # pandas index columns are read along with the requested ones
+            pandas_metadata = self.parquet_file.schema_arrow.pandas_metadata or {}
+            index_columns = [col for col in pandas_metadata.get("index_columns", []) if isinstance(col, str)]
+            wanted = set(columns) | set(index_columns)
+
+        ranges = []
+        for row_group in (range(metadata.num_row_groups) if row_groups is None else row_groups):
+            row_group_metadata = metadata.row_group(row_group)
+            for column in range(row_group_metadata.num_columns):
+                chunk = row_group_metadata.column(column)
+                if wanted is not None and chunk.path_in_schema.split(".")[0] not in wanted:
+                    continue
+                start = chunk.data_page_offset
+                if chunk.has_dictionary_page and chunk.dictionary_page_offset:
+                    start = min(start, chunk.dictionary_page_offset)
+                ranges.append((start, start + chunk.total_compressed_size))
+        return ranges
+
+    def read_table(self, columns=None, use_pandas_metadata: bool = False) -> pa.Table:
+        """Reads the table (or just 'columns')."""
+        self.prefetch(self.column_ranges(columns))
+        table = self.parquet_file.read(columns=columns, use_pandas_metadata=use_pandas_metadata)
+        self._file.clear()
+        return table
+
+    def iter_batches(self, columns=None, batch_size: int = DEFAULT_BATCH_SIZE):
+        """Streams record batches, fetching one row group's column chunks at a time."""
+        for row_group in range(self.parquet_file.metadata.num_row_groups):
+            self.prefetch(self.column_ranges(columns, [row_group]))
+            yield from self.parquet_file.iter_batches(
+                batch_size=batch_size, row_groups=[row_group], columns=columns
+            )
+            self._file.clear() # Keep one row group in memory at most
+
+    def schema(self, columns=None) -> pa.Schema:
+        """Arrow schema of the table, or of the selected columns."""
+        schema = self.parquet_file.schema_arrow
+        return schema if columns is None else pa.schema([schema.field(col) for col in columns])
+
+    def describe(self) -> str:
+        """Transfer summary for logs."""
+        return (f"{self.stats['requests']} range request(s), {self.stats['bytes_fetched']} bytes fetched, "
+                f"{self.stats['bytes_from_cache']} bytes from the local cache")
+
+class RemoteParquetTable(LazyParquetTable):
+    """LazyParquetTable over an object: reads only the footer and the needed column chunks."""
+
+    def __init__(self, path: str, open_file):
+        super().__init__(path)
+        self._open_file = open_file
+        self._remote = None
+
+    def _file(self) -> RemoteParquetFile:
+        if self._remote is None:
+            self._remote = self._open_file()
+        return self._remote
+
+    def to_pandas(self, columns=None) -> pd.DataFrame:
+        return self._file().read_table(columns, use_pandas_metadata=True).to_pandas()
+
+    @property
+    def num_rows(self) -> int:
+        return self._file().num_rows
+
+    def iter_batches(self, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+        for batch in self._file().iter_batches(columns, batch_size):
+            yield batch.to_pandas()
+
+# --- Uploads ---
+def _transfer_options(fs, max_concurrency: int, part_size: int) -> dict:
+    """
+    put_file options for filesystems that upload in concurrent parts
+    (s3fs and gcsfs take 'chunksize', s3fs and adlfs 'max_concurrency').
+    """
+    parameters = inspect.signature(getattr(fs, "_put_file", fs.put_file)).parameters
+    options = {}
+    if "max_concurrency" in parameters:
+        options["max_concurrency"] = max_concurrency
+    if "chunksize" in parameters:
+        options["chunksize"] = part_size
+    return options
+
+# --- I/O MANAGER ---
+class ObjectStoreParquetIOManager(ParquetIOManager):
+    """
+    ParquetIOManager for object stores.
+
+    Files are written locally and uploaded with concurrent multipart
+    transfers; reads fetch the footer and the needed column chunks with
+    parallel range requests, through a local disk cache validated by the
+    object's ETag (or mtime). Local paths behave as in ParquetIOManager.
+    """
+
+    def __init__(self, base_path: UPath, range_cache: RangeCache | None = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, part_size: int = DEFAULT_PART_SIZE):
+        super().__init__(base_path=base_path)
+        self._range_cache = range_cache
+        self._max_concurrency = max_concurrency
+        self._part_size = part_size
+
+    def _open(self, path: UPath) -> RemoteParquetFile:
+        return RemoteParquetFile(path.fs, path.path, self._range_cache,
+                                 self._max_concurrency, self._part_size)
+
+    def _write(self, obj, path: UPath, layout: TableLayout | None) -> int:
+        if _is_local(path) or isinstance(obj, TableFragments):
+            return super()._write(obj, path, layout) # Fragments are rejected there for remote paths
+
+        with tempfile.TemporaryDirectory(prefix="medallion_upload_") as tmp_dir:
+            local_path = os.path.join(tmp_dir, path.name)
+            rows = write_parquet(obj, local_path, layout)
+            path.fs.put_file(local_path, path.path,
+                             **_transfer_options(path.fs, self._max_concurrency, self._part_size))
+
+            if self._range_cache is not None:
+                # Seed the cache with the new footer; this also drops the old version's ranges
+                version, size = object_version(path.fs, path.path)
+                start = max(size - FOOTER_PREFETCH_BYTES, 0)
+                with open(local_path, "rb") as local_file:
+                    local_file.seek(start)
+                    self._range_cache.put(path.path, version, start, local_file.read())
+        return rows
+
+    def _lazy_table(self, context, path: UPath) -> LazyParquetTable:
+        if _is_local(path):
+            return super()._lazy_table(context, path)
+        return RemoteParquetTable(str(path), lambda: self._open(path))
+
+    def _read_table(self, context, path: UPath, columns=None) -> pa.Table:
+        if _is_local(path):
+            return super()._read_table(context, path, columns)
+        remote = self._open(path)
+        table = remote.read_table(columns)
+        context.log.info(f"Read {path}: {remote.describe()}")
+        return table
+
+    def _read_batches(self, path: UPath, columns, batch_size: int) -> tuple[pa.RecordBatchReader, int]:
+        if _is_local(path):
+            return super()._read_batches(path, columns, batch_size)
+        remote = self._open(path)
+        batches = remote.iter_batches(columns, batch_size)
+        return pa.RecordBatchReader.from_batches(remote.schema(columns), batches), remote.num_rows
+
+    def _read_dataframe(self, context, path: UPath) -> pd.DataFrame:
+        if _is_local(path):
+            return super()._read_dataframe(context, path)
+        remote = self._open(path)
+        df = remote.read_table(use_pandas_metadata=True).to_pandas()
+        context.log.info(f"Read {path}: {remote.describe()}")
+        return df
+
+@io_manager(
+    config_schema={
+        # e.g. s3://bucket/silver, abfs://container/silver or memory://silver
+        "base_path": str,
+        # Local cache of fetched byte ranges, None disables it
+        "cache_dir": Field(Noneable(str), default_value=DEFAULT_CACHE_DIR),
+        "cache_max_bytes": Field(int, default_value=DEFAULT_CACHE_BYTES),
+        # Parallel requests per upload/read, and the size of each part
+        "max_concurrency": Field(int, default_value=DEFAULT_MAX_CONCURRENCY),
+        "part_size": Field(int, default_value=DEFAULT_PART_SIZE),
+        # Passed to the fsspec filesystem (credentials, endpoint_url, ...)
+        "storage_options": Field(Permissive(), default_value={}),
+    },
+    description="An I/O manager that stores/loads DataFrames as parquet files in an object store."
+)
+def object_store_parquet_io_manager(init_context):
+    """Factory function for ObjectStoreParquetIOManager with configuration."""
+    config = init_context.resource_config
+    range_cache = None
+    if config["cache_dir"] and config["cache_max_bytes"] > 0:
+        range_cache = RangeCache(config["cache_dir"], config["cache_max_bytes"])
+
+    return ObjectStoreParquetIOManager(
+        base_path=UPath(config["base_path"], **config["storage_options"]),
+        range_cache=range_cache,
+        max_concurrency=config["max_concurrency"],
+        part_size=config["part_size"],
+    )
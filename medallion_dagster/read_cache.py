@@ -0,0 +1,154 @@
+"""Cross-asset read cache used by ParquetIOManager."""
+import contextlib
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+import pyarrow as pa
+import pyarrow.parquet as pq
+from shared.fingerprint import parquet_fingerprint
+from shared.parquet_layout import dictionary_columns
+from shared.table_format import logical_path
+
+class ParquetReadCache:
+    """
+    Caches decoded Parquet files as Arrow tables, keyed by table and fingerprint.
+
+    A versioned table's data files (see shared.table_format) are cached
+    under the table's plain path, so each table holds one entry per tier:
+    caching a new version replaces the copy of the previous one.
+
+    - Memory tier: an LRU of Arrow tables capped at 'max_bytes'.
+    - Disk tier (optional): Arrow IPC files in 'ipc_dir' that other
+      processes (e.g. steps of the multiprocess executor) can memory-map
+      instead of decoding the Parquet file again.
+
+    Arrow tables are immutable, so a cached table can safely be handed to
+    several assets; each one gets its own pandas copy.
+    """
+
+    def __init__(self, max_bytes: int, ipc_dir: str | None = None):
+        self.max_bytes = max_bytes
+        self.ipc_dir = ipc_dir
+        self._entries = OrderedDict() # table path -> (fingerprint, table)
+        self._current_bytes = 0
+        self._stats = {} # run_id -> counters
+        self._lock = threading.Lock()
+
+        if self.ipc_dir:
+            os.makedirs(self.ipc_dir, exist_ok=True)
+
+    def read(self, path: str, run_id: str = "adhoc") -> tuple[pa.Table, str]:
+        """
+        Reads a Parquet file through the cache.
+
+        Args:
+            path (str): Local path to the Parquet file.
+            run_id (str): Run to attribute the hit/miss to.
+
+        Returns:
+            (pa.Table, str): The table and where it came from:
+            'memory', 'ipc' or 'parquet' (a miss).
+        """
+        path = os.path.abspath(path)
+        fingerprint = parquet_fingerprint(path)
+        key = logical_path(path)
+
+        # 1. Memory tier
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self._record(run_id, "hits", entry[1].nbytes)
+                return entry[1], "memory"
+
+        # 2. Disk tier (memory-mapped, no Parquet decoding)
+        ipc_path = self._ipc_path(key, fingerprint)
+        if ipc_path and os.path.exists(ipc_path):
+            table = pa.ipc.open_file(pa.memory_map(ipc_path, "r")).read_all()
+            self._remember(key, fingerprint, table)
+            with self._lock:
+                self._record(run_id, "hits", table.nbytes)
+            return table, "ipc"
+
+        # 3. Miss: decode the Parquet file and populate both tiers
+        table = pq.read_table(path, memory_map=True, read_dictionary=dictionary_columns(path))
+        self._remember(key, fingerprint, table)
+        if ipc_path:
+            self._write_ipc(ipc_path, table)
+        with self._lock:
+            self._record(run_id, "misses", 0)
+        return table, "parquet"
+
+    def invalidate(self, path: str) -> None:
+        """Drops a table (by its path or a data file) from the memory tier, e.g. after it is rewritten."""
+        key = logical_path(os.path.abspath(path))
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._current_bytes -= entry[1].nbytes
+
+    def stats(self, run_id: str) -> dict:
+        """Returns the hits, misses and bytes saved for a run so far."""
+        with self._lock:
+            return dict(self._stats.get(run_id, {"hits": 0, "misses": 0, "bytes_saved": 0}))
+
+    def _record(self, run_id: str, counter: str, bytes_saved: int) -> None:
+        """Updates the per-run counters. Caller must hold the lock."""
+        stats = self._stats.setdefault(run_id, {"hits": 0, "misses": 0, "bytes_saved": 0})
+        stats[counter] += 1
+        stats["bytes_saved"] += bytes_saved
+
+    def _remember(self, key: str, fingerprint, table: pa.Table) -> None:
+        """Adds a table to the memory tier and evicts the least recently used."""
+        if table.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._current_bytes -= old[1].nbytes
+
+            self._entries[key] = (fingerprint, table)
+            self._current_bytes += table.nbytes
+
+            while self._current_bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted.nbytes
+
+    def _ipc_path(self, key: str, fingerprint) -> str | None:
+        """Builds the IPC file name: <hash of table path>-<hash of fingerprint>.arrow"""
+        if not self.ipc_dir:
+            return None
+        path_hash = hashlib.sha256(key.encode()).hexdigest()[:16]
+        version_hash = hashlib.sha256(repr(fingerprint).encode()).hexdigest()[:16]
+        return os.path.join(self.ipc_dir, f"{path_hash}-{version_hash}.arrow")
+
+    def _write_ipc(self, ipc_path: str, table: pa.Table) -> None:
+        """Writes the IPC copy atomically and removes older versions of the same table."""
+        prefix = os.path.basename(ipc_path).split("-")[0]
+        for file_name in os.listdir(self.ipc_dir):
+            if file_name.startswith(prefix + "-") and file_name.endswith(".arrow"):
+                # Another process may have removed it already
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.ipc_dir, file_name))
+
+        # Write to a temp file first, so readers never see a partial file
+        tmp_path = f"{ipc_path}.{uuid.uuid4().hex}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, ipc_path)
+
+# One cache per configuration, shared by every IO manager in this process
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+def get_read_cache(max_bytes: int, ipc_dir: str | None = None) -> ParquetReadCache:
+    """Returns the process-wide ParquetReadCache for a configuration."""
+    key = (max_bytes, ipc_dir)
+    with _CACHES_LOCK:
+        if key not in _CACHES:
+            _CACHES[key] = ParquetReadCache(max_bytes, ipc_dir)
+        return _CACHES[key]
@@ -1,16 +1,90 @@
 """ --- PARQUET I/O MANAGER (Fixed) ---"""
+import os
 import pandas as pd
-from dagster import ConfigurableResource, UPathIOManager, io_manager, EnvVar
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dagster import (
+    ConfigurableResource, UPathIOManager, io_manager, EnvVar, Field, Noneable,
+    DagsterInvariantViolationError
+)
 from upath import UPath
+from bronze.compression import DEFAULT_COMPRESSION
+from gold.extract.dimensions import DimensionCache, get_dimension_cache
+from gold.transform.chunked import DEFAULT_BATCH_SIZE
+from shared.parquet_layout import TableLayout, dictionary_columns, layout_for, write_parquet
+from shared.table_format import (
+    TableFragments, pinned_file, pinned_files, publish_fragments, read_fragments, write_table
+)
+from .read_cache import ParquetReadCache, get_read_cache
+from .lazy_table import LazyParquetTable
+from .instrumentation import Span
+from .memoization import UnchangedFrame, record_output, skips_inputs
+
+# Default memory cap for the cross-asset read cache (512 MB)
+DEFAULT_READ_CACHE_BYTES = 512 * 1024 * 1024
+
+# What load_from_path can hand to an asset (the 'load_as' metadata)
+LOAD_MODES = ("pandas", "lazy", "arrow", "arrow_batches")
+
+# What dump_to_path can write (TableFragments: local fragmented tables only)
+WRITABLE_TYPES = (pd.DataFrame, pa.Table, pa.RecordBatchReader, TableFragments)
+
+def _run_id(context) -> str:
+    """Returns the run id of an IO context, or 'adhoc' outside a run."""
+    try:
+        return context.step_context.run_id
+    except DagsterInvariantViolationError:
+        return "adhoc"
+
+def _is_local(path: UPath) -> bool:
+    """True if the path is on the local filesystem (the read cache needs that)."""
+    return path.protocol in ("", "file")
+
+def _span_name(action: str, context) -> str:
+    """Trace name of an IO operation, e.g. 'write silver/orders'."""
+    return f"{action} {'/'.join(context.asset_key.path)}"
+
+def _unloaded(load_as: str):
+    """The empty input handed to a memoized asset that is skipped."""
+    if load_as == "arrow":
+        return pa.table({})
+    if load_as == "arrow_batches":
+        return pa.RecordBatchReader.from_batches(pa.schema([]), [])
+    return UnchangedFrame()
+
+def _table_layout(context) -> TableLayout | None:
+    """
+    Returns the on-disk layout of an asset: the default for its
+    (layer, table) key, overridden by 'sort_by' / 'bloom_filter_columns' /
+    'dictionary_columns' in the asset's metadata.
+    """
+    key_path = context.asset_key.path
+    layout = layout_for(*key_path[-2:]) if len(key_path) >= 2 else None
+
+    metadata = context.definition_metadata or {}
+    if any(field in metadata for field in TableLayout._fields):
+        layout = layout or TableLayout()
+        layout = TableLayout(*(
+            tuple(metadata.get(field, getattr(layout, field))) for field in TableLayout._fields
+        ))
+    return layout
 
 # --- I/O MANAGER (Handles Parquet) ---
 class ParquetIOManager(UPathIOManager):
     """
     Handles the I/O for pandas DataFrames as Parquet files.
     This version includes all fixes.
+
+    Assets may also return pyarrow Tables or RecordBatchReaders, and read
+    their inputs as Arrow (see load_from_path), so pandas and Arrow assets
+    can be mixed freely.
     """
     extension: str = ".parquet"
 
+    def __init__(self, base_path: UPath, read_cache: ParquetReadCache | None = None):
+        super().__init__(base_path=base_path)
+        # Optional cross-asset cache; only used for local paths
+        self._read_cache = read_cache
 
     def _get_path_without_extension(self, context) -> UPath:
         """
@@ -21,35 +95,210 @@ class ParquetIOManager(UPathIOManager):
         return self._base_path / context.asset_key.path[-1]
 
     def dump_to_path(self, context, obj, path: UPath):
-        """Saves the DataFrame to the parquet file path."""
-        if not isinstance(obj, pd.DataFrame):
-            raise TypeError(f"Expected pd.DataFrame, got {type(obj)}")
+        """Saves the DataFrame, Arrow table or record batch stream to the parquet file path."""
+        if not isinstance(obj, WRITABLE_TYPES):
+            raise TypeError(
+                f"Expected pd.DataFrame, pa.Table, pa.RecordBatchReader or TableFragments, got {type(obj)}"
+            )
+
+        if isinstance(obj, UnchangedFrame):
+            context.log.info(f"Keeping {path}: the asset's data version is unchanged")
+            return
 
         # Use UPath's mkdir method
         path.parent.mkdir(parents=True, exist_ok=True)
+        previous = pinned_file(path.path) if _is_local(path) else None
+
+        layout = _table_layout(context)
+        context.log.info(
+            f"Saving parquet to {path}"
+            + (f" (sorted by {list(layout.sort_by)})" if layout and layout.sort_by else "")
+        )
+        with Span(_span_name("write", context), "write", _run_id(context)) as span:
+            rows = self._write(obj, path, layout)
+            if isinstance(obj, TableFragments):
+                bytes_written = sum(os.path.getsize(file_name) for file_name, _, _ in obj.added.values())
+            elif _is_local(path):
+                bytes_written = os.path.getsize(pinned_file(path.path))
+            else:
+                bytes_written = path.stat().st_size
+            span.count(rows_written=rows, bytes_written=bytes_written)
+        context.add_output_metadata(span.metadata())
 
-        context.log.info(f"Saving parquet to {path}")
-        # pd.to_parquet can handle a UPath object, but we'll
-        # explicitly cast to str for safety.
-        obj.to_parquet(str(path), index=False, engine='pyarrow')
+        if _is_local(path):
+            # Memoized assets can be skipped next time if nothing changes
+            record_output(_run_id(context), context.asset_key, path.path)
+            # The old version is stale now (readers pin the new one)
+            if self._read_cache is not None:
+                self._read_cache.invalidate(path.path)
+                if previous is not None:
+                    self._read_cache.invalidate(previous)
 
-    def load_from_path(self, context, path: UPath) -> pd.DataFrame:
-        """Loads a DataFrame from a parquet file path."""
-        context.log.info(f"Loading parquet from {path}")
+    def _write(self, obj, path: UPath, layout: TableLayout | None) -> int:
+        """Writes the parquet file; returns the rows written."""
+        # Clustered by the sort key, with a page index and Bloom filters,
+        # so point lookups read only a few pages. Local tables are written
+        # as a new version, so readers never see a partial file.
+        if isinstance(obj, TableFragments):
+            if not _is_local(path):
+                raise TypeError(f"Fragmented tables are local only; can't write {path}")
+            return publish_fragments(str(path), obj)
+        if _is_local(path):
+            return write_table(obj, str(path), layout)
+        return write_parquet(obj, path.path, layout, filesystem=path.fs)
+
+    def load_from_path(self, context, path: UPath):
+        """
+        Loads a DataFrame from a parquet file path.
+
+        The 'load_as' metadata of the input (AssetIn(metadata=...)), or
+        else of the upstream asset, picks what the asset gets:
+        - "pandas" (default): a pd.DataFrame. Low-cardinality string
+          columns (see shared.parquet_layout) are categoricals.
+        - "lazy": a LazyParquetTable, so the asset decides how to read it.
+        - "arrow": a pa.Table, read from a memory-mapped file (or shared
+          from the read cache) without converting to pandas.
+        - "arrow_batches": a pa.RecordBatchReader streaming the file
+          ('batch_size' rows at a time).
+        Arrow modes also accept 'columns' to read only those columns.
+
+        A fragmented table (one file per raw shard) is read in full and
+        can't be loaded lazily. Nothing is read for a memoized asset that
+        is skipped in this run: it gets an empty value of the same type.
+        """
+        fragments = None
+        if _is_local(path):
+            # Pin the latest version: a concurrent write publishes a new
+            # file instead of changing this one
+            files = pinned_files(path.path)
+            if len(files) == 1:
+                path = UPath(files[0])
+            else:
+                fragments = files
 
-        # --- FIX 1: pd.read_parquet needs a string, not a UPath ---
-        return pd.read_parquet(str(path))
+        metadata = context.definition_metadata or {}
+        upstream_metadata = (context.upstream_output.definition_metadata or {}
+                             if context.upstream_output is not None else {})
+        load_as = metadata.get("load_as", upstream_metadata.get("load_as", "pandas"))
+        if load_as not in LOAD_MODES:
+            raise ValueError(f"Unknown load_as {load_as!r} for {path}; expected one of {LOAD_MODES}")
+
+        if load_as == "lazy":
+            if fragments is not None:
+                raise ValueError(f"Can't load {path} lazily: it has {len(fragments)} fragments")
+            context.log.info(f"Passing lazy parquet handle for {path}")
+            # Nothing is read yet; the asset's compute span covers the reads
+            return self._lazy_table(context, path)
+
+        if skips_inputs(context):
+            context.log.info(f"Not loading {path}: the asset's data version is unchanged")
+            return _unloaded(load_as)
+
+        context.log.info(f"Loading parquet from {path}" + ("" if load_as == "pandas" else f" as {load_as}"))
+        columns = metadata.get("columns")
+
+        with Span(_span_name("read", context), "read", _run_id(context)) as span:
+            if fragments is not None:
+                data, rows = self._read_fragments(fragments, load_as, columns,
+                                                  metadata.get("batch_size", DEFAULT_BATCH_SIZE))
+            elif load_as == "arrow_batches":
+                data, rows = self._read_batches(path, columns, metadata.get("batch_size", DEFAULT_BATCH_SIZE))
+            elif load_as == "arrow":
+                data = self._read_table(context, path, columns)
+                rows = data.num_rows
+            else:
+                data = self._read_dataframe(context, path)
+                rows = len(data)
+            bytes_read = (sum(os.path.getsize(file_name) for file_name in fragments)
+                          if fragments is not None else path.stat().st_size)
+            span.count(rows_read=rows, bytes_read=bytes_read)
+        context.add_input_metadata(span.metadata())
+        return data
+
+    def _read_fragments(self, files: list, load_as: str, columns, batch_size: int):
+        """Reads the fragments of a table as 'load_as'; returns the data and its row count."""
+        table = read_fragments(files, None if load_as == "pandas" else columns)
+        if load_as == "arrow_batches":
+            return table.to_reader(max_chunksize=batch_size), table.num_rows
+        if load_as == "arrow":
+            return table, table.num_rows
+        return table.to_pandas(), table.num_rows
+
+    def _lazy_table(self, context, path: UPath) -> LazyParquetTable:
+        """The handle passed to assets that load an input lazily."""
+        read_cache = self._read_cache if _is_local(path) else None
+        return LazyParquetTable(str(path), read_cache, _run_id(context))
+
+    def _read_table(self, context, path: UPath, columns=None) -> pa.Table:
+        """
+        Reads a parquet file as an Arrow table. Local files are memory-mapped,
+        and a cached table is shared as is (selecting columns is zero-copy).
+        """
+        if not _is_local(path):
+            return pq.read_table(path.path, columns=columns, filesystem=path.fs,
+                                 read_dictionary=dictionary_columns(path.path, path.fs))
+        if self._read_cache is None:
+            return pq.read_table(path.path, columns=columns, memory_map=True,
+                                 read_dictionary=dictionary_columns(path.path))
+
+        table, _ = self._read_cache.read(path.path, run_id=_run_id(context))
+        return table.select(columns) if columns is not None else table
+
+    def _read_batches(self, path: UPath, columns, batch_size: int) -> tuple[pa.RecordBatchReader, int]:
+        """Opens a record batch stream over a parquet file; returns it and the file's row count."""
+        if _is_local(path):
+            parquet_file = pq.ParquetFile(path.path, memory_map=True,
+                                          read_dictionary=dictionary_columns(path.path))
+        else:
+            parquet_file = pq.ParquetFile(path.path, filesystem=path.fs,
+                                          read_dictionary=dictionary_columns(path.path, path.fs))
+
+        schema = parquet_file.schema_arrow
+        if columns is not None:
+            schema = pa.schema([schema.field(col) for col in columns])
+        batches = parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+        return pa.RecordBatchReader.from_batches(schema, batches), parquet_file.metadata.num_rows
+
+    def _read_dataframe(self, context, path: UPath) -> pd.DataFrame:
+        """Reads a parquet file in full, through the read cache if there is one."""
+        if self._read_cache is None or not _is_local(path):
+            # --- FIX 1: pd.read_parquet needs a string, not a UPath ---
+            # Low-cardinality columns come back as categoricals
+            return pd.read_parquet(str(path), read_dictionary=dictionary_columns(
+                path.path, None if _is_local(path) else path.fs
+            ))
+
+        run_id = _run_id(context)
+        table, source = self._read_cache.read(path.path, run_id=run_id)
+        stats = self._read_cache.stats(run_id)
+        context.log.info(
+            f"Read cache {'miss' if source == 'parquet' else 'hit (' + source + ')'} "
+            f"for {path}. Run totals: hits={stats['hits']}, misses={stats['misses']}, "
+            f"bytes_saved={stats['bytes_saved']}"
+        )
+        return table.to_pandas()
 
 @io_manager(
-    config_schema={"base_path": str},
+    config_schema={
+        "base_path": str,
+        # Memory cap of the cross-asset read cache, 0 disables it
+        "read_cache_max_bytes": Field(int, default_value=DEFAULT_READ_CACHE_BYTES),
+        # Directory for memory-mappable Arrow IPC copies (for multiprocess runs)
+        "ipc_cache_dir": Field(Noneable(str), default_value=None),
+    },
     description="An I/O manager that stores/loads DataFrames as parquet files."
 )
 def parquet_io_manager(init_context):
     """Factory function for ParquetIOManager with configuration."""
-    base_path_str = init_context.resource_config["base_path"]
+    config = init_context.resource_config
+    base_path_str = config["base_path"]
+
+    read_cache = None
+    if config["read_cache_max_bytes"] > 0:
+        read_cache = get_read_cache(config["read_cache_max_bytes"], config["ipc_cache_dir"])
 
     # --- FIX 2: The parent class UPathIOManager takes 'base_path' ---
-    return ParquetIOManager(base_path=UPath(base_path_str))
+    return ParquetIOManager(base_path=UPath(base_path_str), read_cache=read_cache)
 
 # --- PATH CONFIG (Correct) ---
 class PathConfig(ConfigurableResource):
@@ -59,8 +308,23 @@ class PathConfig(ConfigurableResource):
     bronze_parquet_path: str = "data/bronze/parquet"
     silver_path: str = "data/silver"
     gold_path: str = "data/gold"
+    cache_path: str = "data/cache"
+    raw_compression: str = DEFAULT_COMPRESSION # 'zstd', 'gzip' or 'none' for new raw downloads
 
 # --- AZURE RESOURCE (Correct) ---
 class AzureConfig(ConfigurableResource):
     """Provides the Azure SAS URL from environment variable."""
     sas_url: str = EnvVar("AZURE_SAS_URL")
+
+# --- DIMENSION CACHE RESOURCE ---
+class DimensionCacheResource(ConfigurableResource):
+    """
+    Provides the shared store/customer name lookups to gold assets.
+    The underlying cache is built once per process and invalidated
+    whenever the Silver dimension files change.
+    """
+    silver_path: str = "data/silver"
+
+    def get_cache(self) -> DimensionCache:
+        """Returns the process-wide cache for the configured silver path."""
+        return get_dimension_cache(self.silver_path)
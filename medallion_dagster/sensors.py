@@ -0,0 +1,190 @@
+"""
+Raw-data sensor: runs the pipeline when new data lands, not on the hour.
+
+Every tick lists the sources' metadata only: the GitHub directory
+listing (a conditional request, free while nothing changed) and the
+Azure container's blob ETags, or the raw directories' file sizes and
+modification times when data is dropped there directly. A source whose
+listing differs from the one of the last launched run triggers a run of
+the assets downstream of it, once:
+- its listing has not changed for DEBOUNCE_S (files still arriving), and
+- MIN_RUN_INTERVAL_S have passed since the sensor's last run.
+
+Unchanged assets in the selection are skipped by memoization.
+"""
+import hashlib
+import json
+import os
+import time
+from dagster import (
+    AssetSelection, DefaultSensorStatus, RunRequest, SensorResult, SkipReason, sensor
+)
+from dotenv import load_dotenv
+from bronze.extract.csv_extractor import API_URL, list_csv_versions
+from bronze.extract.jsonl_extractor import list_blob_versions
+from .resources import AzureConfig, PathConfig
+
+load_dotenv()
+
+# 'remote': watch GitHub and the Azure container, and run the extracts.
+# 'local': watch the raw directories, filled by something else.
+WATCH = os.getenv("MEDALLION_SENSOR_WATCH", "remote")
+
+# Seconds between ticks, quiet time before a change counts, and minimum
+# time between two runs launched by the sensor
+SENSOR_INTERVAL_S = int(os.getenv("MEDALLION_SENSOR_INTERVAL_S", "60"))
+DEBOUNCE_S = int(os.getenv("MEDALLION_SENSOR_DEBOUNCE_S", "120"))
+MIN_RUN_INTERVAL_S = int(os.getenv("MEDALLION_SENSOR_MIN_INTERVAL_S", "900"))
+
+# Run tag naming the sources that triggered a run
+TRIGGER_TAG = "medallion/triggered_by"
+
+# Sources, and the extract asset that downloads each one
+SOURCES = {
+    "github_csv": "raw_csv_files",
+    "azure_jsonl": "raw_jsonl_files",
+}
+
+def _digest(versions: dict) -> str:
+    """One short version for a whole listing."""
+    return hashlib.sha256(json.dumps(versions, sort_keys=True).encode()).hexdigest()[:16]
+
+def local_versions(directory: str) -> dict:
+    """Size and mtime of every file under a raw directory (no contents are read)."""
+    versions = {}
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".tmp"): # A download in progress (see bronze.compression)
+                continue
+            stat = os.stat(os.path.join(root, name))
+            relative = os.path.relpath(os.path.join(root, name), directory)
+            versions[relative] = f"{stat.st_size}-{stat.st_mtime_ns}"
+    return versions
+
+def probe_source(source: str, state: dict, paths: PathConfig, azure: AzureConfig | None,
+                 watch: str = WATCH) -> str:
+    """
+    The current version of a source's listing. Updates 'state' (the
+    sensor's cursor) with the GitHub ETag.
+    """
+    if watch == "local":
+        directory = paths.raw_local_path if source == "github_csv" else paths.raw_azure_path
+        return _digest(local_versions(directory))
+
+    if source == "github_csv":
+        etag = state.get("etags", {}).get(source)
+        versions, etag = list_csv_versions(API_URL, etag)
+        if versions is None: # 304: unchanged since the last listing
+            return state["observed"][source]
+        state.setdefault("etags", {})[source] = etag
+        return _digest(versions)
+
+    return _digest(list_blob_versions(azure.sas_url))
+
+def affected_selection(sources: list, assets, watch: str = WATCH) -> list:
+    """
+    The asset keys to run for changed sources: everything downstream of
+    their extract assets. When watching the raw directories, the data is
+    already there, so the extracts themselves are left out.
+    """
+    extracts = AssetSelection.assets(*(SOURCES[source] for source in sources))
+    selection = extracts.downstream()
+    if watch == "local":
+        selection = selection - extracts
+    return sorted(selection.resolve(assets), key=lambda key: key.path)
+
+def evaluate(state: dict, versions: dict, now: float, debounce_s: float = DEBOUNCE_S,
+             min_run_interval_s: float = MIN_RUN_INTERVAL_S) -> tuple[list, str | None]:
+    """
+    Decides which sources to run for, given their current 'versions'.
+    Updates 'state' (observed versions and when they last changed, what
+    was launched, and when).
+
+    Returns:
+        (list, str | None): The sources to run for (possibly none), and
+        why nothing runs yet.
+    """
+    observed = state.setdefault("observed", {})
+    observed_at = state.setdefault("observed_at", {})
+    launched = state.setdefault("launched", {})
+
+    settled, settling = [], []
+    for source, version in versions.items():
+        if observed.get(source) != version:
+            observed[source], observed_at[source] = version, now
+        if observed[source] == launched.get(source):
+            continue
+        if now - observed_at[source] < debounce_s:
+            settling.append(source)
+        else:
+            settled.append(source)
+
+    if not settled:
+        if settling:
+            return [], f"Waiting for {', '.join(settling)} to settle ({debounce_s:.0f}s debounce)"
+        return [], "No new raw data"
+
+    wait_s = state.get("last_run_at", 0) + min_run_interval_s - now
+    if wait_s > 0:
+        return [], f"New data in {', '.join(settled)}; next run allowed in {wait_s:.0f}s"
+
+    for source in settled:
+        launched[source] = observed[source]
+    state["last_run_at"] = now
+    return settled, None
+
+def _tick(context, paths: PathConfig, azure: AzureConfig | None, assets, watch: str):
+    """One evaluation of the sensor (see build_raw_data_sensor)."""
+    state = json.loads(context.cursor) if context.cursor else {}
+    now = time.time()
+
+    versions = {}
+    for source in SOURCES:
+        try:
+            versions[source] = probe_source(source, state, paths, azure, watch)
+        except Exception as e: # pylint: disable=broad-exception-caught
+            # An unreachable source must not block the other one
+            context.log.warning(f"Could not list {source}: {e}")
+
+    sources, reason = evaluate(state, versions, now)
+    if not sources:
+        return SensorResult(skip_reason=SkipReason(reason), cursor=json.dumps(state, sort_keys=True))
+
+    # The launch counter makes the run key unique even when a source
+    # reverts to a listing that was processed before, while a retried tick
+    # (same cursor) still dedups to the same key
+    state["launches"] = state.get("launches", 0) + 1
+    run_key = f"{state['launches']}-" + _digest({source: state["launched"][source] for source in sources})
+
+    context.log.info(f"New raw data in {', '.join(sources)}")
+    return SensorResult(
+        run_requests=[RunRequest(
+            run_key=run_key,
+            asset_selection=affected_selection(sources, assets, watch),
+            tags={TRIGGER_TAG: ",".join(sources)},
+        )],
+        cursor=json.dumps(state, sort_keys=True),
+    )
+
+def build_raw_data_sensor(job, assets, watch: str = WATCH,
+                          default_status: DefaultSensorStatus = DefaultSensorStatus.STOPPED):
+    """
+    The sensor launching 'job' for the assets affected by new raw data.
+    Watching the raw directories needs no Azure configuration.
+    """
+    if watch not in ("remote", "local"):
+        raise ValueError(f"Unknown MEDALLION_SENSOR_WATCH {watch!r}; expected 'remote' or 'local'")
+
+    if watch == "local":
+        def raw_data_sensor(context, paths: PathConfig):
+            return _tick(context, paths, None, assets, watch)
+    else:
+        def raw_data_sensor(context, paths: PathConfig, azure: AzureConfig):
+            return _tick(context, paths, azure, assets, watch)
+
+    return sensor(
+        job=job, minimum_interval_seconds=SENSOR_INTERVAL_S, default_status=default_status,
+        description=f"Runs the pipeline when {watch} raw data changes "
+                    f"(debounce {DEBOUNCE_S}s, at most one run per {MIN_RUN_INTERVAL_S}s).",
+    )(raw_data_sensor)
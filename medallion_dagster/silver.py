@@ -8,6 +8,8 @@ from silver.transform.supplies import transform_supplies
 from silver.transform.order_items import transform_order_items
 from silver.transform.orders import transform_orders
 from silver.transform.support_tickets import transform_support_tickets
+from .instrumentation import instrumented
+from .memoization import memoized
 
 # --- FIX: Using 'ins={...}' to explicitly map inputs ---
 @asset(
@@ -16,6 +18,8 @@ from silver.transform.support_tickets import transform_support_tickets
     group_name="silver",
     io_manager_key="silver_io_manager"
 )
+@memoized
+@instrumented
 def silver_customers(bronze_df: pd.DataFrame) -> pd.DataFrame:
     """Transforms bronze raw_customers to silver customers."""
     return transform_customers(bronze_df)
@@ -26,6 +30,8 @@ def silver_customers(bronze_df: pd.DataFrame) -> pd.DataFrame:
     group_name="silver",
     io_manager_key="silver_io_manager"
 )
+@memoized
+@instrumented
 def silver_stores(bronze_df: pd.DataFrame) -> pd.DataFrame:
     """Transforms bronze raw_stores to silver stores."""
     return transform_stores(bronze_df)
@@ -36,6 +42,8 @@ def silver_stores(bronze_df: pd.DataFrame) -> pd.DataFrame:
     group_name="silver",
     io_manager_key="silver_io_manager"
 )
+@memoized
+@instrumented
 def silver_products(bronze_df: pd.DataFrame) -> pd.DataFrame:
     """Transforms bronze raw_products to silver products."""
     return transform_products(bronze_df)
@@ -46,6 +54,8 @@ def silver_products(bronze_df: pd.DataFrame) -> pd.DataFrame:
     group_name="silver",
     io_manager_key="silver_io_manager"
 )
+@memoized
+@instrumented
 def silver_supplies(bronze_df: pd.DataFrame) -> pd.DataFrame:
     """Transforms bronze raw_supplies to silver supplies."""
     return transform_supplies(bronze_df)
@@ -56,6 +66,8 @@ def silver_supplies(bronze_df: pd.DataFrame) -> pd.DataFrame:
     group_name="silver",
     io_manager_key="silver_io_manager"
 )
+@memoized
+@instrumented
 def silver_order_items(bronze_df: pd.DataFrame) -> pd.DataFrame:
     """Transforms bronze raw_items to silver order_items."""
     return transform_order_items(bronze_df)
@@ -66,6 +78,8 @@ def silver_order_items(bronze_df: pd.DataFrame) -> pd.DataFrame:
     group_name="silver",
     io_manager_key="silver_io_manager"
 )
+@memoized
+@instrumented
 def silver_orders(bronze_df: pd.DataFrame) -> pd.DataFrame:
     """Transforms bronze raw_orders to silver orders."""
     return transform_orders(bronze_df)
@@ -79,6 +93,8 @@ def silver_orders(bronze_df: pd.DataFrame) -> pd.DataFrame:
     group_name="silver",
     io_manager_key="silver_io_manager"
 )
+@memoized
+@instrumented
 def silver_support_tickets(tickets_df: pd.DataFrame, orders_df: pd.DataFrame) -> pd.DataFrame:
     """Transforms bronze support_tickets and raw_orders to silver support_tickets."""
     return transform_support_tickets(tickets_df, orders_df)
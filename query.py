@@ -1,14 +1,18 @@
 """
-Interactive SQL query REPL for Medallion ETL parquet files.
+Interactive SQL query REPL (and batch exporter) for Medallion ETL parquet files.
 
 This script is the main entry point.
 The core logic is in the 'query_tool' package.
 """
 import argparse
+import sys
 
 # Import the logic from our new package
-from query_tool.config import PATH_CONFIG, apply_pandas_options
+from query_tool.config import (
+    PATH_CONFIG, DEFAULT_MAX_ROWS, apply_pandas_options, default_catalog_path
+)
 from query_tool.repl import start_query_repl
+from query_tool.batch import run_batch, COPY_OPTIONS
 
 def main():
     """Main function to parse arguments and start the REPL."""
@@ -16,8 +20,9 @@ def main():
         description="""
         Interactively query parquet files from the Medallion ETL pipeline.
         
-        Example:
+        Examples:
         python query.py --gold
+        python query.py --gold --execute report.sql --output out.parquet
         """
     )
     # Create a mutually exclusive group, so only one layer can be chosen
@@ -37,19 +42,104 @@ def main():
         action='store_true',
         help="Query the Gold layer parquet files."
     )
+    parser.add_argument(
+        '--catalog',
+        nargs='?',
+        const='',
+        default=None,
+        metavar='PATH',
+        help="Use a persistent .duckdb catalog (default: data/catalog/<layer>.duckdb). "
+             "Hot tables are materialized and only refreshed when their parquet file changes."
+    )
+    parser.add_argument(
+        '--hot',
+        action='append',
+        metavar='TABLE',
+        help="Materialize only this table in the catalog (repeatable). Default: all tables."
+    )
+
+    parser.add_argument(
+        '--max-rows',
+        type=int,
+        default=DEFAULT_MAX_ROWS,
+        help=f"Fetch at most this many rows per query (0 = no cap, default {DEFAULT_MAX_ROWS})."
+    )
+    parser.add_argument(
+        '--cache-spill',
+        metavar='DIR',
+        help="Spill query results evicted from the in-memory result cache to this directory "
+             "(capped at 1 GB, emptied at startup)."
+    )
+
+    parser.add_argument(
+        '--query-log',
+        metavar='FILE',
+        help="Append one JSON line of metrics (time, rows, bytes and files scanned) per query "
+             "to FILE. Same as '.log FILE' in the REPL."
+    )
+    parser.add_argument(
+        '--execute',
+        metavar='FILE',
+        help="Run the SQL statements in FILE ('-' for stdin) instead of starting the REPL. "
+             "The last statement must be a SELECT; its result is exported."
+    )
+    parser.add_argument(
+        '--output',
+        metavar='PATH',
+        help="With --execute: write the result to PATH (.parquet, .csv, .jsonl). "
+             "Default: CSV on stdout."
+    )
+    parser.add_argument(
+        '--format',
+        choices=sorted(COPY_OPTIONS),
+        help="With --execute: output format (default: inferred from --output)."
+    )
 
     args = parser.parse_args()
+    if (args.output or args.format) and not args.execute:
+        parser.error("--output and --format require --execute")
 
     # Apply the pandas settings
     apply_pandas_options()
 
     # Determine which layer was selected
     if args.bronze:
-        start_query_repl("bronze", PATH_CONFIG["bronze"])
+        layer_name = "bronze"
     elif args.silver:
-        start_query_repl("silver", PATH_CONFIG["silver"])
-    elif args.gold:
-        start_query_repl("gold", PATH_CONFIG["gold"])
+        layer_name = "silver"
+    else:
+        layer_name = "gold"
+
+    catalog_path = None
+    if args.catalog is not None:
+        catalog_path = args.catalog or default_catalog_path(layer_name)
+
+    if args.execute:
+        if args.execute == '-':
+            sql_text = sys.stdin.read()
+        else:
+            with open(args.execute, encoding="utf-8") as sql_file:
+                sql_text = sql_file.read()
+
+        sys.exit(run_batch(
+            layer_name,
+            PATH_CONFIG[layer_name],
+            sql_text,
+            output_path=args.output,
+            output_format=args.format,
+            catalog_path=catalog_path,
+            hot_tables=args.hot
+        ))
+
+    start_query_repl(
+        layer_name,
+        PATH_CONFIG[layer_name],
+        catalog_path=catalog_path,
+        hot_tables=args.hot,
+        max_rows=args.max_rows,
+        cache_spill_dir=args.cache_spill,
+        query_log_path=args.query_log
+    )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,40 @@
+"""
+Local query server for Medallion ETL parquet files.
+
+Keeps a warm DuckDB database over all layers and answers SQL over HTTP
+with Arrow IPC results. The logic is in 'query_tool.server'; a client
+is in 'query_tool.client'.
+"""
+import argparse
+
+from query_tool.server import (
+    serve, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_WORKERS, DEFAULT_POLL_INTERVAL
+)
+
+def main():
+    """Parses arguments and runs the server until Ctrl-C."""
+    parser = argparse.ArgumentParser(
+        description="""
+        Serve SQL queries over all Medallion layers from one warm DuckDB database.
+
+        Example:
+        python query_server.py --port 8765
+        python -m query_tool.client "SELECT * FROM aov_by_store_month LIMIT 5"
+        """
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help=f"Interface to bind (default {DEFAULT_HOST}, local only).")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f"Port to listen on (default {DEFAULT_PORT}).")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Queries run concurrently; others wait (default {DEFAULT_WORKERS}).")
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Seconds between checks for changed parquet files "
+                             f"(default {DEFAULT_POLL_INTERVAL}).")
+    args = parser.parse_args()
+
+    serve(host=args.host, port=args.port, workers=args.workers,
+          poll_interval=args.poll_interval)
+
+if __name__ == "__main__":
+    main()
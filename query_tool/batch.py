@@ -0,0 +1,110 @@
+"""Non-interactive batch mode: run SQL statements and export the result."""
+import os
+import sys
+import duckdb
+import pyarrow.csv as pa_csv
+from .database import connect_and_create_views, list_parquet_tables, refresh_views
+
+# Output format -> options of DuckDB's native COPY writer
+COPY_OPTIONS = {
+    "parquet": "FORMAT PARQUET",
+    "csv": "FORMAT CSV, HEADER",
+    "jsonl": "FORMAT JSON", # newline-delimited JSON
+}
+
+# File extension -> output format
+EXTENSION_FORMATS = {
+    ".parquet": "parquet",
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".json": "jsonl",
+}
+
+def detect_format(output_path: str) -> str:
+    """Infers the output format from the file extension."""
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension not in EXTENSION_FORMATS:
+        raise ValueError(
+            f"Cannot infer output format from '{output_path}'. "
+            f"Use one of {sorted(EXTENSION_FORMATS)} or pass --format."
+        )
+    return EXTENSION_FORMATS[extension]
+
+# Temporary view the final SELECT is exposed as, for COPY
+RESULT_VIEW = "_batch_result"
+
+def export_result(con, statement, output_path: str | None, output_format: str | None):
+    """
+    Exports the result of one SELECT statement.
+
+    With an output file, DuckDB's own multithreaded writer is used through
+    COPY, so rows never pass through Python. Without one, the result is
+    streamed to stdout as CSV, one Arrow record batch at a time.
+    """
+    relation = con.sql(statement)
+
+    if output_path:
+        output_format = output_format or detect_format(output_path)
+        target = output_path.replace("'", "''")
+        relation.to_view(RESULT_VIEW)
+        con.execute(f"COPY {RESULT_VIEW} TO '{target}' ({COPY_OPTIONS[output_format]});")
+        print(f"Wrote {output_format} to {output_path}", file=sys.stderr)
+        return
+
+    reader = relation.fetch_record_batch()
+    with pa_csv.CSVWriter(sys.stdout.buffer, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+    sys.stdout.buffer.flush()
+
+def run_batch(layer_name: str, data_path: str, sql_text: str,
+              output_path: str | None = None, output_format: str | None = None,
+              catalog_path: str | None = None, hot_tables=None) -> int:
+    """
+    Runs one or more SQL statements against a layer.
+
+    Every statement but the last is executed for its side effects (SET,
+    CREATE TEMP VIEW, ...). The last one must be a SELECT; its result is
+    written to 'output_path' (or stdout as CSV).
+
+    Returns:
+        int: Process exit code (0 on success).
+    """
+    try:
+        con, _ = connect_and_create_views(
+            layer_name, data_path, catalog_path=catalog_path, hot_tables=hot_tables,
+            verbose=False
+        )
+    except SystemExit as e:
+        return e.code or 1
+
+    table_sources = list_parquet_tables(data_path)
+    try:
+        statements = con.extract_statements(sql_text)
+        if not statements:
+            print("Error: No SQL statements given.", file=sys.stderr)
+            return 1
+
+        *setup, last = statements
+        for statement in setup:
+            if statement.type == duckdb.StatementType.SELECT:
+                print("Warning: ignoring the result of a SELECT that is not the last "
+                      "statement.", file=sys.stderr)
+            # Re-pin the tables to their latest versions before every statement
+            table_sources = refresh_views(con, data_path, table_sources, catalog_path, hot_tables)
+            con.execute(statement)
+
+        if last.type != duckdb.StatementType.SELECT:
+            print("Error: The last statement must be a SELECT.", file=sys.stderr)
+            return 1
+
+        refresh_views(con, data_path, table_sources, catalog_path, hot_tables)
+        export_result(con, last, output_path, output_format)
+    except (duckdb.Error, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        con.close()
+
+    return 0
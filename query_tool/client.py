@@ -0,0 +1,107 @@
+"""
+Small client for the local query server (see server.py).
+
+Example:
+    from query_tool.client import QueryClient
+    table = QueryClient().query("SELECT * FROM aov_by_store_month", layer="gold")
+"""
+import argparse
+import json
+import sys
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+import pyarrow as pa
+from .server import ARROW_STREAM_TYPE, DEFAULT_HOST, DEFAULT_PORT
+
+class QueryServerError(Exception):
+    """The server rejected a request (bad SQL, unknown layer, busy, ...)."""
+
+class QueryClient:
+    """Sends SQL to a running query server and returns Arrow results."""
+
+    def __init__(self, url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", timeout: float = 300):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def query(self, sql: str, layer: str = "gold", max_rows: int = 0) -> pa.Table | None:
+        """
+        Runs one query. Unqualified table names resolve in 'layer'; other
+        layers can be reached as e.g. 'silver.orders'.
+
+        Returns:
+            pa.Table | None: The result, or None for statements without one.
+        """
+        return self._read(self._post(sql, layer, max_rows), lambda reader: reader.read_all())
+
+    def iter_batches(self, sql: str, layer: str = "gold", max_rows: int = 0):
+        """Like query(), but yields the result batch by batch as it arrives."""
+        response = self._post(sql, layer, max_rows)
+        with response:
+            if response.headers.get_content_type() != ARROW_STREAM_TYPE:
+                return
+            yield from pa.ipc.open_stream(response)
+
+    def tables(self) -> dict:
+        """Returns layer -> table names."""
+        return self._get_json("/tables")
+
+    def health(self) -> dict:
+        """Returns the worker pool and reload status."""
+        return self._get_json("/health")
+
+    def _post(self, sql: str, layer: str, max_rows: int):
+        """Sends a query and returns the open HTTP response."""
+        params = urlencode({"layer": layer, "max_rows": max_rows})
+        request = Request(
+            f"{self.url}/query?{params}", data=sql.encode("utf-8"), method="POST",
+            headers={"Content-Type": "text/plain; charset=utf-8"}
+        )
+        try:
+            return urlopen(request, timeout=self.timeout)
+        except HTTPError as e:
+            raise QueryServerError(_error_message(e)) from None
+
+    def _get_json(self, path: str) -> dict:
+        """GETs a JSON endpoint."""
+        try:
+            with urlopen(f"{self.url}{path}", timeout=self.timeout) as response:
+                return json.load(response)
+        except HTTPError as e:
+            raise QueryServerError(_error_message(e)) from None
+
+    @staticmethod
+    def _read(response, read_arrow):
+        """Reads an Arrow IPC body, or returns None for a JSON status body."""
+        with response:
+            if response.headers.get_content_type() != ARROW_STREAM_TYPE:
+                return None
+            return read_arrow(pa.ipc.open_stream(response))
+
+def _error_message(error: HTTPError) -> str:
+    """Extracts the server's error message from an HTTP error response."""
+    try:
+        return json.load(error)["error"]
+    except (ValueError, KeyError):
+        return f"HTTP {error.code}: {error.reason}"
+
+def main():
+    """Command line client: runs one query and prints the result."""
+    parser = argparse.ArgumentParser(description="Query a running Medallion query server.")
+    parser.add_argument("sql", help="SQL to run ('-' reads stdin).")
+    parser.add_argument("--layer", default="gold", help="Layer for unqualified table names.")
+    parser.add_argument("--url", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+    parser.add_argument("--max-rows", type=int, default=0, help="Row cap (0 = no cap).")
+    args = parser.parse_args()
+
+    sql = sys.stdin.read() if args.sql == "-" else args.sql
+    try:
+        table = QueryClient(args.url).query(sql, layer=args.layer, max_rows=args.max_rows)
+    except QueryServerError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print("OK" if table is None else table.to_pandas().to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,22 @@ PATH_CONFIG = {
     "gold": "data/gold"
 }
 
+# Result streaming in the REPL
+DEFAULT_MAX_ROWS = 10_000 # Rows fetched per query at most (0 = no cap)
+PAGE_SIZE = 50 # Rows printed per page
+
+# Query result cache: memory budget of the in-memory LRU (spilling is opt-in)
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Disk budget of the spill dir, when spilling (least recently used files go first)
+RESULT_CACHE_SPILL_MAX_BYTES = 1024 * 1024 * 1024
+
+# Persistent DuckDB catalogs (one .duckdb file per layer) live here
+CATALOG_DIR = "data/catalog"
+
+def default_catalog_path(layer_name: str) -> str:
+    """Returns the default persistent catalog file for a layer."""
+    return f"{CATALOG_DIR}/{layer_name}.duckdb"
+
 def apply_pandas_options():
     """Sets global pandas display options."""
     pd.set_option('display.max_rows', None)
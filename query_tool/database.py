@@ -2,49 +2,338 @@
 import os
 import sys
 import glob
+import weakref
 import duckdb
+from gold.extract.dimensions import get_dimension_cache
+from shared.fingerprint import parquet_fingerprint
+from shared.table_format import list_tables, pinned_files
+from .config import PATH_CONFIG
 
-def connect_and_create_views(layer_name: str, data_path: str):
+# Bookkeeping table in a persistent catalog: which Parquet version each
+# materialized table was loaded from.
+CATALOG_TABLE = "_medallion_catalog"
+
+# id -> name lookups registered in every session, from the shared
+# dimension cache: lookup name -> silver dimension table
+NAME_LOOKUPS = {
+    "store_names": "stores",
+    "customer_names": "customers",
+}
+
+# Lookups registered on each connection (or cursor): lookup name -> the
+# dimension fingerprint it was registered at
+_registered_lookups = weakref.WeakKeyDictionary()
+
+# Tables created on each connection: table name -> the source fingerprint
+# its view or materialized table was created at
+_created_tables = weakref.WeakKeyDictionary()
+
+def connect_and_create_views(layer_name: str, data_path: str,
+                             catalog_path: str | None = None, hot_tables=None,
+                             verbose: bool = True):
     """
     Validates paths, connects to DuckDB, and creates views for parquet files.
-    
+    Each top-level .parquet file is a table, and so is each directory of
+    parquet files (read with Hive partitioning, see table_scan_sql).
+
+    With 'catalog_path', a persistent .duckdb file is used instead of an
+    in-memory database. Hot tables ('hot_tables', default: all) are then
+    materialized as native DuckDB tables, and on later starts only those
+    whose source Parquet fingerprint changed are reloaded.
+
+    With 'verbose' off, the banner and table list are not printed (errors
+    still go to stderr), so batch mode can write results to stdout.
+
     Returns:
         (duckdb.Connection, list[str]): The connection and list of table names.
     """
     # Check if the directory exists
     if not os.path.exists(data_path):
-        print(f"Error: Directory not found: '{data_path}'")
-        print("Please run the Dagster pipeline first to generate data.")
+        print(f"Error: Directory not found: '{data_path}'", file=sys.stderr)
+        print("Please run the Dagster pipeline first to generate data.", file=sys.stderr)
         sys.exit(1)
 
-    # Find all parquet files in the directory
-    search_pattern = os.path.join(data_path, "*.parquet")
-    parquet_files = glob.glob(search_pattern)
+    # Find all parquet tables (files and directories) in the directory
+    table_sources = list_parquet_tables(data_path)
 
-    if not parquet_files:
-        print(f"Error: No .parquet files found in '{data_path}'")
+    if not table_sources:
+        print(f"Error: No .parquet files found in '{data_path}'", file=sys.stderr)
         sys.exit(1)
 
-    # Connect to an in-memory DuckDB database
-    con = duckdb.connect(database=':memory:')
+    if catalog_path:
+        # Connect to (or create) the persistent catalog for this layer
+        os.makedirs(os.path.dirname(catalog_path) or ".", exist_ok=True)
+        con = duckdb.connect(database=catalog_path)
+    else:
+        # Connect to an in-memory DuckDB database
+        con = duckdb.connect(database=':memory:')
 
-    print("--- 🦆 Medallion Query Interface ---")
-    print(f"Connected to {layer_name.title()} layer at: {data_path}\n")
-    print("Available tables (views):")
+    # Banner and table list go nowhere in quiet mode
+    log = print if verbose else lambda *args, **kwargs: None
 
-    # Create a view for each parquet file
+    log("--- 🦆 Medallion Query Interface ---")
+    log(f"Connected to {layer_name.title()} layer at: {data_path}\n")
+    if catalog_path:
+        log(f"Using persistent catalog: {catalog_path}")
+        log("Available tables (materialized tables and views):")
+    else:
+        log("Available tables (views):")
+
+    # Create a view (or a materialized table) for each parquet file
     table_names = []
-    for file_path in parquet_files:
-        # 'data/gold/aov_by_store_month.parquet' -> 'aov_by_store_month'
-        file_name = os.path.basename(file_path)
-        table_name = file_name.replace(".parquet", "")
+    created = _created_tables.setdefault(con, {})
+    for table_name, source in table_sources.items():
         table_names.append(table_name)
+        partitions = partition_columns(source)
+        label = f"{table_name} (partitioned by {', '.join(partitions)})" if partitions else table_name
+
+        created[table_name] = source_fingerprint(source)
+        status = _create_table(con, table_name, source, catalog_path, hot_tables)
+        log(f"  - {label} ({status})" if status else f"  - {label}")
+
+    if catalog_path:
+        _drop_stale_tables(con, table_names)
+
+    for lookup_name in register_name_lookups(con, table_sources):
+        log(f"  - {lookup_name} (name lookup)")
+
+    return con, table_names
+
+def _create_table(con, table_name: str, source, catalog_path: str | None, hot_tables) -> str | None:
+    """
+    Creates the view of a table, or materializes it if it is a hot table
+    of a persistent catalog.
+
+    Returns:
+        str | None: 'cached' or 'refreshed' for a materialized table.
+    """
+    if catalog_path and (hot_tables is None or table_name in hot_tables):
+        return _refresh_materialized_table(con, table_name, source)
+
+    if catalog_path:
+        _drop_materialized_table(con, table_name)
+
+    # Create a view that scans the parquet file(s)
+    con.execute(f"""
+        CREATE OR REPLACE VIEW "{table_name}" AS
+        SELECT * FROM {table_scan_sql(source)};
+    """)
+    return None
+
+def refresh_views(con, data_path: str, table_sources: dict | None,
+                  catalog_path: str | None = None, hot_tables=None) -> dict:
+    """
+    Re-pins the tables of a session to their latest versions: recreates
+    the view (or materialized table) of every table whose source
+    fingerprint changed since it was created on this connection, and
+    drops those gone since 'table_sources'. Called before each statement,
+    so a long session sees newly published versions and never reads data
+    files garbage-collected since it started. The fingerprint, not the
+    source path, is compared: a directory table keeps its path when
+    files are added to it or rewritten.
+
+    Returns:
+        dict: The current table sources (see list_parquet_tables).
+    """
+    current = list_parquet_tables(data_path) if os.path.isdir(data_path) else {}
+    previous = table_sources or {}
+    created = _created_tables.setdefault(con, {})
+    for table_name, source in current.items():
+        fingerprint = source_fingerprint(source)
+        if created.get(table_name) != fingerprint:
+            _create_table(con, table_name, source, catalog_path, hot_tables)
+            created[table_name] = fingerprint
+    for table_name in set(previous) - set(current):
+        con.execute(f'DROP VIEW IF EXISTS "{table_name}";')
+        created.pop(table_name, None)
+        if catalog_path:
+            _drop_materialized_table(con, table_name)
+    register_name_lookups(con, current)
+    return current
+
+def register_name_lookups(con, table_sources: dict,
+                          silver_path: str = PATH_CONFIG["silver"]) -> list:
+    """
+    Registers the id -> name lookups of the shared dimension cache
+    (NAME_LOOKUPS, e.g. store_names: store_id, name) on a connection, so
+    queries join names from the cached copy instead of each re-reading
+    the silver stores and customers. A lookup is registered once per
+    connection, and again only when the cache re-read its dimension
+    (its Parquet fingerprint changed). A layer table of the same name
+    wins, and lookups whose silver table does not exist yet are skipped.
+
+    Returns:
+        list[str]: The lookups registered on the connection.
+    """
+    cache = get_dimension_cache(silver_path)
+    registered = _registered_lookups.setdefault(con, {})
+    for lookup_name, table in NAME_LOOKUPS.items():
+        if lookup_name in table_sources:
+            registered.pop(lookup_name, None)
+            continue
+        try:
+            fingerprint, lookup = cache.entry(table)
+        except FileNotFoundError:
+            continue
+        if registered.get(lookup_name) != fingerprint:
+            con.register(lookup_name, lookup)
+            registered[lookup_name] = fingerprint
+    return list(registered)
+
+def list_parquet_tables(data_path: str) -> dict:
+    """
+    Maps table names to their source in a layer directory: a single file
+    ('orders' -> 'data/silver/orders.parquet') or a directory of parquet
+    files, possibly Hive-partitioned ('orders' -> 'data/silver/orders'
+    holding 'year=2025/month=10/*.parquet').
+
+    A table written with versions (see shared.table_format) maps to the
+    data file of its latest version, so views built on it keep reading
+    that snapshot while the pipeline publishes newer ones. A fragmented
+    table (one file per raw shard) maps to the tuple of its fragments.
+    """
+    tables = {}
+    for table_name in list_tables(data_path):
+        files = pinned_files(os.path.join(data_path, f"{table_name}.parquet"))
+        tables[table_name] = files[0] if len(files) == 1 else tuple(files)
+
+    for entry in sorted(os.listdir(data_path)):
+        source = os.path.join(data_path, entry)
+        if entry.startswith("_"): # Table format internals (_data, _manifests)
+            continue
+        if os.path.isdir(source) and table_files(source):
+            tables.setdefault(entry, source) # A file table wins over a same-named directory
+    return dict(sorted(tables.items()))
+
+def table_files(source) -> list:
+    """Lists the parquet files of a table source (file, directory or fragments), sorted."""
+    if isinstance(source, tuple):
+        return sorted(source)
+    if os.path.isfile(source):
+        return [source]
+    return sorted(glob.glob(os.path.join(source, "**", "*.parquet"), recursive=True))
+
+def partition_columns(source) -> list:
+    """Returns the Hive partition keys of a directory table, e.g. ['year', 'month']."""
+    if isinstance(source, tuple) or os.path.isfile(source):
+        return []
+    columns = []
+    for file_path in table_files(source):
+        relative_dirs = os.path.relpath(os.path.dirname(file_path), source).split(os.sep)
+        for part in relative_dirs:
+            key = part.split("=", 1)[0]
+            if "=" in part and key not in columns:
+                columns.append(key)
+    return columns
+
+def table_scan_sql(source) -> str:
+    """
+    Builds the DuckDB table function reading a table source. Directories
+    are read with Hive partitioning (partition keys become columns, and
+    filters on them skip whole files) and, like fragments, union_by_name
+    (files may have added or reordered columns).
+    """
+    if isinstance(source, tuple):
+        files = ", ".join(f"'{file_path}'" for file_path in source)
+        return f"read_parquet([{files}], union_by_name = true)"
+    if os.path.isfile(source):
+        return f"parquet_scan('{source}')"
+    pattern = os.path.join(source, "**", "*.parquet")
+    return f"read_parquet('{pattern}', hive_partitioning = true, union_by_name = true)"
+
+def source_fingerprint(source) -> tuple:
+    """Fingerprints every file of a table source, so any rewrite changes it."""
+    return tuple(tuple(parquet_fingerprint(file_path)) for file_path in table_files(source))
+
+def _fingerprint_key(source) -> str:
+    """Serializes a table source's fingerprint for the catalog table."""
+    return ";".join(
+        ":".join(str(part) for part in fingerprint) for fingerprint in source_fingerprint(source)
+    )
 
-        # Create a view that scans the parquet file
+def _ensure_catalog_table(con):
+    """Creates the bookkeeping table of a persistent catalog if needed."""
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CATALOG_TABLE} (
+            table_name VARCHAR PRIMARY KEY,
+            source_path VARCHAR,
+            fingerprint VARCHAR
+        );
+    """)
+
+def _is_native_table(con, table_name: str) -> bool:
+    """True if 'table_name' is a materialized table (not a view)."""
+    return con.execute(
+        "SELECT count(*) FROM duckdb_tables() WHERE table_name = ? AND schema_name = 'main'",
+        [table_name]
+    ).fetchone()[0] > 0
+
+def _is_view(con, table_name: str) -> bool:
+    """True if 'table_name' is a view."""
+    return con.execute(
+        "SELECT count(*) FROM duckdb_views() WHERE view_name = ? AND schema_name = 'main'",
+        [table_name]
+    ).fetchone()[0] > 0
+
+def _refresh_materialized_table(con, table_name: str, source) -> str:
+    """
+    Materializes a parquet table (file or directory) as a native table,
+    unless the stored copy was loaded from the same file versions.
+
+    Returns:
+        str: 'cached' or 'refreshed', for display.
+    """
+    _ensure_catalog_table(con)
+    fingerprint = _fingerprint_key(source)
+
+    stored = con.execute(
+        f"SELECT fingerprint FROM {CATALOG_TABLE} WHERE table_name = ?", [table_name]
+    ).fetchone()
+    if stored and stored[0] == fingerprint and _is_native_table(con, table_name):
+        return "cached"
+
+    # Swap the table and its bookkeeping row in one transaction
+    con.execute("BEGIN TRANSACTION;")
+    try:
+        if _is_view(con, table_name):
+            con.execute(f'DROP VIEW "{table_name}";')
         con.execute(f"""
-            CREATE OR REPLACE VIEW "{table_name}" AS
-            SELECT * FROM parquet_scan('{file_path}');
+            CREATE OR REPLACE TABLE "{table_name}" AS
+            SELECT * FROM {table_scan_sql(source)};
         """)
-        print(f"  - {table_name}")
+        con.execute(
+            f"INSERT OR REPLACE INTO {CATALOG_TABLE} VALUES (?, ?, ?);",
+            [table_name, ";".join(table_files(source)) if isinstance(source, tuple) else source,
+             fingerprint]
+        )
+        con.execute("COMMIT;")
+    except duckdb.Error:
+        con.execute("ROLLBACK;")
+        raise
 
-    return con, table_names
+    return "refreshed"
+
+def _drop_materialized_table(con, table_name: str):
+    """Drops a previously materialized table that is now served as a view."""
+    _ensure_catalog_table(con)
+    if _is_native_table(con, table_name):
+        con.execute(f'DROP TABLE "{table_name}";')
+    con.execute(f"DELETE FROM {CATALOG_TABLE} WHERE table_name = ?;", [table_name])
+
+def _drop_stale_tables(con, table_names: list):
+    """Drops materialized tables and views whose parquet source no longer exists."""
+    _ensure_catalog_table(con)
+    view_names = [row[0] for row in con.execute(
+        "SELECT view_name FROM duckdb_views() WHERE NOT internal AND schema_name = 'main'"
+    ).fetchall()]
+    for view_name in view_names:
+        if view_name not in table_names:
+            con.execute(f'DROP VIEW IF EXISTS "{view_name}";')
+
+    stored_names = [row[0] for row in con.execute(
+        f"SELECT table_name FROM {CATALOG_TABLE}"
+    ).fetchall()]
+
+    for table_name in stored_names:
+        if table_name not in table_names:
+            _drop_materialized_table(con, table_name)
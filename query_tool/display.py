@@ -1,5 +1,9 @@
 """Handles formatting and printing of query results."""
+import sys
+import numpy as np
 import pandas as pd
+from .streaming import iter_pages
+from .profiling import format_operator_tree, parquet_scans
 
 def print_welcome_banner(table_names: list):
     """Prints the REPL welcome and help text."""
@@ -9,24 +13,116 @@ def print_welcome_banner(table_names: list):
         print(f"e.g., 'SELECT * FROM {table_names[0]} LIMIT 5;'")
     print("Type 'q' or 'exit' to quit.")
     print("Type '.vertical' or '.horizontal' to change display (Default: VERTICAL).")
+    print("Type '.maxrows N' to cap fetched rows (0 = no cap), '.pager on|off' to toggle paging.")
+    print("Type '.cache stats' or '.cache clear' to inspect or empty the result cache.")
+    print("Type '.timer on|off' to time queries, '.profile <query>' for scan stats and the plan,")
+    print("and '.log <file.jsonl>|off' to log per-query metrics.")
+    print("Press Ctrl-C to cancel a running query.")
     print("---\n")
 
-def print_results(df: pd.DataFrame, vertical_mode: bool):
-    """Prints a DataFrame in either vertical or horizontal mode."""
-    if df.empty:
-        print("(No results)")
-        return
+def _format_vertical(df: pd.DataFrame, first_row_num: int) -> str:
+    """
+    Formats rows as 'form' blocks, column by column instead of row by row:
+    every column is turned into strings in one vectorized call, and the
+    blocks are assembled with numpy string operations.
+    """
+    width = max(len(str(col)) for col in df.columns)
+    row_nums = np.arange(first_row_num, first_row_num + len(df)).astype(str)
+    parts = [np.char.add(np.char.add("---[ Row ", row_nums), " ]---")]
+
+    for col in df.columns:
+        label = f"{str(col):<{width}}    "
+        values = df[col].astype(str).to_numpy(dtype=str)
+        parts.append(np.char.add(label, values))
 
+    # Rows x (1 + columns) grid, read row by row
+    return "\n".join(np.column_stack(parts).ravel())
+
+def _format_page(df: pd.DataFrame, vertical_mode: bool, first_row_num: int) -> str:
+    """Formats one page of results in either vertical or horizontal mode."""
     if vertical_mode:
         # --- VERTICAL MODE ---
-        # Print each row one by one, like a form
-        total_rows = len(df)
-        for row_num, (_, row) in enumerate(df.iterrows(), 1):
-            print(f"---[ Row {row_num} / {total_rows} ]---")
-            # A pandas Series.to_string() is always readable
-            print(row.to_string())
-        print(f"---[ End of {total_rows} rows ]---")
+        return _format_vertical(df, first_row_num)
+    # --- HORIZONTAL MODE ---
+    return df.to_string(index=False)
+
+def _continue_paging(rows_shown: int) -> bool:
+    """Asks whether to show the next page. Returns False to stop."""
+    answer = input(f"-- {rows_shown} rows shown. Enter: next page, q: stop -- ")
+    return answer.strip().lower() not in ("q", "quit")
+
+def print_stream(stream, vertical_mode: bool, page_size: int, paged: bool):
+    """
+    Prints a QueryStream page by page.
+
+    Only one page is converted to pandas and formatted at a time. When
+    'paged' is on (and stdin is a terminal), the user is asked before
+    each following page.
+
+    Returns:
+        int: The number of rows printed.
+    """
+    paged = paged and sys.stdin.isatty()
+    rows_shown = 0
+
+    for page in iter_pages(stream, page_size):
+        if rows_shown and paged and not _continue_paging(rows_shown):
+            stream.cancel()
+            print(f"---[ Stopped after {rows_shown} rows ]---")
+            return rows_shown
+
+        print(_format_page(page.to_pandas(), vertical_mode, rows_shown + 1))
+        rows_shown += page.num_rows
+
+    if not stream.has_result:
+        return rows_shown # e.g. CREATE VIEW: nothing to print
+
+    if rows_shown == 0:
+        print("(No results)")
+    elif stream.truncated:
+        print(f"---[ Showing first {rows_shown} rows (row cap reached, see .maxrows) ]---")
     else:
-        # --- HORIZONTAL MODE ---
-        # The original method, for tables you know are small
-        print(df.to_string(index=False))
+        print(f"---[ End of {rows_shown} rows ]---")
+    return rows_shown
+
+def print_timing(elapsed_s: float, rows: int, cached: bool):
+    """Prints the '.timer on' line after a query."""
+    source = " (from result cache)" if cached else ""
+    print(f"Run Time: {elapsed_s:.3f}s, {rows:,} rows{source}")
+
+def print_profile(profile: dict | None, elapsed_s: float, rows: int):
+    """Prints the report of '.profile': totals, per-file scan stats, operator tree."""
+    print("---[ Profile ]---")
+    print(f"elapsed         {elapsed_s:.3f}s")
+    print(f"rows returned   {rows:,}")
+    if profile is None:
+        print("(No profile: the query did not run to completion)")
+        return
+
+    print(f"cpu time        {profile.get('cpu_time', 0):.3f}s")
+    print(f"bytes read      {profile.get('total_bytes_read', 0):,}")
+    print(f"rows scanned    {profile.get('cumulative_rows_scanned', 0):,}")
+
+    scans = parquet_scans(profile)
+    if scans:
+        print("---[ Parquet scans ]---")
+        for scan in scans:
+            print(f"{scan['file']}")
+            if scan["rows_scanned"] is None:
+                rows = f"file rows {scan['file_rows'] or 0:,} (1 of {scan['files_in_scan']} files)"
+            else:
+                rows = f"rows scanned {scan['rows_scanned']:,} of {scan['file_rows'] or 0:,}"
+            print(f"  {rows}, row groups {scan['row_groups']}, "
+                  f"projected bytes {scan['projected_bytes'] or 0:,} "
+                  f"({len(scan['columns'])} columns)")
+            if scan["filters"]:
+                print(f"  filters: {scan['filters']}")
+
+    print("---[ Operator tree (EXPLAIN ANALYZE) ]---")
+    print(format_operator_tree(profile))
+
+def print_cache_stats(stats: dict):
+    """Prints the result cache counters."""
+    print("---[ Result cache ]---")
+    for name, value in stats.items():
+        print(f"{name:<16}{value}")
@@ -0,0 +1,161 @@
+"""Query timing, DuckDB profiling and the JSONL query log."""
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+import pyarrow.parquet as pq
+
+class QueryProfiler:
+    """
+    Collects DuckDB's JSON profile (the EXPLAIN ANALYZE operator tree plus
+    totals) for the statements run between start() and finish().
+    """
+
+    def __init__(self, con):
+        self._con = con
+        fd, self._output_path = tempfile.mkstemp(prefix="duckdb_profile_", suffix=".json")
+        os.close(fd)
+
+    def start(self):
+        """Enables profiling for the next statement."""
+        self._con.execute("PRAGMA enable_profiling = 'json';")
+        self._con.execute(f"PRAGMA profiling_output = '{self._output_path}';")
+        if os.path.exists(self._output_path):
+            os.remove(self._output_path) # No stale profile if the query fails
+
+    def finish(self) -> dict | None:
+        """
+        Disables profiling and returns the profile of the last statement,
+        or None if DuckDB wrote none (e.g. the query was cancelled).
+        """
+        # Read before disabling: the PRAGMA itself would overwrite the profile
+        try:
+            with open(self._output_path, encoding="utf-8") as profile_file:
+                profile = json.load(profile_file)
+        except (FileNotFoundError, ValueError):
+            profile = None
+        self._con.execute("PRAGMA disable_profiling;")
+        return profile
+
+    def close(self):
+        """Removes the temporary profile file."""
+        if os.path.exists(self._output_path):
+            os.remove(self._output_path)
+
+def _as_list(value) -> list:
+    """DuckDB reports one-or-many values as a string or a list."""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [part.strip() for part in str(value).replace("\n", ",").split(",") if part.strip()]
+
+def iter_operators(node: dict, depth: int = 0):
+    """Yields (depth, operator) for every node of a profile tree."""
+    for child in node.get("children", []):
+        yield depth, child
+        yield from iter_operators(child, depth + 1)
+
+def parquet_scans(profile: dict) -> list:
+    """
+    Summarizes every Parquet scan of a profile, per file.
+
+    DuckDB reports rows scanned per scan operator, not per row group, so
+    for each file the footer is read to add its row group count and the
+    compressed size of the projected columns (what a scan without row
+    group pruning reads). Rows scanned below the file's row count mean
+    filters pruned row groups.
+
+    Returns:
+        list[dict]: One entry per file: file, columns, filters, rows_scanned
+        (None in multi-file scans), files_in_scan, file_rows, row_groups,
+        projected_bytes.
+    """
+    scans = []
+    for _, node in iter_operators(profile):
+        extra = node.get("extra_info", {})
+        if extra.get("Function") not in ("PARQUET_SCAN", "READ_PARQUET"):
+            continue
+
+        files = _as_list(extra.get("Filename(s)"))
+        columns = _as_list(extra.get("Projections"))
+        rows_scanned = node.get("operator_rows_scanned", node.get("operator_cardinality"))
+        for file_path in files:
+            entry = {
+                "file": file_path,
+                "columns": columns,
+                "filters": extra.get("Filters") or extra.get("File Filters"),
+                # DuckDB counts per scan, so it is only per file for one-file scans
+                "rows_scanned": rows_scanned if len(files) == 1 else None,
+                "files_in_scan": len(files),
+                "file_rows": None,
+                "row_groups": None,
+                "projected_bytes": None,
+            }
+            if os.path.exists(file_path):
+                entry.update(_footer_stats(file_path, columns))
+            scans.append(entry)
+    return scans
+
+def _footer_stats(file_path: str, columns: list) -> dict:
+    """Reads a Parquet footer: rows, row groups, compressed bytes of 'columns'."""
+    metadata = pq.ParquetFile(file_path).metadata
+    wanted = set(columns)
+    projected_bytes = 0
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        for j in range(row_group.num_columns):
+            column = row_group.column(j)
+            if not wanted or column.path_in_schema.split(".")[0] in wanted:
+                projected_bytes += column.total_compressed_size
+    return {
+        "file_rows": metadata.num_rows,
+        "row_groups": metadata.num_row_groups,
+        "projected_bytes": projected_bytes,
+    }
+
+def format_operator_tree(profile: dict) -> str:
+    """Renders the operator tree of a profile like EXPLAIN ANALYZE, one line per operator."""
+    lines = []
+    for depth, node in iter_operators(profile):
+        name = node.get("operator_name") or node.get("operator_type", "?")
+        rows = node.get("operator_cardinality", 0)
+        seconds = node.get("operator_timing", 0.0)
+        extra = node.get("extra_info", {})
+        filters = extra.get("Filters") or extra.get("File Filters")
+        detail = f"  filters: {filters}" if filters else ""
+        lines.append(f"{'  ' * depth}{name:<{max(1, 28 - 2 * depth)}}{rows:>12,} rows {seconds:>9.4f}s{detail}")
+    return "\n".join(lines)
+
+def profile_summary(profile: dict | None) -> dict:
+    """Extracts the per-statement metrics kept in the query log."""
+    if not profile:
+        return {}
+    return {
+        "latency_s": profile.get("latency"),
+        "cpu_time_s": profile.get("cpu_time"),
+        "bytes_read": profile.get("total_bytes_read"),
+        "rows_scanned": profile.get("cumulative_rows_scanned"),
+        "scans": parquet_scans(profile),
+    }
+
+class QueryLog:
+    """Appends one JSON line of metrics per executed statement to 'path'."""
+
+    def __init__(self, path: str, layer_name: str):
+        self.path = path
+        self.layer_name = layer_name
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, query: str, elapsed_s: float, rows: int, **metrics):
+        """Appends a record for one statement."""
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "layer": self.layer_name,
+            "sql": query,
+            "elapsed_s": round(elapsed_s, 6),
+            "rows": rows,
+            **metrics,
+        }
+        with open(self.path, "a", encoding="utf-8") as log_file:
+            log_file.write(json.dumps(record, default=str) + "\n")
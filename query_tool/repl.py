@@ -1,28 +1,61 @@
 """Contains the main Read-Eval-Print Loop (REPL) for the query tool."""
+import time
 import duckdb
-from .database import connect_and_create_views
-from .display import print_welcome_banner, print_results
+from .database import connect_and_create_views, list_parquet_tables, refresh_views
+from .config import DEFAULT_MAX_ROWS, PAGE_SIZE, RESULT_CACHE_MAX_BYTES, RESULT_CACHE_SPILL_MAX_BYTES
+from .display import (
+    print_welcome_banner, print_stream, print_cache_stats, print_timing, print_profile
+)
+from .profiling import QueryProfiler, QueryLog, profile_summary
+from .result_cache import QueryResultCache
+from .streaming import QueryStream, TableStream
 
-def start_query_repl(layer_name: str, data_path: str):
+def start_query_repl(layer_name: str, data_path: str,
+                     catalog_path: str | None = None, hot_tables=None,
+                     max_rows: int = DEFAULT_MAX_ROWS, cache_spill_dir: str | None = None,
+                     query_log_path: str | None = None):
     """
     Starts an interactive Read-Eval-Print Loop (REPL) for querying.
+    'catalog_path' and 'hot_tables' enable the persistent DuckDB catalog.
+    'max_rows' caps how many rows a query fetches (0 = no cap).
+    'cache_spill_dir' lets the result cache spill evicted results to disk.
+    'query_log_path' appends a JSONL record of metrics per query.
     """
 
     # Setup the database connection and views
     try:
-        con, table_names = connect_and_create_views(layer_name, data_path)
+        con, table_names = connect_and_create_views(
+            layer_name, data_path, catalog_path=catalog_path, hot_tables=hot_tables
+        )
     except SystemExit:
         return # Exit gracefully if db setup failed
 
+    # Results are cached per (SQL, fingerprints of the files it reads)
+    table_sources = list_parquet_tables(data_path)
+    result_cache = QueryResultCache(RESULT_CACHE_MAX_BYTES, spill_dir=cache_spill_dir,
+                                    spill_max_bytes=RESULT_CACHE_SPILL_MAX_BYTES)
+
+    # Timing and profiling
+    profiler = QueryProfiler(con)
+    query_log = QueryLog(query_log_path, layer_name) if query_log_path else None
+    timer = False
+
     # Print the welcome message
     print_welcome_banner(table_names)
 
     # Start the query loop
     vertical_mode = True # Default to readable vertical mode
+    paged = True # Ask before printing each following page
 
     while True:
         try:
-            query = input("sql> ").strip()
+            try:
+                query = input("sql> ").strip()
+            except KeyboardInterrupt:
+                print() # Ctrl-C at the prompt just clears the line
+                continue
+            except EOFError:
+                break # Ctrl-D / end of piped input
 
             if query.lower() in ['q', 'exit', '.exit']:
                 break
@@ -37,16 +70,81 @@ def start_query_repl(layer_name: str, data_path: str):
                 print("Display mode set to: HORIZONTAL")
                 continue
 
+            if query.lower().startswith('.maxrows'):
+                parts = query.split()
+                if len(parts) == 2 and parts[1].isdigit():
+                    max_rows = int(parts[1])
+                print(f"Row cap set to: {max_rows or 'none'}")
+                continue
+
+            if query.lower() in ['.pager on', '.pager off']:
+                paged = query.lower().endswith('on')
+                print(f"Paging set to: {'ON' if paged else 'OFF'}")
+                continue
+
+            if query.lower().startswith('.cache'):
+                _handle_cache_command(result_cache, query.lower().split()[1:])
+                continue
+
+            if query.lower() in ['.timer on', '.timer off']:
+                timer = query.lower().endswith('on')
+                print(f"Timer set to: {'ON' if timer else 'OFF'}")
+                continue
+
+            if query.lower().startswith('.log'):
+                query_log = _handle_log_command(query_log, query.split()[1:], layer_name)
+                continue
+
             if not query:
                 continue
 
-            # Execute the query
-            result = con.sql(query)
+            # Re-pin the tables to their latest versions before every statement
+            table_sources = refresh_views(con, data_path, table_sources, catalog_path, hot_tables)
+
+            if query.lower().startswith('.profile'):
+                profiled_query = query[len('.profile'):].strip()
+                if not profiled_query:
+                    print("Usage: .profile <query>")
+                    continue
+                _profile_query(con, profiler, profiled_query, query_log)
+                continue
+
+            # Serve from the result cache, or execute the query in the
+            # background and print it as it streams in
+            started = time.perf_counter()
+            cache_key = result_cache.key_for(con, query, table_sources)
+            cached = result_cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                stream = TableStream(cached, max_rows)
+            else:
+                if query_log:
+                    profiler.start() # Logged queries also record their scans
+                record_bytes = result_cache.max_bytes if cache_key else 0
+                stream = QueryStream(con, query, max_rows=max_rows, record_bytes=record_bytes)
+
+            rows = 0
+            try:
+                rows = print_stream(stream, vertical_mode, PAGE_SIZE, paged)
+            except KeyboardInterrupt:
+                stream.cancel()
+                print("\nQuery cancelled.")
+            finally:
+                elapsed = time.perf_counter() - started
+                profile = profiler.finish() if query_log and cached is None else None
+
+            if timer:
+                print_timing(elapsed, rows, cached is not None)
+            if query_log:
+                query_log.write(
+                    query, elapsed, rows, cached=cached is not None,
+                    truncated=stream.truncated, completed=stream.completed,
+                    **profile_summary(profile)
+                )
 
-            # If it's a SELECT statement, print the result
-            if result:
-                df = result.df()
-                print_results(df, vertical_mode)
+            if cache_key and cached is None and stream.completed:
+                result_table = stream.recorded_table()
+                if result_table is not None:
+                    result_cache.put(cache_key, result_table)
 
         except duckdb.Error as e:
             print(f"DuckDB Error: {e}")
@@ -54,4 +152,52 @@ def start_query_repl(layer_name: str, data_path: str):
             print(f"An error occurred: {e}")
 
     print("\nClosing connection. Goodbye!")
+    profiler.close()
     con.close()
+
+def _profile_query(con, profiler: QueryProfiler, query: str, query_log: QueryLog | None):
+    """Handles '.profile <query>': runs it to completion and prints its profile."""
+    started = time.perf_counter()
+    profiler.start()
+    stream = QueryStream(con, query, max_rows=0)
+    rows = 0
+    try:
+        for batch in stream:
+            rows += batch.num_rows
+    except KeyboardInterrupt:
+        stream.cancel()
+        print("\nQuery cancelled.")
+    finally:
+        elapsed = time.perf_counter() - started
+        profile = profiler.finish()
+
+    print_profile(profile, elapsed, rows)
+    if query_log:
+        query_log.write(query, elapsed, rows, cached=False, truncated=False,
+                        completed=stream.completed, profiled=True,
+                        **profile_summary(profile))
+
+def _handle_log_command(query_log: QueryLog | None, args: list, layer_name: str):
+    """Handles '.log <path>|off'. Returns the (new) query log, or None."""
+    if not args:
+        print(f"Query log: {query_log.path if query_log else 'OFF'}")
+        return query_log
+    if args[0].lower() == 'off':
+        print("Query log set to: OFF")
+        return None
+    print(f"Logging queries to: {args[0]}")
+    return QueryLog(args[0], layer_name)
+
+def _handle_cache_command(result_cache: QueryResultCache, args: list):
+    """Handles '.cache stats|clear|on|off'."""
+    command = args[0] if args else 'stats'
+    if command == 'stats':
+        print_cache_stats(result_cache.stats())
+    elif command == 'clear':
+        result_cache.clear()
+        print("Result cache cleared.")
+    elif command in ('on', 'off'):
+        result_cache.enabled = command == 'on'
+        print(f"Result cache set to: {command.upper()}")
+    else:
+        print("Usage: .cache stats|clear|on|off")
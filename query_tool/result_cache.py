@@ -0,0 +1,241 @@
+"""Caches query results, keyed on the SQL text and the Parquet files it reads."""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+import duckdb
+import pyarrow as pa
+from .database import source_fingerprint
+
+# Queries calling these are never cached: they read files directly or
+# are not deterministic.
+UNCACHEABLE_CALLS = re.compile(
+    r"\b(read_\w+|parquet_scan|glob|random|setseed|uuid|gen_random_uuid|now|current_\w+)\s*\(",
+    re.IGNORECASE
+)
+
+def normalize_sql(query: str) -> str:
+    """
+    Normalizes SQL text for use in a cache key: collapses whitespace outside
+    of quoted strings/identifiers and drops trailing semicolons.
+    """
+    parts = re.split(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")", query.strip())
+    for i in range(0, len(parts), 2): # Even parts are outside quotes
+        parts[i] = re.sub(r"\s+", " ", parts[i])
+    return "".join(parts).strip().rstrip(";").strip()
+
+def referenced_tables(con, query: str) -> set | None:
+    """
+    Lists the tables a single SELECT statement reads (lowercased), from
+    DuckDB's parse tree. CTE names are left out.
+
+    Returns None if the query is not a single SELECT or calls a table
+    function (e.g. read_parquet), since its inputs are then unknown.
+    """
+    try:
+        tree = json.loads(con.execute("SELECT json_serialize_sql(?)", [query]).fetchone()[0])
+    except duckdb.Error:
+        return None
+    if tree.get("error") or len(tree.get("statements", [])) != 1:
+        return None
+
+    tables, cte_names = set(), set()
+    pending = [tree["statements"][0]]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        if node.get("type") == "TABLE_FUNCTION":
+            return None
+        if node.get("type") == "BASE_TABLE":
+            tables.add(node["table_name"].lower())
+        if "cte_map" in node:
+            cte_names.update(entry["key"].lower() for entry in node["cte_map"]["map"])
+        pending.extend(node.values())
+
+    return tables - cte_names
+
+class QueryResultCache:
+    """
+    LRU cache of query results as Arrow tables.
+
+    The key is the normalized SQL plus the fingerprints of every Parquet
+    file behind the tables the query references, so rewriting a file (e.g. by the IO
+    manager's dump_to_path) invalidates its entries automatically.
+    Entries evicted from memory are spilled to Arrow IPC files in
+    'spill_dir' when one is given. The spill dir holds at most
+    'spill_max_bytes' (default: max_bytes; least recently used files, by
+    mtime, are deleted first), and files left by an earlier session are deleted on start:
+    only this session knows which of its keys are still current.
+    """
+
+    def __init__(self, max_bytes: int, spill_dir: str | None = None,
+                 spill_max_bytes: int | None = None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = max_bytes if spill_max_bytes is None else spill_max_bytes
+        self.enabled = True
+        self._entries = OrderedDict() # key -> pa.Table
+        self._current_bytes = 0
+        self._latest_key = {} # normalized sql -> key of its newest entry
+        self._counters = {"hits": 0, "misses": 0, "spill_hits": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self._remove_spill_files()
+
+    def key_for(self, con, query: str, table_files: dict) -> str | None:
+        """
+        Builds the cache key of a query, or returns None if it can't be cached
+        (not a single SELECT, reads files directly, non-deterministic, or
+        references a table that is not backed by a known Parquet file).
+
+        Args:
+            con: The DuckDB connection (used to parse the query).
+            query (str): The SQL text.
+            table_files (dict[str, str]): Table name -> Parquet source (file or
+                directory), as returned by list_parquet_tables.
+        """
+        if not self.enabled or UNCACHEABLE_CALLS.search(query):
+            return None
+
+        referenced = referenced_tables(con, query)
+        if referenced is None:
+            return None
+
+        known = {name.lower(): path for name, path in table_files.items()}
+        if not referenced or not referenced <= set(known):
+            return None
+
+        sql = normalize_sql(query)
+        fingerprints = sorted(
+            (name, known[name], source_fingerprint(known[name]))
+            for name in referenced
+        )
+        key = hashlib.sha256(repr((sql, fingerprints)).encode()).hexdigest()
+
+        # A new key for the same SQL means its files changed: drop the old entry
+        with self._lock:
+            old_key = self._latest_key.get(sql)
+            self._latest_key[sql] = key
+            if old_key is not None and old_key != key:
+                self._drop(old_key)
+        return key
+
+    def get(self, key: str) -> pa.Table | None:
+        """Returns a cached result, looking in memory and then in the spill dir."""
+        with self._lock:
+            table = self._entries.get(key)
+            if table is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return table
+
+            spill_path = self._spill_path(key)
+            if spill_path and os.path.exists(spill_path):
+                table = pa.ipc.open_file(pa.memory_map(spill_path, "r")).read_all()
+                os.utime(spill_path) # Recently used: deleted last when trimming
+                self._counters["spill_hits"] += 1
+                return table
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: str, table: pa.Table) -> None:
+        """Adds a result, evicting (and possibly spilling) the least recently used."""
+        if table.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = table
+            self._current_bytes += table.nbytes
+
+            while self._current_bytes > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._current_bytes -= evicted.nbytes
+                self._counters["evictions"] += 1
+                self._spill(evicted_key, evicted)
+
+    def clear(self) -> None:
+        """Empties the memory tier and deletes all spilled results."""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+            self._latest_key.clear()
+            self._remove_spill_files()
+
+    def stats(self) -> dict:
+        """Returns counters plus the current size of both tiers."""
+        with self._lock:
+            spilled = self._spill_files()
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "spilled_entries": len(spilled),
+                "spilled_bytes": sum(size for _, _, size in spilled),
+                "spill_max_bytes": self.spill_max_bytes,
+                "enabled": self.enabled,
+            }
+
+    def _drop(self, key: str) -> None:
+        """Removes one entry from both tiers. Caller must hold the lock."""
+        table = self._entries.pop(key, None)
+        if table is not None:
+            self._current_bytes -= table.nbytes
+        spill_path = self._spill_path(key)
+        if spill_path and os.path.exists(spill_path):
+            os.remove(spill_path)
+
+    def _spill(self, key: str, table: pa.Table) -> None:
+        """
+        Writes an evicted entry to the spill dir, if there is one, then
+        deletes the least recently used spill files over spill_max_bytes.
+        Caller must hold the lock.
+        """
+        spill_path = self._spill_path(key)
+        if not spill_path or table.nbytes > self.spill_max_bytes:
+            return
+        with pa.OSFile(spill_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        spilled = sorted(self._spill_files(), key=lambda spill_file: spill_file[1])
+        spilled_bytes = sum(size for _, _, size in spilled)
+        for file_path, _, size in spilled:
+            if spilled_bytes <= self.spill_max_bytes:
+                break
+            os.remove(file_path)
+            spilled_bytes -= size
+
+    def _spill_files(self) -> list:
+        """Lists the spill files as (path, mtime_ns, size). Caller must hold the lock."""
+        if not self.spill_dir:
+            return []
+        spilled = []
+        for file_name in os.listdir(self.spill_dir):
+            if file_name.endswith(".arrow"):
+                stat = os.stat(os.path.join(self.spill_dir, file_name))
+                spilled.append((os.path.join(self.spill_dir, file_name), stat.st_mtime_ns, stat.st_size))
+        return spilled
+
+    def _remove_spill_files(self) -> None:
+        """Deletes every spill file. Caller must hold the lock (or be __init__)."""
+        for file_path, _, _ in self._spill_files():
+            os.remove(file_path)
+
+    def _spill_path(self, key: str) -> str | None:
+        """Returns the spill file of a key, or None without a spill dir."""
+        if not self.spill_dir:
+            return None
+        return os.path.join(self.spill_dir, f"{key}.arrow")
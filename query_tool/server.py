@@ -0,0 +1,276 @@
+"""
+Long-running local query server.
+
+One warm in-memory DuckDB database holds a schema per layer (bronze,
+silver, gold) with a view per Parquet table (file or partitioned
+directory). Requests are answered over HTTP on a pool of cursors of
+that database, and results are sent back as an Arrow IPC stream.
+
+Endpoints:
+    POST /query?layer=gold&max_rows=N   SQL in the body -> Arrow IPC stream
+    GET  /tables                        Layer -> table names (JSON)
+    GET  /health                        Pool and reload status (JSON)
+"""
+import json
+import os
+import queue
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import duckdb
+import pyarrow as pa
+from .config import PATH_CONFIG
+from .database import list_parquet_tables, register_name_lookups, table_files, table_scan_sql
+
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+
+DEFAULT_HOST = "127.0.0.1" # Local only
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4 # Queries running at the same time
+DEFAULT_QUEUE_TIMEOUT = 30.0 # Seconds a request waits for a free cursor
+DEFAULT_POLL_INTERVAL = 2.0 # Seconds between checks for changed Parquet files
+
+class QueryServerState:
+    """
+    The warm database shared by all requests.
+
+    - A pool of 'workers' cursors limits how many queries run at once;
+      further requests wait (up to 'queue_timeout') for a free cursor.
+    - A background thread polls the layer directories and re-creates
+      the views when a Parquet file is added, removed or rewritten.
+    """
+
+    def __init__(self, layer_paths: dict, workers: int = DEFAULT_WORKERS,
+                 queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.layer_paths = layer_paths
+        self.queue_timeout = queue_timeout
+        self.poll_interval = poll_interval
+        self.reloads = 0
+
+        self._con = duckdb.connect(database=":memory:")
+        self._tables = {} # layer -> {table name: file path}
+        self._file_state = None
+        self._lock = threading.Lock() # Serializes view (re)creation
+        self._stopped = threading.Event()
+
+        self.reload_views()
+
+        self._pool = queue.Queue()
+        for _ in range(workers):
+            self._pool.put(self._con.cursor())
+        self.workers = workers
+
+        self._watcher = threading.Thread(target=self._watch, daemon=True)
+        self._watcher.start()
+
+    def layer_tables(self, layer: str) -> dict:
+        """Returns the table name -> source map of one layer."""
+        with self._lock:
+            return dict(self._tables.get(layer, {}))
+
+    def tables(self) -> dict:
+        """Returns layer -> sorted table names."""
+        with self._lock:
+            return {layer: sorted(tables) for layer, tables in self._tables.items()}
+
+    def acquire(self):
+        """Takes a cursor from the pool, or raises queue.Empty after the timeout."""
+        return self._pool.get(timeout=self.queue_timeout)
+
+    def release(self, cursor):
+        """Returns a cursor to the pool."""
+        self._pool.put(cursor)
+
+    def idle_workers(self) -> int:
+        """Number of cursors currently free."""
+        return self._pool.qsize()
+
+    def reload_views(self) -> bool:
+        """
+        Re-creates the views if any layer's Parquet files changed.
+
+        Returns:
+            bool: True if the views were re-created.
+        """
+        file_state = self._scan_files()
+        with self._lock:
+            if file_state == self._file_state:
+                return False
+
+            tables = {}
+            for layer, data_path in self.layer_paths.items():
+                tables[layer] = list_parquet_tables(data_path) if os.path.isdir(data_path) else {}
+                self._con.execute(f'CREATE SCHEMA IF NOT EXISTS "{layer}";')
+
+                existing = {row[0] for row in self._con.execute(
+                    "SELECT view_name FROM duckdb_views() WHERE schema_name = ?", [layer]
+                ).fetchall()}
+                for view_name in existing - set(tables[layer]):
+                    self._con.execute(f'DROP VIEW "{layer}"."{view_name}";')
+
+                for table_name, source in tables[layer].items():
+                    self._con.execute(f"""
+                        CREATE OR REPLACE VIEW "{layer}"."{table_name}" AS
+                        SELECT * FROM {table_scan_sql(source)};
+                    """)
+
+            self._tables = tables
+            self._file_state = file_state
+            self.reloads += 1
+            return True
+
+    def close(self):
+        """Stops the watcher and closes the database."""
+        self._stopped.set()
+        self._watcher.join(timeout=self.poll_interval + 1)
+        self._con.close()
+
+    def _scan_files(self) -> frozenset:
+        """Cheap snapshot of all layer files: (path, mtime_ns, size)."""
+        state = set()
+        for data_path in self.layer_paths.values():
+            if not os.path.isdir(data_path):
+                continue
+            for source in list_parquet_tables(data_path).values():
+                for file_path in table_files(source):
+                    try:
+                        stat = os.stat(file_path)
+                    except FileNotFoundError:
+                        continue # Removed while scanning
+                    state.add((file_path, stat.st_mtime_ns, stat.st_size))
+        return frozenset(state)
+
+    def _watch(self):
+        """Watcher thread: polls for changed files until close()."""
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                if self.reload_views():
+                    print(f"Parquet files changed: views reloaded (#{self.reloads}).")
+            except duckdb.Error as e:
+                print(f"Error reloading views: {e}", file=sys.stderr)
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """Answers one HTTP request using the server's QueryServerState."""
+
+    server_version = "MedallionQueryServer/1.0"
+
+    def do_GET(self): # pylint: disable=invalid-name
+        """Serves /tables and /health."""
+        state = self.server.state
+        path = urlparse(self.path).path
+        if path == "/tables":
+            self._send_json(200, state.tables())
+        elif path == "/health":
+            self._send_json(200, {
+                "workers": state.workers,
+                "idle_workers": state.idle_workers(),
+                "reloads": state.reloads,
+            })
+        else:
+            self._send_json(404, {"error": f"Unknown path: {path}"})
+
+    def do_POST(self): # pylint: disable=invalid-name
+        """Serves /query: runs the SQL in the body, streams the result as Arrow IPC."""
+        url = urlparse(self.path)
+        if url.path != "/query":
+            self._send_json(404, {"error": f"Unknown path: {url.path}"})
+            return
+
+        params = parse_qs(url.query)
+        layer = params.get("layer", ["gold"])[0]
+        max_rows = int(params.get("max_rows", ["0"])[0])
+        length = int(self.headers.get("Content-Length", 0))
+        query = self.rfile.read(length).decode("utf-8")
+
+        state = self.server.state
+        if layer not in state.layer_paths:
+            self._send_json(400, {"error": f"Unknown layer: {layer}"})
+            return
+
+        try:
+            cursor = state.acquire()
+        except queue.Empty:
+            self._send_json(503, {"error": "Server busy: no free worker, try again later."})
+            return
+
+        try:
+            # Re-pin the views to the tables' latest versions, as the watcher
+            # may not have polled since the last publish (or garbage collection)
+            state.reload_views()
+            # Name lookups are registered once per cursor (see register_name_lookups)
+            register_name_lookups(cursor, state.layer_tables(layer),
+                                  state.layer_paths.get("silver", PATH_CONFIG["silver"]))
+            # Unqualified table names resolve in the requested layer
+            cursor.execute(f'SET search_path = "{layer}";')
+            relation = cursor.sql(query)
+            if relation is None:
+                self._send_json(200, {"status": "ok"}) # e.g. SET: no result set
+                return
+            reader = relation.fetch_record_batch()
+
+            self.send_response(200)
+            self.send_header("Content-Type", ARROW_STREAM_TYPE)
+            self.end_headers()
+            self._write_arrow(reader, max_rows)
+        except duckdb.Error as e:
+            self._send_json(400, {"error": str(e)})
+        finally:
+            state.release(cursor)
+
+    def _write_arrow(self, reader, max_rows: int):
+        """Streams record batches to the client, stopping after 'max_rows'."""
+        rows = 0
+        writer = pa.ipc.new_stream(self.wfile, reader.schema)
+        try:
+            for batch in reader:
+                if max_rows and rows + batch.num_rows > max_rows:
+                    batch = batch.slice(0, max_rows - rows)
+                writer.write_batch(batch)
+                rows += batch.num_rows
+                if max_rows and rows >= max_rows:
+                    break
+        except (duckdb.Error, OSError) as e:
+            # Headers are already sent: end without the end-of-stream marker,
+            # so the client sees a truncated stream instead of a partial result
+            self.log_message("Query failed while streaming: %s", e)
+            return
+        writer.close()
+
+    def _send_json(self, status: int, payload: dict):
+        """Sends a small JSON response."""
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        """Logs requests to stderr in a compact form."""
+        print(f"{self.address_string()} {format % args}", file=sys.stderr)
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          workers: int = DEFAULT_WORKERS, poll_interval: float = DEFAULT_POLL_INTERVAL,
+          layer_paths: dict | None = None):
+    """Starts the query server and blocks until Ctrl-C."""
+    state = QueryServerState(
+        layer_paths or PATH_CONFIG, workers=workers, poll_interval=poll_interval
+    )
+    httpd = ThreadingHTTPServer((host, port), QueryRequestHandler)
+    httpd.daemon_threads = True
+    httpd.state = state
+
+    print("--- 🦆 Medallion Query Server ---")
+    print(f"Listening on http://{host}:{port} with {workers} workers")
+    for layer, table_names in state.tables().items():
+        print(f"  {layer}: {', '.join(table_names) or '(no tables)'}")
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        httpd.server_close()
+        state.close()
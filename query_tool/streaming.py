@@ -0,0 +1,153 @@
+"""Runs a query in the background and streams its result as Arrow record batches."""
+import queue
+import threading
+import pyarrow as pa
+
+# Marks the end of the stream in the batch queue
+_DONE = object()
+
+class QueryStream:
+    """
+    Executes one SQL statement on a worker thread and yields its result
+    incrementally as pyarrow RecordBatches.
+
+    - At most 'max_rows' rows are fetched (0 = no cap); 'truncated' tells
+      if more existed.
+    - A small bounded queue keeps the worker at most a couple of batches
+      ahead of the consumer, so memory stays bounded.
+    - cancel() interrupts the running DuckDB query (e.g. on Ctrl-C).
+    - With 'record_bytes', the batches are also kept (up to that many
+      bytes) so a complete result can be handed to the result cache.
+    """
+
+    def __init__(self, con, query: str, max_rows: int, batch_rows: int = 2048,
+                 record_bytes: int = 0):
+        self.query = query
+        self.max_rows = max_rows
+        self.batch_rows = batch_rows
+        self.has_result = False # False for statements without a result set
+        self.truncated = False
+        self.completed = False # True once every row was fetched
+        self.schema = None
+
+        self._record_bytes = record_bytes
+        self._recorded = [] if record_bytes else None
+
+        self._con = con
+        self._queue = queue.Queue(maxsize=2)
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def __iter__(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue # Wake up regularly so Ctrl-C is handled promptly
+
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def recorded_table(self) -> pa.Table | None:
+        """Returns the full result if it was fetched completely and recorded."""
+        if not self.completed or self._recorded is None:
+            return None
+        return pa.Table.from_batches(self._recorded, schema=self.schema)
+
+    def cancel(self):
+        """Stops fetching and interrupts the query if it is still running."""
+        self._cancelled.set()
+        self._con.interrupt()
+        self._thread.join(timeout=5)
+
+    def _put(self, item) -> bool:
+        """Queues an item, giving up if the stream was cancelled."""
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        """Worker: runs the query and queues its batches."""
+        try:
+            relation = self._con.sql(self.query)
+            if relation is None:
+                return # Not a SELECT-like statement: nothing to fetch
+
+            self.has_result = True
+            reader = relation.fetch_record_batch(self.batch_rows)
+            self.schema = reader.schema
+
+            rows = 0
+            for batch in reader:
+                if self.max_rows and rows + batch.num_rows > self.max_rows:
+                    batch = batch.slice(0, self.max_rows - rows)
+                    self.truncated = True
+
+                if batch.num_rows and not self._put(batch):
+                    return
+                rows += batch.num_rows
+                self._record(batch)
+
+                if self.truncated:
+                    return
+
+            self.completed = not self._cancelled.is_set()
+        except Exception as e: # pylint: disable=broad-except
+            if not self._cancelled.is_set():
+                self._put(e)
+        finally:
+            self._put(_DONE)
+
+    def _record(self, batch):
+        """Keeps a batch for the result cache, or gives up when over budget."""
+        if self._recorded is None:
+            return
+        self._recorded.append(batch)
+        self._record_bytes -= batch.nbytes
+        if self._record_bytes < 0:
+            self._recorded = None # Too large to cache
+
+class TableStream:
+    """
+    Serves an already materialized pa.Table (e.g. a cached result) through
+    the same interface as QueryStream.
+    """
+
+    def __init__(self, table: pa.Table, max_rows: int):
+        self.has_result = True
+        self.truncated = bool(max_rows) and table.num_rows > max_rows
+        self.completed = not self.truncated
+        self.schema = table.schema
+        self._table = table.slice(0, max_rows) if self.truncated else table
+
+    def __iter__(self):
+        return iter(self._table.to_batches())
+
+    def cancel(self):
+        """Nothing is running, so there is nothing to interrupt."""
+
+def iter_pages(batches, page_size: int):
+    """Regroups a stream of record batches into pa.Tables of 'page_size' rows."""
+    pending = []
+    pending_rows = 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+
+        while pending_rows >= page_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, page_size)
+            rest = table.slice(page_size)
+            pending = rest.to_batches()
+            pending_rows = rest.num_rows
+
+    if pending_rows:
+        yield pa.Table.from_batches(pending)
@@ -0,0 +1,40 @@
+"""Helpers that keep low-cardinality columns categorical through merges."""
+import pandas as pd
+
+def _is_categorical(series: pd.Series) -> bool:
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+def shared_categories(*columns: pd.Series) -> pd.CategoricalDtype:
+    """One categorical dtype holding the values of all 'columns', sorted."""
+    values = set()
+    for column in columns:
+        values.update(column.cat.categories if _is_categorical(column) else column.dropna().unique())
+    return pd.CategoricalDtype(sorted(values))
+
+def _with_categories(column: pd.Series, dtype: pd.CategoricalDtype) -> pd.Series:
+    """
+    'column' with exactly the categories of 'dtype', in their order. (An
+    astype to an unordered dtype with the same categories in another order
+    is a no-op, so categoricals are recoded with set_categories.)
+    """
+    if _is_categorical(column):
+        return column.cat.set_categories(dtype.categories)
+    return column.astype(dtype)
+
+def align_categories(left: pd.DataFrame, right: pd.DataFrame, column: str) -> tuple:
+    """
+    Gives 'column' the same categorical dtype in both frames if either
+    has it as a categorical, so merging on it keeps it categorical (a
+    merge on categoricals with different categories falls back to object).
+
+    The categories are sorted, so sorting by the column orders the rows as
+    sorting the strings would.
+
+    Returns:
+        (pd.DataFrame, pd.DataFrame): 'left' and 'right', converted.
+    """
+    if not (_is_categorical(left[column]) or _is_categorical(right[column])):
+        return left, right
+    dtype = shared_categories(left[column], right[column])
+    return (left.assign(**{column: _with_categories(left[column], dtype)}),
+            right.assign(**{column: _with_categories(right[column], dtype)}))
@@ -0,0 +1,88 @@
+"""Cheap fingerprints for Parquet files, used to invalidate caches."""
+import hashlib
+import os
+import struct
+from typing import NamedTuple
+
+# Every Parquet file ends with a 4-byte footer length followed by this magic.
+PARQUET_MAGIC = b"PAR1"
+
+# How much of the file tail to hash when it is not a valid Parquet file
+FALLBACK_TAIL_BYTES = 64 * 1024
+
+class ParquetFingerprint(NamedTuple):
+    """Identifies one version of a Parquet file without reading its data."""
+    mtime_ns: int
+    size: int
+    footer_hash: str
+
+def _read_footer(file_obj, size: int) -> bytes:
+    """Reads the Parquet footer (metadata + length + magic) from an open file."""
+    if size >= 12:
+        file_obj.seek(-8, os.SEEK_END)
+        tail = file_obj.read(8)
+        if tail[4:] == PARQUET_MAGIC:
+            footer_length = struct.unpack("<I", tail[:4])[0]
+            if footer_length + 8 <= size:
+                file_obj.seek(-(footer_length + 8), os.SEEK_END)
+                return file_obj.read(footer_length + 8)
+
+    # Not a (complete) Parquet file: hash whatever tail we have
+    file_obj.seek(max(size - FALLBACK_TAIL_BYTES, 0))
+    return file_obj.read()
+
+def parquet_fingerprint(path) -> ParquetFingerprint:
+    """
+    Builds a fingerprint from the file's mtime, size and a hash of its footer.
+
+    The footer holds the schema, row group statistics and a 'created_by'
+    string, so two writes of different data practically never share one.
+    Only the footer is read, which keeps this cheap even for large files.
+
+    Args:
+        path: Local path to the Parquet file.
+
+    Returns:
+        ParquetFingerprint: The (mtime_ns, size, footer_hash) triple.
+    """
+    stat = os.stat(path)
+    with open(path, "rb") as file_obj:
+        footer = _read_footer(file_obj, stat.st_size)
+
+    footer_hash = hashlib.sha256(footer).hexdigest()[:16]
+    return ParquetFingerprint(stat.st_mtime_ns, stat.st_size, footer_hash)
+
+# Content hashes of non-Parquet files, keyed by (path, mtime_ns, size)
+_content_hashes = {}
+
+def content_version(path) -> str:
+    """
+    Identifies the content of a file, ignoring when it was written.
+
+    Parquet files are identified by size and footer hash (rewriting the
+    same data gives the same footer); other files by a SHA-256 of their
+    bytes, cached while their mtime and size don't change.
+    """
+    stat = os.stat(path)
+    with open(path, "rb") as file_obj:
+        if str(path).endswith(".parquet"):
+            footer = _read_footer(file_obj, stat.st_size)
+            return f"{stat.st_size}-{hashlib.sha256(footer).hexdigest()[:16]}"
+
+        cache_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        if cache_key not in _content_hashes:
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: file_obj.read(1024 * 1024), b""):
+                digest.update(chunk)
+            _content_hashes[cache_key] = digest.hexdigest()[:16]
+        return f"{stat.st_size}-{_content_hashes[cache_key]}"
+
+def directory_version(path) -> str:
+    """Combines the content versions of all files under a directory."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            digest.update(f"{os.path.relpath(file_path, path)}={content_version(file_path)};".encode())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,237 @@
+"""
+Physical layout of the layers' Parquet files: sort order, page indexes,
+Bloom filters and dictionary-encoded (categorical) columns.
+"""
+from typing import NamedTuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Rows per row group: small enough that min/max statistics of a sorted
+# key prune most row groups of a large table on a point lookup.
+ROW_GROUP_ROWS = 128 * 1024
+
+# Rows per data page: the page index lets readers skip pages inside a row group.
+PAGE_ROWS = 8 * 1024
+
+# False-positive probability of the Bloom filters
+BLOOM_FILTER_FPP = 0.01
+
+# Schema metadata of a record batch stream whose rows are already sorted
+# (comma-separated columns, ascending): write_parquet streams it to the
+# file instead of collecting it to sort
+SORTED_BY_KEY = b"medallion.sorted_by"
+
+# A string column whose dictionary pages take at most this share of its
+# bytes is low-cardinality (see low_cardinality_columns)
+LOW_CARDINALITY_DICTIONARY_SHARE = 0.1
+
+class TableLayout(NamedTuple):
+    """How one table is clustered and indexed on disk."""
+    sort_by: tuple = () # Rows are sorted (clustered) by these columns
+    bloom_filter_columns: tuple = () # High-cardinality keys looked up by equality
+    dictionary_columns: tuple = () # Low-cardinality columns, stored and read as dictionaries
+
+# Default layouts by (layer, table name). Tables are clustered by their
+# primary key (or the key they are filtered by), and UUID keys that are
+# looked up with "WHERE key = '...'" get Bloom filters. Columns with a
+# handful of distinct values (stores, product types, ticket statuses)
+# are dictionary-encoded, so every layer reads them as categoricals.
+TABLE_LAYOUTS = {
+    ("bronze", "raw_orders"): TableLayout(dictionary_columns=("store_id",)),
+    ("bronze", "raw_stores"): TableLayout(dictionary_columns=("id", "name")),
+    ("bronze", "raw_products"): TableLayout(dictionary_columns=("type",)),
+    ("bronze", "support_tickets"): TableLayout(dictionary_columns=("status", "channel")),
+    ("silver", "orders"): TableLayout(("order_id",), ("order_id", "customer_id"), ("store_id",)),
+    ("silver", "customers"): TableLayout(("customer_id",), ("customer_id",)),
+    ("silver", "stores"): TableLayout(("store_id",), (), ("store_id", "name")),
+    ("silver", "order_items"): TableLayout(("order_id",), ("order_id", "order_item_id")),
+    ("silver", "support_tickets"): TableLayout(
+        ("order_id",), ("order_id", "ticket_id", "customer_id"), ("status", "channel", "sentiment_model")
+    ),
+    ("silver", "products"): TableLayout(("sku",), (), ("type",)),
+    ("silver", "supplies"): TableLayout(("supply_id",)),
+    ("gold", "orders_ticket_summary"): TableLayout(
+        ("order_id",), ("order_id", "customer_id"), ("store_id", "store_name")
+    ),
+    ("gold", "aov_by_store_month"): TableLayout(
+        ("store_id", "year", "month"), ("store_id",), ("store_id", "store_name")
+    ),
+    ("gold", "sales_rollup"): TableLayout(
+        ("grain", "store_id", "period_start"), ("store_id",), ("grain", "store_id", "store_name")
+    ),
+    ("gold", "order_profile"): TableLayout(
+        ("grain", "store_id", "period_start"), ("store_id",), ("grain", "store_id", "store_name")
+    ),
+}
+
+def layout_for(layer: str, table_name: str) -> TableLayout | None:
+    """Returns the layout of a table, or None to write it as is."""
+    return TABLE_LAYOUTS.get((layer, table_name))
+
+def with_sort_order(schema: pa.Schema, columns) -> pa.Schema:
+    """'schema', declaring that the rows are sorted by 'columns' (see SORTED_BY_KEY)."""
+    return schema.with_metadata({**(schema.metadata or {}), SORTED_BY_KEY: ",".join(columns).encode()})
+
+def _is_presorted(schema: pa.Schema, sort_keys: list) -> bool:
+    """True if a stream declares it is sorted by 'sort_keys' (or a longer key)."""
+    declared = (schema.metadata or {}).get(SORTED_BY_KEY)
+    if not sort_keys or not declared:
+        return False
+    return declared.decode().split(",")[:len(sort_keys)] == [col for col, _ in sort_keys]
+
+def _sort_table(table: pa.Table, sort_keys: list) -> pa.Table:
+    """
+    Sorts a table. Dictionary (categorical) keys are compared by their
+    decoded values, since Arrow can't sort dictionary arrays directly.
+    """
+    keys = {}
+    for col, _ in sort_keys:
+        column = table[col]
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        keys[col] = column
+    return table.take(pc.sort_indices(pa.table(keys), sort_keys=sort_keys))
+
+def _dictionary_encode(data, columns):
+    """Dictionary-encodes the string 'columns' of a table or record batch."""
+    for col in columns:
+        if col not in data.schema.names:
+            continue # Missing columns are skipped, so a layout never breaks a write
+        index = data.schema.get_field_index(col)
+        column = data.column(index)
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            data = data.set_column(index, col, pc.dictionary_encode(column))
+    return data
+
+def _dictionary_encoded_reader(reader: pa.RecordBatchReader, columns) -> pa.RecordBatchReader:
+    """Dictionary-encodes 'columns' of every batch of a stream."""
+    schema = _dictionary_encode(reader.schema.empty_table(), columns).schema
+    return pa.RecordBatchReader.from_batches(
+        schema, (_dictionary_encode(batch, columns) for batch in reader)
+    )
+
+def low_cardinality_columns(metadata: pq.FileMetaData) -> list:
+    """
+    Finds the low-cardinality string columns of a Parquet file from its
+    footer: columns that are dictionary-encoded in every row group and
+    whose dictionary pages are a small share of their bytes (a column
+    with many distinct values either falls back to plain encoding or has
+    a dictionary about as large as its data).
+
+    Files written with 'dictionary_columns' are read back as dictionaries
+    anyway (the Arrow schema is stored in the file); this also catches
+    files written without hints.
+    """
+    if metadata.num_row_groups == 0:
+        return []
+
+    dictionary_bytes, total_bytes = {}, {}
+    for row_group in range(metadata.num_row_groups):
+        row_group_metadata = metadata.row_group(row_group)
+        for column in range(row_group_metadata.num_columns):
+            chunk = row_group_metadata.column(column)
+            name = chunk.path_in_schema
+            if "." in name or chunk.physical_type != "BYTE_ARRAY":
+                continue # Nested or not a string
+            if not chunk.has_dictionary_page or chunk.data_page_offset <= chunk.dictionary_page_offset:
+                dictionary_bytes[name] = None # Not dictionary-encoded in this row group
+                continue
+            if name in dictionary_bytes and dictionary_bytes[name] is None:
+                continue
+            dictionary_bytes[name] = (dictionary_bytes.get(name, 0)
+                                      + chunk.data_page_offset - chunk.dictionary_page_offset)
+            total_bytes[name] = total_bytes.get(name, 0) + chunk.total_compressed_size
+
+    return [
+        name for name, size in dictionary_bytes.items()
+        if size is not None and size <= LOW_CARDINALITY_DICTIONARY_SHARE * total_bytes[name]
+    ]
+
+def dictionary_columns(path, filesystem=None) -> list:
+    """The low-cardinality columns of a Parquet file, for 'read_dictionary'."""
+    return low_cardinality_columns(pq.read_metadata(path, filesystem=filesystem))
+
+def _bloom_filter_options(layout: TableLayout, schema: pa.Schema, ndv: int) -> dict | None:
+    """Bloom filter settings for the layout's columns that exist in 'schema'."""
+    options = {
+        col: {"ndv": max(ndv, 1), "fpp": BLOOM_FILTER_FPP}
+        for col in layout.bloom_filter_columns if col in schema.names
+    }
+    return options or None
+
+def write_parquet(data: pd.DataFrame | pa.Table | pa.RecordBatchReader, path: str,
+                  layout: TableLayout | None = None, filesystem=None) -> int:
+    """
+    Writes a DataFrame, Arrow table or record batch stream to Parquet
+    with the given layout.
+
+    The rows are sorted by 'layout.sort_by' and the sort order is recorded
+    in the row group metadata. Every file gets a page index (column and
+    offset indexes), so readers can skip pages whose min/max exclude a
+    filter, plus Bloom filters on 'layout.bloom_filter_columns' for
+    equality lookups on unsorted keys. String columns in
+    'layout.dictionary_columns' are stored as Arrow dictionaries, so
+    readers get them back as categoricals. Without a layout, only the page
+    index is added.
+
+    A record batch stream is written batch by batch, unless the layout
+    sorts it: sorting needs all rows, so it is collected first. A stream
+    that declares it is already sorted that way (with_sort_order) is
+    written batch by batch too.
+
+    Args:
+        data: The rows (pd.DataFrame, pa.Table or pa.RecordBatchReader).
+        path (str): Target file (a path within 'filesystem' if one is given).
+        layout (TableLayout | None): Sort and Bloom filter columns.
+        filesystem: Optional pyarrow or fsspec filesystem (e.g. UPath.fs).
+
+    Returns:
+        int: The number of rows written.
+    """
+    layout = layout or TableLayout()
+    if isinstance(data, pd.DataFrame):
+        data = pa.Table.from_pandas(data, preserve_index=False)
+    if layout.dictionary_columns:
+        if isinstance(data, pa.RecordBatchReader):
+            data = _dictionary_encoded_reader(data, layout.dictionary_columns)
+        else:
+            data = _dictionary_encode(data, layout.dictionary_columns)
+
+    page_options = {"max_rows_per_page": PAGE_ROWS, "write_page_index": True}
+
+    # Missing columns are skipped, so a layout never breaks a write
+    sort_keys = [(col, "ascending") for col in layout.sort_by if col in data.schema.names]
+    if isinstance(data, pa.RecordBatchReader):
+        presorted = _is_presorted(data.schema, sort_keys)
+        if sort_keys and not presorted:
+            data = data.read_all()
+        else:
+            # Row count unknown up front: size the filters for one row group
+            bloom_filter_options = _bloom_filter_options(layout, data.schema, ROW_GROUP_ROWS)
+            sorting_columns = pq.SortingColumn.from_ordering(data.schema, sort_keys) if presorted else None
+            rows = 0
+            with pq.ParquetWriter(path, data.schema, filesystem=filesystem, sorting_columns=sorting_columns,
+                                  bloom_filter_options=bloom_filter_options, **page_options) as writer:
+                for batch in data: # Each batch becomes one or more row groups
+                    writer.write_batch(batch, row_group_size=ROW_GROUP_ROWS)
+                    rows += batch.num_rows
+            return rows
+
+    table = data
+    sorting_columns = None
+    if sort_keys and table.num_rows:
+        table = _sort_table(table, sort_keys)
+        sorting_columns = pq.SortingColumn.from_ordering(table.schema, sort_keys)
+
+    pq.write_table(
+        table,
+        path,
+        filesystem=filesystem,
+        row_group_size=ROW_GROUP_ROWS,
+        sorting_columns=sorting_columns,
+        bloom_filter_options=_bloom_filter_options(layout, table.schema, table.num_rows),
+        **page_options,
+    )
+    return table.num_rows
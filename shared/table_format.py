@@ -0,0 +1,360 @@
+"""
+Snapshot-isolated Parquet tables: versioned manifests over immutable files.
+
+A table 'orders' in a layer directory such as data/silver is stored as:
+- data/silver/_data/orders/<uuid>.parquet: immutable data files. A writer
+  stages a new file here; nobody reads it until it is published.
+- data/silver/_manifests/orders/<version>.json: one manifest per version,
+  listing its data files. Publishing a version is the atomic creation of
+  its manifest, so readers see either the old or the new version, never
+  a partial one.
+
+'data/silver/orders.parquet' is the table's logical path: nothing is
+written there. Readers resolve it (pinned_file, pinned_files, read_table)
+to the files of a snapshot (the latest manifest), which stay in place
+while newer versions are written. A plain file at that path, written
+before the table had manifests, is read as version 0 and removed once
+the first version is published. Versions superseded for longer than the
+retention period are garbage-collected.
+
+A fragmented table (e.g. bronze support_tickets) has one data file per
+source, such as a raw shard. Its manifests also record which source
+version each fragment was built from. An update then replaces only the
+fragments of new or changed sources (see publish_fragments).
+"""
+import contextlib
+import hashlib
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import NamedTuple
+import pyarrow as pa
+import pyarrow.parquet as pq
+from .fingerprint import content_version
+from .parquet_layout import TableLayout, dictionary_columns, write_parquet
+
+MANIFEST_DIR = "_manifests"
+DATA_DIR = "_data"
+
+# Versions kept regardless of age (the latest and the one before it)
+KEEP_VERSIONS = 2
+
+# Older versions are removed once superseded for this long, so readers
+# that pinned them (e.g. an open query session) can finish
+RETENTION_S = 3 * 3600
+
+class Snapshot(NamedTuple):
+    """One published version of a table."""
+    version: int # 0 for a file written before the table had manifests
+    files: tuple # Paths of its data files
+    rows: int | None
+    published_at: str | None
+    sources: dict | None = None # Fragmented tables: source -> {"file", "version", "rows"}
+
+class TableFragments(NamedTuple):
+    """
+    An update of a fragmented table: fragments staged (see stage_path) for
+    new or changed sources, and the sources that no longer exist.
+    """
+    added: dict # Source -> (fragment file, source version, rows)
+    removed: tuple = ()
+
+    @property
+    def num_rows(self) -> int:
+        """Rows in the added fragments."""
+        return sum(rows for _, _, rows in self.added.values())
+
+def _table_location(path: str) -> tuple[str, str]:
+    """(layer directory, table name) of a table path such as 'data/silver/orders.parquet'."""
+    layer_path, file_name = os.path.split(path)
+    return layer_path, os.path.splitext(file_name)[0]
+
+def _manifest_dir(path: str) -> str:
+    layer_path, table = _table_location(path)
+    return os.path.join(layer_path, MANIFEST_DIR, table)
+
+def _manifest_path(path: str, version: int) -> str:
+    return os.path.join(_manifest_dir(path), f"{version:08d}.json")
+
+def versions(path: str) -> list[int]:
+    """The published versions of a table, oldest first."""
+    try:
+        names = os.listdir(_manifest_dir(path))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-len(".json")]) for name in names
+                  if name.endswith(".json") and name[:-len(".json")].isdigit())
+
+def read_snapshot(path: str, version: int) -> Snapshot:
+    """Reads the manifest of one version of a table."""
+    layer_path, _ = _table_location(path)
+    with open(_manifest_path(path, version), encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    sources = manifest.get("sources")
+    if sources is not None:
+        sources = {
+            source: {**entry, "file": os.path.join(layer_path, entry["file"])}
+            for source, entry in sources.items()
+        }
+    return Snapshot(
+        version,
+        tuple(os.path.join(layer_path, file_name) for file_name in manifest["files"]),
+        manifest.get("rows"),
+        manifest.get("published_at"),
+        sources,
+    )
+
+def snapshot(path: str) -> Snapshot | None:
+    """
+    The latest version of a table, or None if it does not exist. A plain
+    Parquet file without manifests is returned as version 0.
+    """
+    published = versions(path)
+    if published:
+        return read_snapshot(path, published[-1])
+    if os.path.isfile(path):
+        return Snapshot(0, (path,), None, None)
+    return None
+
+def table_exists(path: str) -> bool:
+    """True if the table has a published version (or a plain pre-manifest file)."""
+    return snapshot(path) is not None
+
+def list_tables(layer_path: str) -> list:
+    """Names of the tables in a layer directory, versioned or plain files."""
+    names = set()
+    manifest_root = os.path.join(layer_path, MANIFEST_DIR)
+    if os.path.isdir(manifest_root):
+        names.update(table for table in os.listdir(manifest_root)
+                     if versions(os.path.join(layer_path, f"{table}.parquet")))
+    if os.path.isdir(layer_path):
+        names.update(entry[:-len(".parquet")] for entry in os.listdir(layer_path)
+                     if entry.endswith(".parquet") and os.path.isfile(os.path.join(layer_path, entry)))
+    return sorted(names)
+
+def logical_path(file_name: str) -> str:
+    """
+    The logical table path a data file belongs to:
+    'data/silver/_data/orders/<uuid>.parquet' -> 'data/silver/orders.parquet'.
+    Any other path is returned as is.
+    """
+    table_dir, _ = os.path.split(file_name)
+    data_dir, table = os.path.split(table_dir)
+    layer_path, data_dir_name = os.path.split(data_dir)
+    if data_dir_name != DATA_DIR or not table:
+        return file_name
+    return os.path.join(layer_path, f"{table}.parquet")
+
+def pinned_file(path: str) -> str:
+    """
+    The data file of the table's latest version. Reading it (instead of
+    'path') gives one consistent version, even if a new one is published
+    meanwhile. Returns 'path' itself if the table has no manifests.
+    """
+    current = snapshot(path)
+    if current is None or len(current.files) != 1:
+        return path
+    return current.files[0]
+
+def pinned_files(path: str) -> list:
+    """
+    The data files of the table's latest version: one, or one per fragment.
+    Returns ['path'] if the table has no manifests.
+    """
+    current = snapshot(path)
+    if current is None:
+        return [path]
+    return list(current.files)
+
+def table_version(path: str) -> str | None:
+    """
+    Content version of the table's latest version, None if it does not
+    exist. For a single file it is the file's content_version.
+    """
+    current = snapshot(path)
+    if current is None:
+        return None
+    if len(current.files) == 1:
+        return content_version(current.files[0])
+    digest = hashlib.sha256()
+    for file_name in sorted(current.files):
+        digest.update(f"{os.path.basename(file_name)}={content_version(file_name)};".encode())
+    return digest.hexdigest()[:16]
+
+# --- Reads ---
+def read_fragments(files: list, columns=None) -> pa.Table:
+    """
+    Reads data files (e.g. from pinned_files) as one Arrow table, memory-mapped.
+    Fragments parsed from different sources may disagree on types (say,
+    a column that is all null in one shard), so their schemas are unified.
+    """
+    if not files:
+        raise FileNotFoundError("The table has no data files")
+    tables = [
+        pq.read_table(file_name, columns=columns, memory_map=True,
+                      read_dictionary=dictionary_columns(file_name))
+        for file_name in files
+    ]
+    if len(tables) == 1:
+        return tables[0]
+    return pa.concat_tables(tables, promote_options="permissive")
+
+def read_table(path: str, columns=None) -> pa.Table:
+    """Reads the latest version of a table, single-file or fragmented."""
+    return read_fragments(pinned_files(path), columns)
+
+# --- Writes ---
+def publish(path: str, files: list[str], rows: int | None = None,
+            sources: dict | None = None) -> int:
+    """
+    Publishes staged data files as the table's next version. 'sources'
+    maps each source of a fragmented table to its fragment's "file",
+    "version" and "rows".
+
+    The manifest is written to a temporary file and hard-linked into
+    place, which fails if that version exists, so concurrent writers
+    never overwrite each other's versions: the later one takes the next.
+
+    Returns:
+        int: The published version.
+    """
+    layer_path, _ = _table_location(path)
+    manifest_dir = _manifest_dir(path)
+    os.makedirs(manifest_dir, exist_ok=True)
+
+    manifest = {
+        "files": [os.path.relpath(file_name, layer_path) for file_name in files],
+        "rows": rows,
+        "published_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if sources is not None:
+        manifest["sources"] = {
+            source: {**entry, "file": os.path.relpath(entry["file"], layer_path)}
+            for source, entry in sources.items()
+        }
+    tmp_path = os.path.join(manifest_dir, f".{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+    try:
+        version = (versions(path) or [0])[-1] + 1
+        while True:
+            try:
+                os.link(tmp_path, _manifest_path(path, version))
+                return version
+            except FileExistsError: # Another writer published this version first
+                version += 1
+    finally:
+        os.remove(tmp_path)
+
+def _remove_plain_file(path: str):
+    """
+    Removes a plain file left at the table's logical path from before it
+    had manifests. Readers resolve the path through the manifests, so it
+    is stale once a version is published.
+    """
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+def stage_path(path: str) -> str:
+    """A new, unpublished data file for a table (e.g. a fragment written by a worker)."""
+    layer_path, table = _table_location(path)
+    staged = os.path.join(layer_path, DATA_DIR, table, f"{uuid.uuid4().hex}.parquet")
+    os.makedirs(os.path.dirname(staged), exist_ok=True)
+    return staged
+
+def write_table(data, path: str, layout: TableLayout | None = None) -> int:
+    """
+    Writes a new version of a table: stages the data file, publishes its
+    manifest and collects old versions.
+
+    Args:
+        data: The rows (pd.DataFrame, pa.Table or pa.RecordBatchReader).
+        path (str): The table's logical path, e.g. 'data/silver/orders.parquet'.
+        layout (TableLayout | None): Sort and Bloom filter columns.
+
+    Returns:
+        int: The number of rows written.
+    """
+    staged = stage_path(path)
+    rows = write_parquet(data, staged, layout)
+    publish(path, [staged], rows)
+    _remove_plain_file(path)
+    collect_garbage(path)
+    return rows
+
+def publish_fragments(path: str, fragments: TableFragments) -> int:
+    """
+    Publishes a new version of a fragmented table: the latest version's
+    fragments, minus those of removed sources, with the added ones
+    replacing any earlier fragment of the same source. Data files that
+    belong to no source (the table's former, unfragmented version) are
+    dropped.
+
+    Returns:
+        int: The number of rows in the added fragments.
+    """
+    current = snapshot(path)
+    if current is not None and current.sources is not None and not (fragments.added or fragments.removed):
+        return 0 # Nothing new: keep the current version
+    sources = dict(current.sources or {}) if current is not None else {}
+    for source in fragments.removed:
+        sources.pop(source, None)
+    for source, (file_name, source_version, rows) in fragments.added.items():
+        sources[source] = {"file": file_name, "version": source_version, "rows": rows}
+
+    files = [sources[source]["file"] for source in sorted(sources)]
+    total_rows = sum(entry["rows"] for entry in sources.values())
+    publish(path, files, total_rows, sources)
+    _remove_plain_file(path)
+    collect_garbage(path)
+    return fragments.num_rows
+
+def collect_garbage(path: str, keep_versions: int = KEEP_VERSIONS,
+                    retention_s: float = RETENTION_S) -> int:
+    """
+    Removes the manifests of versions superseded more than 'retention_s'
+    ago (always keeping the latest 'keep_versions'), then the data files
+    no remaining manifest lists. Unlisted files younger than the
+    retention period are kept: they may be staged by a running writer.
+
+    Returns:
+        int: The number of files removed.
+    """
+    published = versions(path)
+    now = time.time()
+    removed = 0
+    for older, newer in zip(published[:-keep_versions], published[1:]):
+        try:
+            superseded_at = os.stat(_manifest_path(path, newer)).st_mtime
+        except FileNotFoundError: # Removed by a concurrent collection
+            continue
+        if now - superseded_at > retention_s:
+            try:
+                os.remove(_manifest_path(path, older))
+                removed += 1
+            except FileNotFoundError:
+                pass
+
+    live = set()
+    for version in versions(path):
+        try:
+            live.update(os.path.abspath(file_name) for file_name in read_snapshot(path, version).files)
+        except FileNotFoundError:
+            continue
+
+    layer_path, table = _table_location(path)
+    data_dir = os.path.join(layer_path, DATA_DIR, table)
+    if not live or not os.path.isdir(data_dir):
+        return removed
+    for name in os.listdir(data_dir):
+        file_name = os.path.join(data_dir, name)
+        try:
+            if os.path.abspath(file_name) not in live and now - os.stat(file_name).st_mtime > retention_s:
+                os.remove(file_name)
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
@@ -1,13 +1,17 @@
 """This module provides functions to save DataFrames to the Silver layer."""
 import os
 import pandas as pd
+from shared.parquet_layout import layout_for
+from shared.table_format import write_table
 
 # Define the output path
 SILVER_PATH = 'data/silver'
 
 def save_to_silver(df: pd.DataFrame, table_name: str):
     """
-    Saves a DataFrame to the Silver layer in Parquet format.
+    Saves a DataFrame to the Silver layer in Parquet format,
+    clustered and indexed according to its table layout.
+    The file is published as a new table version (see shared.table_format).
     """
     # Ensure the silver directory exists
     os.makedirs(SILVER_PATH, exist_ok=True)
@@ -15,6 +19,6 @@ def save_to_silver(df: pd.DataFrame, table_name: str):
     output_file = os.path.join(SILVER_PATH, f"{table_name}.parquet")
 
     print(f"Saving {table_name} to {output_file}...")
-    df.to_parquet(output_file, index=False)
+    write_table(df, output_file, layout_for("silver", table_name))
     print(f"Successfully saved {table_name}.")
 # End of file
@@ -1,6 +1,5 @@
 """Orchestrates the Bronze-to-Silver ETL process."""
 import os
-import pandas as pd
 
 # Import all our transformation functions
 from silver.transform.customers import transform_customers
@@ -13,6 +12,7 @@ from silver.transform.support_tickets import transform_support_tickets
 
 # Import our saver function
 from silver.load.saver import save_to_silver
+from shared.table_format import read_table
 
 BRONZE_PATH = 'data/bronze/parquet'
 
@@ -26,13 +26,14 @@ def main():
     # 1. Load all Bronze data into memory
     print("Loading Bronze data...")
     try:
-        raw_customers_df = pd.read_parquet(os.path.join(BRONZE_PATH, 'raw_customers.parquet'))
-        raw_stores_df = pd.read_parquet(os.path.join(BRONZE_PATH, 'raw_stores.parquet'))
-        raw_products_df = pd.read_parquet(os.path.join(BRONZE_PATH, 'raw_products.parquet'))
-        raw_supplies_df = pd.read_parquet(os.path.join(BRONZE_PATH, 'raw_supplies.parquet'))
-        raw_items_df = pd.read_parquet(os.path.join(BRONZE_PATH, 'raw_items.parquet'))
-        raw_orders_df = pd.read_parquet(os.path.join(BRONZE_PATH, 'raw_orders.parquet'))
-        support_tickets_df = pd.read_parquet(os.path.join(BRONZE_PATH, 'support_tickets.parquet'))
+        raw_customers_df = read_table(os.path.join(BRONZE_PATH, 'raw_customers.parquet')).to_pandas()
+        raw_stores_df = read_table(os.path.join(BRONZE_PATH, 'raw_stores.parquet')).to_pandas()
+        raw_products_df = read_table(os.path.join(BRONZE_PATH, 'raw_products.parquet')).to_pandas()
+        raw_supplies_df = read_table(os.path.join(BRONZE_PATH, 'raw_supplies.parquet')).to_pandas()
+        raw_items_df = read_table(os.path.join(BRONZE_PATH, 'raw_items.parquet')).to_pandas()
+        raw_orders_df = read_table(os.path.join(BRONZE_PATH, 'raw_orders.parquet')).to_pandas()
+        # One fragment per raw shard (see bronze.shards)
+        support_tickets_df = read_table(os.path.join(BRONZE_PATH, 'support_tickets.parquet')).to_pandas()
     except FileNotFoundError as e:
         print(f"Error: Missing bronze file - {e}")
         print("Please ensure all raw parquet files are in data/bronze/parquet/")
@@ -5,7 +5,7 @@ def transform_support_tickets(tickets_df: pd.DataFrame, orders_df: pd.DataFrame)
     """
     Transforms support tickets data.
     - Uses 'orders_df' to bridge 'order_id' to the UUID 'customer_id'
-    - Flattens the 'sentiment' struct
+    - Flattens the 'sentiment' struct (sentiment_model as a categorical)
     - Drops the old 'customer_external_id'
     """
     print("Transforming support_tickets...")
@@ -25,9 +25,10 @@ def transform_support_tickets(tickets_df: pd.DataFrame, orders_df: pd.DataFrame)
     df['sentiment_score'] = df['sentiment'].apply(
         lambda x: x.get('score') if isinstance(x, dict) else None
     )
+    # Only a few models exist: keep it categorical, like status and channel
     df['sentiment_model'] = df['sentiment'].apply(
         lambda x: x.get('model') if isinstance(x, dict) else None
-    )
+    ).astype('category')
 
     # Drop columns that are now irrelevant or replaced
     df = df.drop(columns=['sentiment', 'customer_external_id'])
@@ -0,0 +1,25 @@
+"""Aligned categoricals must share sorted categories, so they merge and sort like strings."""
+import pandas as pd
+from shared.categoricals import align_categories
+
+def test_aligned_categories_are_sorted():
+    # Both already categorical, with the same categories in other orders
+    left = pd.DataFrame({"store_id": pd.Categorical(["s2", "s1", "s3"], categories=["s3", "s2", "s1"])})
+    right = pd.DataFrame({"store_id": pd.Categorical(["s1"], categories=["s2", "s1", "s3"])})
+
+    left, right = align_categories(left, right, "store_id")
+
+    assert list(left["store_id"].cat.categories) == ["s1", "s2", "s3"]
+    assert list(right["store_id"].cat.categories) == ["s1", "s2", "s3"]
+    assert list(left["store_id"]) == ["s2", "s1", "s3"]
+    assert list(left.sort_values("store_id")["store_id"]) == ["s1", "s2", "s3"]
+    assert isinstance(left.merge(right, on="store_id")["store_id"].dtype, pd.CategoricalDtype)
+
+def test_strings_are_aligned_to_the_categoricals():
+    left = pd.DataFrame({"store_id": pd.Categorical(["s3", "s1"])})
+    right = pd.DataFrame({"store_id": ["s2", "s1", None]})
+
+    left, right = align_categories(left, right, "store_id")
+
+    assert list(right["store_id"].cat.categories) == ["s1", "s2", "s3"]
+    assert right["store_id"].isna().tolist() == [False, False, True]
@@ -0,0 +1,108 @@
+"""The out-of-core gold transforms must match the in-memory ones."""
+import pandas as pd
+import pyarrow.parquet as pq
+from gold.transform.chunked import (
+    calculate_aov_by_store_month_chunked, calculate_orders_ticket_summary_chunked
+)
+from gold.transform.transform_aov import calculate_aov_by_store_month
+from gold.transform.transform_tickets import calculate_orders_ticket_summary
+from shared.parquet_layout import layout_for, write_parquet
+
+STORES = pd.DataFrame({
+    "store_id": pd.Categorical(["s1", "s2", "s3"]),
+    "name": pd.Categorical(["Philadelphia", "Brooklyn", "Chicago"]),
+})
+
+def _orders() -> pd.DataFrame:
+    """Orders of three stores over three months, in no particular order."""
+    rows = [
+        ("s1", "2025-01-03 10:00:00", 1000),
+        ("s2", "2025-01-05 11:00:00", 2500),
+        ("s1", "2025-01-20 12:00:00", 1999), # s1/January continues in the next chunk
+        ("s1", "2025-01-31 23:59:59", 3001),
+        ("s3", "2025-02-01 00:00:00", 700),
+        ("s2", "2025-02-14 09:30:00", 1250),
+        ("s1", "2025-02-28 18:00:00", 4000),
+        ("s2", "2025-03-01 08:00:00", 999),
+        ("s3", "2025-03-15 15:00:00", 1501),
+        ("s1", "2025-01-10 13:00:00", 2002), # s1/January again, in the last chunk
+    ]
+    orders = pd.DataFrame(rows, columns=["store_id", "ordered_at", "order_total_cents"])
+    orders["store_id"] = pd.Categorical(orders["store_id"])
+    return orders
+
+CUSTOMERS = pd.DataFrame({
+    "customer_id": ["c1", "c2"],
+    "name": pd.Categorical(["Ada", "Grace"]),
+})
+
+def _ticket_orders() -> pd.DataFrame:
+    """The orders with ids and customers, sorted by order_id as silver writes them."""
+    orders = _orders()
+    orders.insert(0, "order_id", [f"o{i:02d}" for i in range(len(orders))])
+    orders["customer_id"] = ["c1", "c2"] * (len(orders) // 2)
+    return orders.drop(columns="order_total_cents")
+
+TICKETS = pd.DataFrame({"order_id": ["o01", "o01", "o07", None, "o09"]})
+
+def _chunks(orders: pd.DataFrame, size: int) -> list:
+    """Splits orders into record-batch-like chunks, each with only the store categories it uses."""
+    chunks = []
+    for start in range(0, len(orders), size):
+        chunk = orders.iloc[start:start + size].reset_index(drop=True)
+        chunk["store_id"] = chunk["store_id"].cat.remove_unused_categories()
+        chunks.append(chunk)
+    return chunks
+
+def _sorted(aov: pd.DataFrame) -> pd.DataFrame:
+    """Row order is not part of the result."""
+    return aov.sort_values(["store_id", "year", "month"]).reset_index(drop=True)
+
+def test_chunked_aov_matches_in_memory():
+    orders = _orders()
+    expected = calculate_aov_by_store_month(orders, STORES)
+    for size in (1, 3, 4, len(orders)):
+        actual = calculate_aov_by_store_month_chunked(_chunks(orders, size), STORES)
+        pd.testing.assert_frame_equal(_sorted(actual), _sorted(expected))
+
+def test_chunked_aov_merges_store_month_across_chunks():
+    actual = _sorted(calculate_aov_by_store_month_chunked(_chunks(_orders(), 3), STORES))
+    january = actual[(actual["store_id"] == "s1") & (actual["month"] == 1)]
+    # (1000 + 1999 + 3001 + 2002) / 4, split over three chunks
+    assert january["average_order_value_cents"].tolist() == [2000]
+
+def test_chunked_aov_without_orders():
+    assert calculate_aov_by_store_month_chunked(iter([]), STORES) is None
+
+def test_chunked_ticket_summary_matches_in_memory():
+    orders = _ticket_orders()
+    expected = calculate_orders_ticket_summary(orders, TICKETS, CUSTOMERS, STORES)
+    for size in (1, 3, len(orders)):
+        stream = calculate_orders_ticket_summary_chunked(
+            _chunks(orders, size), [TICKETS.iloc[:2], TICKETS.iloc[2:]], CUSTOMERS, STORES
+        )
+        pd.testing.assert_frame_equal(stream.read_all().to_pandas(), expected.reset_index(drop=True))
+
+def test_chunked_ticket_summary_streams_order_batches():
+    read = []
+    def order_batches():
+        for chunk in _chunks(_ticket_orders(), 3):
+            read.append(len(chunk))
+            yield chunk
+
+    stream = calculate_orders_ticket_summary_chunked(order_batches(), iter([TICKETS]), CUSTOMERS, STORES)
+    assert read == [3] # Only the first batch, for the schema
+    next(iter(stream))
+    assert read == [3] # Each batch is read when the writer asks for it
+
+def test_presorted_summary_is_written_without_collecting(tmp_path):
+    stream = calculate_orders_ticket_summary_chunked(
+        _chunks(_ticket_orders(), 4), iter([TICKETS]), CUSTOMERS, STORES, orders_sorted_by=("order_id",)
+    )
+    path = str(tmp_path / "orders_ticket_summary.parquet")
+
+    rows = write_parquet(stream, path, layout_for("gold", "orders_ticket_summary"))
+
+    metadata = pq.ParquetFile(path).metadata
+    assert rows == 10 and metadata.num_row_groups == 3 # One per streamed batch
+    assert metadata.row_group(0).sorting_columns[0].column_index == 0 # order_id
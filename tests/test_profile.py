@@ -0,0 +1,88 @@
+"""Profiles of the months, merged from their stored sketches, must match a single pass over them."""
+from functools import reduce
+import numpy as np
+import pandas as pd
+from gold.transform.sketches import HyperLogLog, TDigest
+from gold.transform.transform_profile import calculate_order_profile
+
+STORES = pd.DataFrame({
+    "store_id": pd.Categorical(["s1", "s2"]),
+    "name": pd.Categorical(["Philadelphia", "Brooklyn"]),
+})
+
+# 1.04 / sqrt(2^12) is about 1.6%: allow three standard errors
+HLL_TOLERANCE = 0.05
+
+def _orders() -> pd.DataFrame:
+    """Six months of orders at two stores; customers come back across months."""
+    rng = np.random.default_rng(0)
+    count = 30_000
+    return pd.DataFrame({
+        "order_id": [f"o{i}" for i in range(count)],
+        "ordered_at": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 181 * 86_400, count), unit="s"),
+        "store_id": rng.choice(["s1", "s2"], count),
+        "customer_id": [f"c{i}" for i in rng.integers(0, 8_000, count)],
+        "order_total_cents": rng.lognormal(mean=7, sigma=0.6, size=count).round(),
+    })
+
+def _tickets(orders: pd.DataFrame) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    tickets = orders.sample(n=6_000, random_state=2)[["order_id"]].reset_index(drop=True)
+    tickets["sentiment_score"] = rng.uniform(-1, 1, len(tickets))
+    return tickets
+
+def _batches(frame: pd.DataFrame, size: int = 4_000) -> list:
+    return [frame.iloc[start:start + size] for start in range(0, len(frame), size)]
+
+def _within(estimate: float, exact: float, tolerance: float) -> bool:
+    return abs(estimate - exact) <= tolerance * abs(exact)
+
+def test_merged_monthly_profiles_match_a_single_pass():
+    orders = _orders()
+    tickets = _tickets(orders)
+    single = calculate_order_profile(_batches(orders), _batches(tickets), STORES)
+
+    # One profile per month, each from that month's orders only
+    month = orders["ordered_at"].dt.month
+    monthly = pd.concat(
+        [calculate_order_profile(_batches(orders[month == m]), _batches(tickets), STORES) for m in range(1, 7)]
+    )
+    store_months = monthly[monthly["grain"] == "store_month"]
+
+    single_years = single[single["grain"] == "store_year"].set_index("store_id")
+    for store_id, rows in store_months.groupby("store_id", observed=True):
+        customers = reduce(HyperLogLog.merge, map(HyperLogLog.from_bytes, rows["customers_hll"]))
+        order_totals = reduce(TDigest.merge, map(TDigest.from_bytes, rows["order_total_digest"]))
+        sentiment = reduce(TDigest.merge, map(TDigest.from_bytes, rows["sentiment_digest"]))
+        year = single_years.loc[store_id]
+
+        # Counts are exact
+        store_orders = orders[orders["store_id"] == store_id]
+        store_tickets = tickets[tickets["order_id"].isin(store_orders["order_id"])]
+        assert rows["order_count"].sum() == year["order_count"] == len(store_orders)
+        assert rows["ticket_count"].sum() == year["ticket_count"] == len(store_tickets)
+
+        # The merged sketches agree with the single pass and with the data
+        distinct = store_orders["customer_id"].nunique()
+        assert _within(customers.estimate(), distinct, HLL_TOLERANCE)
+        assert _within(year["distinct_customers"], distinct, HLL_TOLERANCE)
+        for suffix, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            exact = np.quantile(store_orders["order_total_cents"], q)
+            assert _within(order_totals.quantile(q), exact, 0.02)
+            assert _within(year[f"order_total_{suffix}_cents"], exact, 0.02)
+        for q in (0.1, 0.5, 0.9):
+            exact = np.quantile(store_tickets["sentiment_score"], q)
+            assert abs(sentiment.quantile(q) - exact) <= 0.02 # Scores span [-1, 1]
+
+def test_coarser_grains_add_up():
+    orders = _orders()
+    profile = calculate_order_profile(_batches(orders), [], STORES)
+
+    totals = profile.groupby("grain", observed=True)["order_count"].sum()
+    assert (totals == len(orders)).all()
+    all_year = profile[profile["grain"] == "all_year"].iloc[0]
+    assert pd.isna(all_year["store_name"]) and all_year["ticket_count"] == 0
+    assert _within(all_year["distinct_customers"], orders["customer_id"].nunique(), HLL_TOLERANCE)
+
+def test_profile_without_orders():
+    assert calculate_order_profile(iter([]), iter([]), STORES) is None
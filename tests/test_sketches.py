@@ -0,0 +1,72 @@
+"""Sketches must stay within their error bounds, merge like their data, and survive serialization."""
+import numpy as np
+from gold.transform.sketches import HyperLogLog, TDigest
+
+# 1.04 / sqrt(2^12) is about 1.6%: allow three standard errors
+HLL_TOLERANCE = 0.05
+
+def _customer_ids(start: int, stop: int) -> np.ndarray:
+    return np.array([f"c{i}" for i in range(start, stop)], dtype=object)
+
+def test_hll_estimate_is_within_its_error_bound():
+    for distinct in (10, 1_000, 50_000):
+        estimate = HyperLogLog().add(_customer_ids(0, distinct)).estimate()
+        assert abs(estimate - distinct) <= HLL_TOLERANCE * distinct
+
+def test_hll_merge_is_the_sketch_of_both_inputs():
+    # Overlapping ranges: 30,000 distinct in all
+    left = HyperLogLog().add(_customer_ids(0, 20_000))
+    right = HyperLogLog().add(_customer_ids(10_000, 30_000))
+
+    merged = left.merge(right)
+
+    both = HyperLogLog().add(_customer_ids(0, 30_000))
+    np.testing.assert_array_equal(merged.registers, both.registers)
+    assert abs(merged.estimate() - 30_000) <= HLL_TOLERANCE * 30_000
+
+def test_hll_round_trips_through_bytes():
+    sketch = HyperLogLog(precision=10).add(_customer_ids(0, 5_000))
+
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+
+    assert restored.precision == 10
+    np.testing.assert_array_equal(restored.registers, sketch.registers)
+    assert restored.estimate() == sketch.estimate()
+
+def test_tdigest_quantiles_are_within_tolerance():
+    values = np.random.default_rng(0).lognormal(mean=7, sigma=0.8, size=100_000)
+
+    digest = TDigest().update(values)
+
+    assert digest.count == len(values)
+    assert digest.quantile(0) == values.min() and digest.quantile(1) == values.max()
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        assert abs(digest.quantile(q) - np.quantile(values, q)) <= 0.01 * np.quantile(values, q)
+
+def test_tdigest_merge_matches_a_single_digest():
+    rng = np.random.default_rng(1)
+    batches = [rng.normal(loc, 100, size=20_000) for loc in (1_000, 1_500, 3_000)]
+
+    merged = TDigest()
+    for batch in batches:
+        merged = merged.merge(TDigest().update(batch))
+
+    values = np.concatenate(batches)
+    assert merged.count == len(values)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        assert abs(merged.quantile(q) - np.quantile(values, q)) <= 0.01 * np.quantile(values, q)
+
+def test_tdigest_round_trips_through_bytes():
+    digest = TDigest(compression=100).update(np.arange(1_000, dtype=np.float64))
+
+    restored = TDigest.from_bytes(digest.to_bytes())
+
+    assert restored.compression == 100 and restored.count == 1_000
+    np.testing.assert_array_equal(restored.means, digest.means)
+    np.testing.assert_array_equal(restored.weights, digest.weights)
+    assert restored.quantile(0.5) == digest.quantile(0.5)
+
+def test_empty_sketches():
+    assert HyperLogLog().estimate() == 0
+    assert np.isnan(TDigest().update([np.nan]).quantile(0.5))
+    assert TDigest().merge(TDigest()).count == 0
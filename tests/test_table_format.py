@@ -0,0 +1,31 @@
+"""Tables are versioned manifests over immutable files; nothing is written to the logical path."""
+import os
+import pandas as pd
+import pyarrow.parquet as pq
+from shared.table_format import list_tables, pinned_file, read_table, table_exists, versions, write_table
+
+def test_write_publishes_a_version_without_a_plain_file(tmp_path):
+    path = str(tmp_path / "orders.parquet")
+
+    write_table(pd.DataFrame({"order_id": [1, 2]}), path)
+    first = pinned_file(path)
+    write_table(pd.DataFrame({"order_id": [3]}), path)
+
+    assert not os.path.exists(path)
+    assert versions(path) == [1, 2]
+    assert table_exists(path) and list_tables(str(tmp_path)) == ["orders"]
+    assert read_table(path).column("order_id").to_pylist() == [3]
+    # The pinned file of the older version is unchanged
+    assert pq.read_table(first).column("order_id").to_pylist() == [1, 2]
+
+def test_plain_file_from_before_manifests_is_read_then_removed(tmp_path):
+    path = str(tmp_path / "stores.parquet")
+    pd.DataFrame({"store_id": ["s1"]}).to_parquet(path)
+
+    assert list_tables(str(tmp_path)) == ["stores"]
+    assert pinned_file(path) == path
+
+    write_table(pd.DataFrame({"store_id": ["s2"]}), path)
+
+    assert not os.path.exists(path)
+    assert read_table(path).column("store_id").to_pylist() == ["s2"]